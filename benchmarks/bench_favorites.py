@@ -0,0 +1,140 @@
+"""
+Benchmark of favorites lookups and edits.
+
+Compares FavoritesManager (a dict keyed by UUID in user order) with the
+list it replaced, where is_favorite scanned every favorite and removing
+one rebuilt the list, at 1,000 favorites and 30,000 listed stations.
+Saves go to an in-memory stand-in for Config, so only the favorites
+bookkeeping and preparing each save are timed (the manager now builds a
+slim snapshot per favorite on every save). Each figure is the best of a
+few runs.
+
+Run from the repository root (needs the GTK bindings):
+
+    python benchmarks/bench_favorites.py [--favorites 1000] [--stations 30000] [--runs 5]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyradio.favorites import FavoritesManager  # noqa: E402
+
+GROUPS = ['', 'News', 'Jazz', 'Pop', 'Local']
+
+
+class MemoryConfig:
+    """The part of Config that FavoritesManager uses, without the disk."""
+
+    def __init__(self, entries):
+        self.entries = entries
+        self.saves = 0
+
+    def load_favorites(self):
+        return list(self.entries)
+
+    def save_favorites(self, favorites):
+        # Config copies the list before handing it to the writer thread
+        list(favorites)
+        self.saves += 1
+
+
+class ListFavorites:
+    """Favorites as they were kept before: a list scanned per lookup."""
+
+    def __init__(self, stations, config: MemoryConfig):
+        self._favorites = [dict(s) for s in stations]
+        self.config = config
+
+    def is_favorite(self, station_uuid: str) -> bool:
+        return any(s.get('stationuuid') == station_uuid for s in self._favorites)
+
+    def remove(self, station_uuid: str):
+        self._favorites = [s for s in self._favorites if s.get('stationuuid') != station_uuid]
+        self.config.save_favorites(self._favorites)
+
+    def add(self, station):
+        if not self.is_favorite(station['stationuuid']):
+            self._favorites.append(dict(station))
+            self.config.save_favorites(self._favorites)
+
+
+def make_stations(count: int):
+    return [{
+        'stationuuid': f"{i:08x}-0000-4000-8000-000000000000",
+        'name': f"Station {i} FM",
+        'url': f"http://stream{i}.example.com/live.mp3",
+        'country': 'The Netherlands',
+        'codec': 'MP3',
+        'bitrate': 128,
+        'votes': i,
+    } for i in range(count)]
+
+
+def best_ms(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--favorites', type=int, default=1000)
+    parser.add_argument('--stations', type=int, default=30000)
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    stations = make_stations(args.stations)
+    uuids = [s['stationuuid'] for s in stations]
+    # Favorites spread over the catalogue, in groups
+    chosen = stations[::max(1, args.stations // args.favorites)][:args.favorites]
+    entries = [dict(s, group=GROUPS[i % len(GROUPS)]) for i, s in enumerate(chosen)]
+    middle = chosen[len(chosen) // 2]
+
+    before = ListFavorites(chosen, MemoryConfig([]))
+    config = MemoryConfig(entries)
+    favorites = FavoritesManager(config)
+
+    def remove_and_add_before():
+        before.remove(middle['stationuuid'])
+        before.add(middle)
+
+    def remove_and_add():
+        favorites.remove(middle['stationuuid'])
+        favorites.add(middle)
+
+    def move_first_to_last():
+        favorites.move(favorites.uuids()[0], len(chosen) - 1)
+
+    rows = [
+        ("load saved favorites", None,
+         best_ms(lambda: FavoritesManager(MemoryConfig(entries)), args.runs)),
+        ("is_favorite, every station",
+         best_ms(lambda: [before.is_favorite(u) for u in uuids], args.runs),
+         best_ms(lambda: [favorites.is_favorite(u) for u in uuids], args.runs)),
+        ("is_favorite_many, every station", None,
+         best_ms(lambda: favorites.is_favorite_many(uuids), args.runs)),
+        ("remove + add one favorite",
+         best_ms(remove_and_add_before, args.runs), best_ms(remove_and_add, args.runs)),
+        ("move first to last", None, best_ms(move_first_to_last, args.runs)),
+        ("get_all of one group", None, best_ms(lambda: favorites.get_all('Jazz'), args.runs)),
+        ("groups()", None, best_ms(favorites.groups, args.runs)),
+        ("update_metadata, nothing changed", None,
+         best_ms(lambda: favorites.update_metadata(chosen), args.runs)),
+    ]
+
+    print(f"{args.favorites} favorites, {args.stations} stations")
+    print(f"{'operation':<34}{'list (before)':>14}{'dict':>10}  (ms)")
+    for label, old, new in rows:
+        old_text = f"{old:.3f}" if old is not None else '-'
+        print(f"{label:<34}{old_text:>14}{new:>10.3f}")
+
+
+if __name__ == '__main__':
+    main()
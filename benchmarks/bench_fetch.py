@@ -0,0 +1,141 @@
+"""
+Benchmark of a station refresh (fetch_mixed_stations) over HTTP.
+
+Compares the pooled keep-alive transport with gzip against the old
+transport (one urllib.request.urlopen per request, uncompressed) on a
+local stand-in for the RadioBrowser API. Counts the connections the
+server accepted and the response bytes it sent.
+
+Run from the repository root:
+
+    python benchmarks/bench_fetch.py [--stations 500] [--runs 5]
+"""
+
+import argparse
+import gzip
+import json
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyradio.station_fetcher import StationFetcher  # noqa: E402
+
+
+class StandInServer(ThreadingHTTPServer):
+    """Serves the same station list for every API request."""
+
+    daemon_threads = True
+
+    def __init__(self, stations):
+        super().__init__(('127.0.0.1', 0), StandInHandler)
+        self.body = json.dumps(stations).encode('utf-8')
+        self.gzip_body = gzip.compress(self.body)
+        self.connections = 0
+        self.bytes_sent = 0
+        self.lock = threading.Lock()
+
+    @property
+    def base_url(self) -> str:
+        return f"http://127.0.0.1:{self.server_port}"
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive when the client asks for it
+    # Send headers and body in one write; separate small writes on a
+    # kept-alive connection stall on delayed ACKs
+    wbufsize = 64 * 1024
+
+    def setup(self):
+        with self.server.lock:
+            self.server.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = self.server.gzip_body
+            self.send_header('Content-Encoding', 'gzip')
+        else:
+            body = self.server.body
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+        with self.server.lock:
+            self.server.bytes_sent += len(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class UrlopenFetcher(StationFetcher):
+    """StationFetcher with the transport it had before the connection pool."""
+
+    def _request(self, endpoint, params=None):
+        url = f"{self.mirrors.mirrors[0].base_url}/json/{endpoint}"
+        if params:
+            url += "?" + urllib.parse.urlencode(params)
+        request = urllib.request.Request(url, headers={'User-Agent': self.user_agent})
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read().decode('utf-8'))
+
+
+def make_stations(count: int):
+    return [{
+        'stationuuid': f"{i:08x}-0000-4000-8000-000000000000",
+        'changeuuid': f"{i:08x}-0000-4000-8000-000000000001",
+        'lastchangetime_iso8601': '2024-01-01T00:00:00Z',
+        'name': f"Station {i} FM",
+        'url': f"http://stream{i}.example.com/live.mp3",
+        'url_resolved': f"http://stream{i}.example.com/live.mp3",
+        'homepage': f"https://station{i}.example.com/",
+        'favicon': f"https://station{i}.example.com/favicon.ico",
+        'country': 'The Netherlands',
+        'countrycode': 'NL',
+        'language': 'dutch',
+        'tags': 'pop,hits,news',
+        'votes': i,
+        'codec': 'MP3',
+        'bitrate': 128,
+        'lastcheckok': 1,
+    } for i in range(count)]
+
+
+def measure(fetcher_class, server, runs: int):
+    fetcher = fetcher_class([server.base_url])
+    server.connections = server.bytes_sent = 0
+    started = time.perf_counter()
+    for _ in range(runs):
+        stations = fetcher.fetch_mixed_stations()
+    elapsed = time.perf_counter() - started
+    fetcher.close()
+    return len(stations), server.connections, server.bytes_sent, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--stations', type=int, default=500, help="stations per response")
+    parser.add_argument('--runs', type=int, default=5, help="refreshes per transport")
+    args = parser.parse_args()
+
+    server = StandInServer(make_stations(args.stations))
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        print(f"{args.runs} x fetch_mixed_stations, {args.stations} stations per response")
+        print(f"{'transport':<22}{'connections':>12}{'bytes sent':>14}{'time':>10}")
+        for label, fetcher_class in (("urlopen (before)", UrlopenFetcher),
+                                     ("pooled + gzip", StationFetcher)):
+            _, connections, sent, elapsed = measure(fetcher_class, server, args.runs)
+            print(f"{label:<22}{connections:>12}{sent:>14,}{elapsed * 1000:>8.0f}ms")
+    finally:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
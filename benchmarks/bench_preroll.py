@@ -0,0 +1,142 @@
+"""
+Benchmark of time to first audio with and without pre-rolling.
+
+Serves an endless WAV stream (a sine tone, sent at its real-time rate
+after a short initial burst, like an Icecast server) from a local HTTP
+server that waits --server-delay ms before answering, standing in for
+a distant radio server. Each run then times Player.play() from the call
+to the pipeline reaching PLAYING (PlaySession.time_to_audio_ms):
+
+    cold        play() on a station that was not pre-rolled
+    prerolled   preroll(), --preroll-wait seconds of the selection
+                resting on the station, then play()
+
+Every run uses a new URL so nothing is reused between runs.
+
+Run from the repository root (needs GStreamer and the GTK bindings):
+
+    python benchmarks/bench_preroll.py [--runs 5] [--server-delay 300]
+"""
+
+import argparse
+import math
+import statistics
+import struct
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from gi.repository import GLib  # noqa: E402
+
+from pyradio.player import Player  # noqa: E402
+
+RATE = 22050  # Mono 16-bit PCM: 44 KB/s, about a 320 kbps MP3 stream
+CHUNK_S = 0.1
+BURST_S = 2.0  # Sent at once on connect, as streaming servers do
+
+
+def wav_header() -> bytes:
+    """A WAV header for a stream of unknown length."""
+    size = 0xFFFFFFFF - 36
+    return (b'RIFF' + struct.pack('<I', size + 36) + b'WAVE'
+            + b'fmt ' + struct.pack('<IHHIIHH', 16, 1, 1, RATE, RATE * 2, 2, 16)
+            + b'data' + struct.pack('<I', size))
+
+
+def tone_chunk() -> bytes:
+    samples = int(RATE * CHUNK_S)
+    return struct.pack(f'<{samples}h', *(int(8000 * math.sin(2 * math.pi * 440 * i / RATE))
+                                          for i in range(samples)))
+
+
+class StreamHandler(BaseHTTPRequestHandler):
+    chunk = tone_chunk()
+
+    def do_GET(self):
+        time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header('Content-Type', 'audio/x-wav')
+        self.end_headers()
+        try:
+            self.wfile.write(wav_header())
+            self.wfile.write(self.chunk * int(BURST_S / CHUNK_S))
+            while not self.server.stopping:
+                self.wfile.write(self.chunk)
+                time.sleep(CHUNK_S)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # The player let go of the stream
+
+    def log_message(self, format, *args):
+        pass
+
+
+def run_until(loop: GLib.MainLoop, done, timeout: float) -> bool:
+    """Run the main loop until done() is true or timeout seconds pass."""
+    deadline = time.monotonic() + timeout
+
+    def check():
+        if done() or time.monotonic() > deadline:
+            loop.quit()
+            return False
+        return True
+
+    GLib.timeout_add(10, check)
+    loop.run()
+    return done()
+
+
+def time_to_audio(player: Player, loop: GLib.MainLoop, url: str) -> float:
+    player.play(url)
+    if not run_until(loop, lambda: player.qos and player.qos.time_to_audio_ms is not None, 30):
+        raise RuntimeError(f"No audio from {url}")
+    ms = player.qos.time_to_audio_ms
+    player.stop()
+    return ms
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--server-delay', type=int, default=300,
+                        help="ms the server waits before answering")
+    parser.add_argument('--preroll-wait', type=float, default=2.0,
+                        help="seconds between preroll() and play()")
+    args = parser.parse_args()
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StreamHandler)
+    server.daemon_threads = True
+    server.delay = args.server_delay / 1000
+    server.stopping = False
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base_url = f"http://127.0.0.1:{server.server_port}/stream"
+
+    loop = GLib.MainLoop()
+    player = Player(max_standby=2)
+    player.set_volume(0.0)
+    cold, prerolled = [], []
+    try:
+        for run in range(args.runs):
+            cold.append(time_to_audio(player, loop, f"{base_url}?cold={run}"))
+
+            url = f"{base_url}?prerolled={run}"
+            player.preroll(url)
+            run_until(loop, lambda: False, args.preroll_wait)
+            prerolled.append(time_to_audio(player, loop, url))
+    finally:
+        player.cleanup()
+        server.stopping = True
+        server.shutdown()
+
+    print(f"{args.runs} runs, server delay {args.server_delay} ms, "
+          f"preroll wait {args.preroll_wait:.1f} s")
+    print(f"{'play':<12}{'median':>9}{'min':>9}{'max':>9}  (ms to first audio)")
+    for label, times in (("cold", cold), ("prerolled", prerolled)):
+        print(f"{label:<12}{statistics.median(times):>9.0f}{min(times):>9.0f}{max(times):>9.0f}")
+
+
+if __name__ == '__main__':
+    main()
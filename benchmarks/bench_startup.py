@@ -0,0 +1,124 @@
+"""
+Benchmark of loading the station cache at startup.
+
+Compares the old JSON cache (stations_cache.json, written with indent=2
+and parsed in full) with the memory-mapped binary snapshot, at several
+catalogue sizes. For the snapshot it times opening it for the first
+screen, decoding every record lazily one at a time, and the bulk decode
+into a StationTable that startup uses (the station list reads every
+record). Each figure is the best of a few runs, with the file in the
+page cache.
+
+Run from the repository root:
+
+    python benchmarks/bench_startup.py [--sizes 1000 10000 50000] [--runs 5]
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pyradio.station_cache import StationSnapshot, read_header, write_snapshot  # noqa: E402
+
+COUNTRIES = ['The Netherlands', 'Germany', 'United States', 'France',
+             'United Kingdom', 'Spain', 'Italy', 'Brazil']
+CODECS = ['MP3', 'AAC', 'OGG', 'AAC+']
+
+
+def make_stations(count: int):
+    rng = random.Random(count)
+    return [{
+        'stationuuid': f"{i:08x}-1234-5678-9abc-def012345678",
+        'name': f"Station {i} FM",
+        'url': f"http://stream{i}.example.com/live.mp3",
+        'url_alternate': '',
+        'homepage': f"https://station{i}.example.com/",
+        'favicon': f"https://station{i}.example.com/favicon.ico",
+        'country': rng.choice(COUNTRIES),
+        'countrycode': 'NL',
+        'language': 'dutch',
+        'tags': f"pop,rock,news,{i % 100}",
+        'votes': rng.randint(0, 10000),
+        'codec': rng.choice(CODECS),
+        'bitrate': rng.choice([64, 128, 192, 320]),
+    } for i in range(count)]
+
+
+def best_ms(func, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - started)
+    return min(times) * 1000
+
+
+def load_json(path: Path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def open_snapshot(path: Path):
+    """What the first screen needs: open, count and decode one row."""
+    snapshot = StationSnapshot(path)
+    len(snapshot)
+    dict(snapshot[0])
+    snapshot.close()
+
+
+def load_snapshot_rows(path: Path):
+    """Every record through the lazy, record-at-a-time path."""
+    snapshot = StationSnapshot(path)
+    for index in range(len(snapshot)):
+        snapshot[index]
+    snapshot.close()
+
+
+def load_snapshot_table(path: Path):
+    """What startup does: the whole snapshot as a StationTable."""
+    snapshot = StationSnapshot(path)
+    snapshot.to_table()
+    snapshot.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix='pyradio-bench-'))
+    print(f"{'stations':>9} {'json KB':>8} {'bin KB':>7} | {'valid json':>10} {'valid bin':>9} | "
+          f"{'load json':>9} {'open bin':>8} {'bin rows':>8} {'bin table':>9}  (ms)")
+    for size in args.sizes:
+        stations = make_stations(size)
+        json_path = directory / f"stations_{size}.json"
+        bin_path = directory / f"stations_{size}.bin"
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump({'timestamp': time.time(), 'stations': stations}, f,
+                      indent=2, ensure_ascii=False)
+        write_snapshot(bin_path, stations, time.time())
+
+        # The old is_cache_valid parsed the whole file for its timestamp
+        valid_json = best_ms(lambda: load_json(json_path)['timestamp'], args.runs)
+        valid_bin = best_ms(lambda: read_header(bin_path), args.runs)
+        load = best_ms(lambda: load_json(json_path)['stations'], args.runs)
+        opened = best_ms(lambda: open_snapshot(bin_path), args.runs)
+        rows = best_ms(lambda: load_snapshot_rows(bin_path), args.runs)
+        table = best_ms(lambda: load_snapshot_table(bin_path), args.runs)
+        print(f"{size:>9} {json_path.stat().st_size // 1024:>8} {bin_path.stat().st_size // 1024:>7} | "
+              f"{valid_json:>10.1f} {valid_bin:>9.3f} | {load:>9.1f} {opened:>8.2f} {rows:>8.1f} {table:>9.1f}")
+
+        json_path.unlink()
+        bin_path.unlink()
+    directory.rmdir()
+
+
+if __name__ == '__main__':
+    main()
@@ -5,8 +5,19 @@ Handles user preferences and data persistence.
 
 import json
 import os
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterable, List, Any, Optional, Sequence
+
+from .persistence import WriteBehindWriter
+from .qos import QosStore
+from .search_index import SearchIndex
+from .station_cache import StationSnapshot, encode_snapshot, read_header
+from .station_store import StationStore, StationStoreWriter
+from .station_table import StationTable
+from .stream_prober import decode_results, encode_results
 
 
 class Config:
@@ -17,9 +28,18 @@ class Config:
         self.config_dir = Path.home() / ".config" / "pyradio"
         self.config_dir.mkdir(parents=True, exist_ok=True)
 
+        # Cache directory for re-downloadable data (XDG cache)
+        cache_home = os.environ.get('XDG_CACHE_HOME') or Path.home() / ".cache"
+        self.cache_dir = Path(cache_home) / "pyradio"
+        self.favicon_dir = self.cache_dir / "favicons"
+
         # Configuration files
         self.favorites_file = self.config_dir / "favorites.json"
-        self.cache_file = self.config_dir / "stations_cache.json"
+        self.cache_file = self.config_dir / "stations.db"
+        self.snapshot_file = self.config_dir / "stations.bin"
+        self.search_index_file = self.config_dir / "search_index.json"
+        self.stream_health_file = self.config_dir / "stream_health.json"
+        self.playback_stats_file = self.config_dir / "playback_stats.json"
         self.settings_file = self.config_dir / "settings.json"
 
         # Default settings
@@ -27,10 +47,32 @@ class Config:
             "volume": 0.8,
             "cache_expiry_hours": 24,
             "last_station_uuid": None,
+            "last_change_uuid": None,  # Change marker for delta syncs of the cache
+            "full_catalogue_sync": False,
+            "api_mirrors": [],  # Empty means the built-in RadioBrowser mirrors
+            "fsync_writes": False,  # Flush saved files to disk (slower, survives power loss)
+            "show_favicons": True,
+            "favicon_cache_mb": 20,
+            "preroll_stations": 2,  # Standby pipelines pre-rolling likely next stations
+            "reconnect_attempts": 5,  # Reconnects in a row before a dropped stream fails
+            "health_check_hours": 24,  # How long a stream health check stays current
+            "health_check_limit": 1000,  # Most listed stations checked in one health check
         }
 
         self._load_settings()
 
+        # Settings, favorites and the cache snapshot are saved off the main
+        # thread, with bursts of saves to one file coalesced into one write
+        self.writer = WriteBehindWriter(delay=0.5, fsync=self.settings['fsync_writes'])
+
+        # Station cache. Writes to the store run in order on one worker
+        # thread; _cache_time is the timestamp of the newest one queued.
+        self.store = StationStore(self.cache_file)
+        self._store_executor = ThreadPoolExecutor(max_workers=1,
+                                                  thread_name_prefix='pyradio-store')
+        self._cache_time: Optional[float] = None
+        self._migrate_json_cache()
+
     def _load_settings(self):
         """Load user settings from disk."""
         if self.settings_file.exists():
@@ -42,12 +84,12 @@ class Config:
                 print(f"Warning: Could not load settings: {e}")
 
     def save_settings(self):
-        """Save current settings to disk."""
-        try:
-            with open(self.settings_file, 'w', encoding='utf-8') as f:
-                json.dump(self.settings, f, indent=2)
-        except IOError as e:
-            print(f"Error saving settings: {e}")
+        """Save current settings to disk (in the background)."""
+        settings = dict(self.settings)
+        self.writer.schedule(
+            self.settings_file,
+            lambda: json.dumps(settings, indent=2).encode('utf-8')
+        )
 
     def get_setting(self, key: str, default=None):
         """Get a setting value."""
@@ -71,58 +113,202 @@ class Config:
             return []
 
     def save_favorites(self, favorites: List[Dict]):
-        """Save favorite stations to disk."""
+        """Save favorite stations to disk (in the background)."""
+        favorites = list(favorites)
+        self.writer.schedule(
+            self.favorites_file,
+            lambda: json.dumps(favorites, indent=2, ensure_ascii=False).encode('utf-8')
+        )
+
+    def load_cache(self) -> StationTable:
+        """Load cached stations from disk.
+
+        Reads the memory-mapped binary snapshot when it matches the store,
+        otherwise loads from the store and rewrites the snapshot.
+        """
         try:
-            with open(self.favorites_file, 'w', encoding='utf-8') as f:
-                json.dump(favorites, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            print(f"Error saving favorites: {e}")
-
-    def load_cache(self) -> List[Dict]:
-        """Load cached stations from disk."""
-        if not self.cache_file.exists():
-            return []
+            store_time = self.store.timestamp()
+        except sqlite3.Error as e:
+            print(f"Error loading cache: {e}")
+            return StationTable()
 
         try:
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                return data.get('stations', [])
-        except (json.JSONDecodeError, IOError) as e:
+            snapshot = StationSnapshot(self.snapshot_file)
+        except (OSError, ValueError):
+            snapshot = None
+        if snapshot is not None:
+            try:
+                if snapshot.timestamp == store_time:
+                    # Decoded in bulk: the station list reads every record
+                    # at startup (search keys, sorting), which is several
+                    # times slower record by record through the snapshot
+                    return snapshot.to_table()
+            finally:
+                snapshot.close()
+
+        try:
+            stations = StationTable.from_stations(self.store.load_all())
+        except sqlite3.Error as e:
             print(f"Error loading cache: {e}")
-            return []
+            return StationTable()
+        if stations:
+            self._save_snapshot(stations, store_time)
+        return stations
+
+    def save_cache(self, stations: Sequence[Dict], change_marker: Optional[str] = None):
+        """Replace the station cache with stations (in the background).
+
+        change_marker becomes the last_change_uuid setting once the
+        stations are stored, so delta syncs never start from a marker
+        newer than the cache.
+        """
+        timestamp = self._cache_time = time.time()
+        self._write_store(lambda: self.store.replace_all(stations, timestamp), change_marker)
+        self._save_snapshot(stations, timestamp)
+
+    def update_cache(self, stations: Sequence[Dict], updated: Iterable[Dict],
+                     removed_uuids: Iterable[str], change_marker: Optional[str] = None):
+        """Apply a delta sync to the station cache (in the background).
+
+        Only the rows of updated and removed stations are written to the
+        store; stations is the resulting list, for the snapshot.
+        """
+        updated = list(updated)
+        removed_uuids = list(removed_uuids)
+        timestamp = self._cache_time = time.time()
+        self._write_store(lambda: self.store.apply_changes(updated, removed_uuids, timestamp),
+                          change_marker)
+        self._save_snapshot(stations, timestamp)
+
+    def _write_store(self, write, change_marker: Optional[str]):
+        """Run a station store write on the store thread."""
+        def run():
+            try:
+                write()
+            except sqlite3.Error as e:
+                print(f"Error saving cache: {e}")
+                return
+            if change_marker is not None:
+                self.set_setting('last_change_uuid', change_marker)
+        self._store_executor.submit(run)
 
-    def save_cache(self, stations: List[Dict]):
-        """Save station cache to disk."""
+    def cache_timestamp(self) -> float:
+        """Timestamp of the station cache, including writes still queued."""
+        if self._cache_time is not None:
+            return self._cache_time
+        return self.store.timestamp()
+
+    def _save_snapshot(self, stations: Sequence[Dict], timestamp: float):
+        """Write the binary startup snapshot of the cache (in the background)."""
+        self.writer.schedule(
+            self.snapshot_file,
+            lambda: encode_snapshot(stations, timestamp)
+        )
+
+    def load_search_index(self, stations: Sequence[Dict]) -> Optional[SearchIndex]:
+        """Load the saved search index if it was built for these cached stations."""
+        try:
+            data = self.search_index_file.read_bytes()
+            store_time = self.store.timestamp()
+        except (OSError, sqlite3.Error):
+            return None
+        return SearchIndex.from_bytes(data, store_time, stations)
+
+    def save_search_index(self, index: SearchIndex):
+        """Save the search index of the cached stations (in the background)."""
+        try:
+            store_time = self.cache_timestamp()
+        except sqlite3.Error as e:
+            print(f"Error saving search index: {e}")
+            return
+        self.writer.schedule(self.search_index_file, lambda: index.to_bytes(store_time))
+
+    def load_stream_health(self) -> Dict[str, Dict]:
+        """Saved stream health check results by station UUID."""
         try:
-            import time
-            data = {
-                'timestamp': time.time(),
-                'stations': stations
-            }
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, indent=2, ensure_ascii=False)
-        except IOError as e:
-            print(f"Error saving cache: {e}")
+            return decode_results(self.stream_health_file.read_bytes())
+        except OSError:
+            return {}
+
+    def save_stream_health(self, results: Dict[str, Dict]):
+        """Save stream health check results (in the background)."""
+        self.writer.schedule(self.stream_health_file, lambda: encode_results(results))
+
+    def load_playback_stats(self) -> QosStore:
+        """Saved per-station playback quality history."""
+        try:
+            return QosStore.from_bytes(self.playback_stats_file.read_bytes())
+        except OSError:
+            return QosStore()
+
+    def save_playback_stats(self, store: QosStore):
+        """Save the playback quality history (in the background)."""
+        store = store.copy()
+        self.writer.schedule(self.playback_stats_file, store.to_bytes)
+
+    def open_cache_writer(self) -> StationStoreWriter:
+        """Start writing a new station cache in batches."""
+        # The writer stamps the store itself when it commits
+        self._cache_time = None
+        return self.store.open_writer()
 
     def is_cache_valid(self) -> bool:
         """Check if cache is still valid based on expiry time."""
-        if not self.cache_file.exists():
-            return False
+        if self._cache_time is not None:
+            # Saved this session, possibly still being written
+            cache_time = self._cache_time
+        else:
+            # Only the snapshot header is read; fall back to the store without one
+            header = read_header(self.snapshot_file)
+            if header:
+                cache_time = header[0]
+            else:
+                try:
+                    cache_time = self.store.timestamp()
+                except sqlite3.Error:
+                    return False
+        expiry_seconds = self.settings['cache_expiry_hours'] * 3600
+        return (time.time() - cache_time) < expiry_seconds
 
-        try:
-            import time
-            with open(self.cache_file, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                cache_time = data.get('timestamp', 0)
-                expiry_seconds = self.settings['cache_expiry_hours'] * 3600
-                return (time.time() - cache_time) < expiry_seconds
-        except (json.JSONDecodeError, IOError):
-            return False
+    def flush(self):
+        """Write out all pending saves now."""
+        # Store writes may still change settings, so they go first
+        self._store_executor.submit(lambda: None).result()
+        self.writer.flush()
+
+    def close(self):
+        """Flush pending saves and release resources."""
+        self._store_executor.shutdown(wait=True)
+        self.writer.close()
+        self.store.close()
 
     def clear_cache(self):
         """Clear the station cache."""
-        if self.cache_file.exists():
-            try:
-                self.cache_file.unlink()
-            except OSError as e:
-                print(f"Error clearing cache: {e}")
+        self.set_setting('last_change_uuid', None)
+        self.writer.discard(self.snapshot_file)
+        self.writer.discard(self.search_index_file)
+        self._cache_time = 0.0
+        self._write_store(self.store.clear, None)
+        try:
+            for path in (self.snapshot_file, self.search_index_file):
+                if path.exists():
+                    path.unlink()
+        except OSError as e:
+            print(f"Error clearing cache: {e}")
+
+    def _migrate_json_cache(self):
+        """Import a stations_cache.json left by older versions into the store."""
+        legacy_file = self.config_dir / "stations_cache.json"
+        if not legacy_file.exists():
+            return
+
+        try:
+            with open(legacy_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            stations = data.get('stations', [])
+            if stations and not self.store.count():
+                self.store.replace_all(stations, data.get('timestamp', 0))
+            legacy_file.unlink()
+        except (json.JSONDecodeError, IOError, OSError, sqlite3.Error) as e:
+            print(f"Warning: Could not migrate station cache: {e}")
+
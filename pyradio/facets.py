@@ -0,0 +1,199 @@
+"""
+Faceted station filtering for PyRadio.
+Per-value station sets for codec, language, country code and tags, and
+"at least" ranges of bitrate and votes, combined by set intersection.
+
+Sets of many stations are bitmaps (Python ints, one bit per station
+position), so intersections and counts run in C over whole words.
+Sets of few stations, like most tags, are sorted position arrays,
+which take far less memory than a bitmap each.
+"""
+
+from array import array
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Sequence, Tuple, Union
+
+# Facets in display order
+FACETS = ('codec', 'bitrate', 'language', 'countrycode', 'tags', 'votes')
+# Facets whose values are lower bounds: a station is in every range it reaches
+RANGE_FACETS = {
+    'bitrate': (64, 128, 192, 256, 320),
+    'votes': (10, 100, 1000, 10000),
+}
+
+# A value's set is stored as an array while 32-bit positions take less
+# room than a bitmap of the whole list
+_SPARSE_RATIO = 32
+
+# Bit positions set in each byte value
+_BYTE_BITS = tuple(tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256))
+
+try:
+    _bit_count = int.bit_count
+except AttributeError:  # Python < 3.10
+    def _bit_count(bits: int) -> int:
+        return bin(bits).count('1')
+
+Selection = Mapping[str, Iterable]
+StationSet = Union[int, array]
+
+
+def facet_values(facet: str, station: Mapping) -> List:
+    """Values of facet for a station (ranges: the lower bounds it reaches)."""
+    if facet in RANGE_FACETS:
+        number = int(station.get(facet) or 0)
+        return [bound for bound in RANGE_FACETS[facet] if number >= bound]
+    value = station.get(facet) or ''
+    if facet in ('codec', 'countrycode'):
+        value = value.strip().upper()
+        return [value] if value else []
+    # language and tags are comma-separated lists
+    return list(dict.fromkeys(v.strip().lower() for v in value.split(',') if v.strip()))
+
+
+class FacetIndex:
+    """Station sets per facet value over a list of stations.
+
+    Stations are identified by their position in the list the index was
+    built from. Values selected within one facet are alternatives (OR),
+    facets are combined with AND.
+    """
+
+    def __init__(self, size: int):
+        self.size = size
+        self.all = (1 << size) - 1
+        self._sets: Dict[str, Dict[object, StationSet]] = {facet: {} for facet in FACETS}
+        self._totals: Dict[str, Dict[object, int]] = {facet: {} for facet in FACETS}
+        self._bitmaps: Dict[Tuple[str, object], int] = {}  # Sparse sets made bitmaps
+        self._ordered: Dict[str, List] = {}  # Values per facet in values() order
+
+    @classmethod
+    def build(cls, stations: Sequence[Mapping]) -> 'FacetIndex':
+        index = cls(len(stations))
+        positions: Dict[str, Dict[object, array]] = {
+            facet: defaultdict(lambda: array('I')) for facet in FACETS
+        }
+        # Languages and tag lists repeat a lot; split each once
+        value_cache: Dict[Tuple[str, object], List] = {}
+        for position, station in enumerate(stations):
+            for facet in FACETS:
+                raw = station.get(facet)
+                values = value_cache.get((facet, raw))
+                if values is None:
+                    values = value_cache[(facet, raw)] = facet_values(facet, station)
+                facet_positions = positions[facet]
+                for value in values:
+                    facet_positions[value].append(position)
+
+        for facet in FACETS:
+            for value, value_positions in positions[facet].items():
+                index._totals[facet][value] = len(value_positions)
+                if len(value_positions) * _SPARSE_RATIO < index.size:
+                    index._sets[facet][value] = value_positions
+                else:
+                    index._sets[facet][value] = _to_bitmap(value_positions, index.size)
+            index.values(facet)  # Order the values while still off the main loop
+        return index
+
+    def __len__(self) -> int:
+        return self.size
+
+    def values(self, facet: str, limit: Optional[int] = None) -> List:
+        """Values of facet, most common first (ranges in ascending order)."""
+        ordered = self._ordered.get(facet)
+        if ordered is None:
+            totals = self._totals[facet]
+            if facet in RANGE_FACETS:
+                ordered = [bound for bound in RANGE_FACETS[facet] if bound in totals]
+            else:
+                ordered = sorted(totals, key=lambda value: (-totals[value], value))
+            self._ordered[facet] = ordered
+        return ordered[:limit] if limit is not None else list(ordered)
+
+    def total(self, facet: str, value) -> int:
+        """Number of stations with value, ignoring any selection."""
+        return self._totals[facet].get(value, 0)
+
+    def query(self, selection: Selection, skip: Optional[str] = None) -> int:
+        """Bitmap of the stations matching selection (leaving out facet skip)."""
+        result = self.all
+        for facet, values in selection.items():
+            if facet == skip:
+                continue
+            values = list(values)
+            if not values:
+                continue
+            matching = 0
+            for value in values:
+                matching |= self._bitmap(facet, value)
+            result &= matching
+            if not result:
+                break
+        return result
+
+    def counts(self, selection: Selection,
+               limit: Optional[int] = None) -> Dict[str, List[Tuple[object, int]]]:
+        """Live (value, count) pairs per facet under selection.
+
+        A facet's counts apply the selections of the other facets only,
+        so they say how many stations choosing that value would give.
+        Each facet lists its limit most common values plus the selected
+        ones, in the order of values().
+        """
+        result = {}
+        for facet in FACETS:
+            chosen = set(selection.get(facet, ()))
+            shown = self.values(facet, limit)
+            shown += [value for value in chosen
+                      if value not in shown and value in self._totals[facet]]
+            base = self.query(selection, skip=facet)
+            if base == self.all:
+                totals = self._totals[facet]
+                result[facet] = [(value, totals[value]) for value in shown]
+                continue
+
+            base_bytes = None
+            sets = self._sets[facet]
+            counts = []
+            for value in shown:
+                station_set = sets[value]
+                if isinstance(station_set, int):
+                    count = _bit_count(station_set & base)
+                else:
+                    if base_bytes is None:
+                        base_bytes = base.to_bytes((self.size + 7) // 8, 'little')
+                    count = sum(base_bytes[p >> 3] >> (p & 7) & 1 for p in station_set)
+                counts.append((value, count))
+            result[facet] = counts
+        return result
+
+    def positions(self, bitmap: int) -> List[int]:
+        """Station positions in a bitmap, in ascending order."""
+        found: List[int] = []
+        extend = found.extend
+        data = bitmap.to_bytes((self.size + 7) // 8, 'little')
+        for byte_number, byte in enumerate(data):
+            if byte:
+                start = byte_number * 8
+                extend(start + bit for bit in _BYTE_BITS[byte])
+        return found
+
+    def _bitmap(self, facet: str, value) -> int:
+        """Bitmap of the stations with value (0 for unknown values)."""
+        station_set = self._sets[facet].get(value)
+        if station_set is None:
+            return 0
+        if isinstance(station_set, int):
+            return station_set
+        key = (facet, value)
+        bitmap = self._bitmaps.get(key)
+        if bitmap is None:
+            bitmap = self._bitmaps[key] = _to_bitmap(station_set, self.size)
+        return bitmap
+
+
+def _to_bitmap(positions: Iterable[int], size: int) -> int:
+    data = bytearray((size + 7) // 8)
+    for position in positions:
+        data[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(data, 'little')
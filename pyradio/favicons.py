@@ -0,0 +1,284 @@
+"""
+Station favicon loading for PyRadio.
+Downloads, decodes and scales icons on worker threads, keeps thumbnails
+in a size-capped on-disk LRU cache and textures in a small in-memory one.
+"""
+
+import hashlib
+import os
+import threading
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, Future
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+import gi
+gi.require_version('Gdk', '4.0')
+gi.require_version('GdkPixbuf', '2.0')
+from gi.repository import Gdk, GdkPixbuf, GLib
+
+from .persistence import atomic_write
+
+
+class FaviconDiskCache:
+    """Thumbnail PNGs on disk, evicting least recently used past a size cap."""
+
+    def __init__(self, cache_dir: Path, max_bytes: int):
+        self.cache_dir = cache_dir
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+
+        self._lock = threading.Lock()
+        # file name -> size, least recently used first
+        self._entries: "OrderedDict[str, int]" = OrderedDict()
+        self._total = 0
+
+        files = []
+        for path in self.cache_dir.glob('*.png'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.name, stat.st_size))
+        for _, name, size in sorted(files):
+            self._entries[name] = size
+            self._total += size
+
+    @staticmethod
+    def key(url: str) -> str:
+        return hashlib.sha1(url.encode('utf-8')).hexdigest() + '.png'
+
+    def get(self, url: str) -> Optional[bytes]:
+        """Cached thumbnail for url, marking it as recently used."""
+        name = self.key(url)
+        with self._lock:
+            if name not in self._entries:
+                return None
+            self._entries.move_to_end(name)
+        path = self.cache_dir / name
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # Keeps LRU order across restarts
+            return data
+        except OSError:
+            with self._lock:
+                self._total -= self._entries.pop(name, 0)
+            return None
+
+    def put(self, url: str, data: bytes):
+        """Store a thumbnail and evict old ones beyond the size cap."""
+        name = self.key(url)
+        try:
+            atomic_write(self.cache_dir / name, data)
+        except OSError as e:
+            print(f"Error caching favicon: {e}")
+            return
+
+        evicted = []
+        with self._lock:
+            self._total += len(data) - self._entries.pop(name, 0)
+            self._entries[name] = len(data)
+            while self._total > self.max_bytes and len(self._entries) > 1:
+                old_name, size = self._entries.popitem(last=False)
+                self._total -= size
+                evicted.append(old_name)
+
+        for old_name in evicted:
+            try:
+                (self.cache_dir / old_name).unlink()
+            except OSError:
+                pass
+
+    @property
+    def total_bytes(self) -> int:
+        return self._total
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def _is_web_url(url: str) -> bool:
+    parts = urllib.parse.urlsplit(url)
+    return parts.scheme in ('http', 'https') and bool(parts.hostname)
+
+
+class _WebRedirectHandler(urllib.request.HTTPRedirectHandler):
+    """Follows redirects to http(s) URLs only."""
+
+    def redirect_request(self, req, fp, code, msg, headers, newurl):
+        if not _is_web_url(newurl):
+            raise urllib.error.HTTPError(newurl, code, f"Unsupported redirect: {newurl}", headers, fp)
+        return super().redirect_request(req, fp, code, msg, headers, newurl)
+
+
+class FaviconLoader:
+    """Loads station favicons as small textures without blocking the UI.
+
+    Downloads, decoding and scaling run on a bounded thread pool;
+    callbacks and texture creation happen on the main loop.
+    """
+
+    MAX_ICON_BYTES = 512 * 1024
+    TIMEOUT = 5
+
+    def __init__(self, cache_dir: Path, size: int = 32, max_workers: int = 4,
+                 disk_limit: int = 20 * 1024 * 1024, memory_limit: int = 256):
+        self.size = size
+        self.memory_limit = memory_limit
+        self.disk_cache = FaviconDiskCache(cache_dir, disk_limit)
+        self.user_agent = "PyRadio/1.0"
+        # No FileHandler/FTPHandler: icon URLs come from the station
+        # directory and must not read local files
+        self._opener = urllib.request.OpenerDirector()
+        for handler in (urllib.request.ProxyHandler, urllib.request.HTTPHandler, urllib.request.HTTPSHandler,
+                        _WebRedirectHandler, urllib.request.HTTPErrorProcessor,
+                        urllib.request.HTTPDefaultErrorHandler, urllib.request.UnknownHandler):
+            self._opener.add_handler(handler())
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='pyradio-favicon')
+        self._textures: "OrderedDict[str, Gdk.Texture]" = OrderedDict()
+        self._waiting: Dict[str, List[Callable]] = {}  # url -> callbacks
+        self._futures: Dict[str, Future] = {}
+        self._failed: Set[str] = set()
+
+        self._stats = {
+            'memory_hits': 0,
+            'disk_hits': 0,
+            'downloads': 0,
+            'failures': 0,
+            'evictions': 0,
+        }
+        self._stats_lock = threading.Lock()
+
+    def lookup(self, url: str) -> Optional[Gdk.Texture]:
+        """Texture for url if it is in memory already."""
+        texture = self._textures.get(url)
+        if texture is not None:
+            self._textures.move_to_end(url)
+            self._count('memory_hits')
+        return texture
+
+    def request(self, url: str, callback: Callable[[Gdk.Texture], None]):
+        """Load url in the background and call callback(texture) on the main loop.
+
+        Failed icons are not retried and never call back.
+        """
+        if not url or url in self._failed:
+            return
+        if not _is_web_url(url):
+            self._failed.add(url)
+            return
+
+        texture = self.lookup(url)
+        if texture is not None:
+            callback(texture)
+            return
+
+        if url in self._waiting:
+            self._waiting[url].append(callback)
+            return
+        self._waiting[url] = [callback]
+        self._futures[url] = self._executor.submit(self._load, url)
+
+    def cancel_pending(self, keep: Set[str]):
+        """Drop queued loads for icons not in keep, e.g. rows scrolled away."""
+        for url, future in list(self._futures.items()):
+            if url not in keep and future.cancel():
+                del self._futures[url]
+                self._waiting.pop(url, None)
+
+    def stats(self) -> Dict:
+        """Cache effectiveness and memory use."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        lookups = stats['memory_hits'] + stats['disk_hits'] + stats['downloads']
+        stats['hit_rate'] = (stats['memory_hits'] + stats['disk_hits']) / lookups if lookups else 0.0
+        stats['textures'] = len(self._textures)
+        stats['texture_bytes'] = len(self._textures) * self.size * self.size * 4
+        stats['disk_entries'] = len(self.disk_cache)
+        stats['disk_bytes'] = self.disk_cache.total_bytes
+        return stats
+
+    def shutdown(self):
+        """Stop loading icons."""
+        for future in self._futures.values():
+            future.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _load(self, url: str):
+        """Worker thread: get a decoded, scaled pixbuf for url."""
+        pixbuf = None
+        data = self.disk_cache.get(url)
+        if data is not None:
+            pixbuf = self._decode(data)
+            if pixbuf is not None:
+                self._count('disk_hits')
+
+        if pixbuf is None:
+            pixbuf = self._download(url)
+            if pixbuf is not None:
+                self._count('downloads')
+                try:
+                    ok, png = pixbuf.save_to_bufferv('png', [], [])
+                    if ok:
+                        self.disk_cache.put(url, png)
+                except GLib.Error as e:
+                    print(f"Error encoding favicon: {e}")
+            else:
+                self._count('failures')
+
+        GLib.idle_add(self._deliver, url, pixbuf)
+
+    def _download(self, url: str) -> Optional[GdkPixbuf.Pixbuf]:
+        try:
+            req = urllib.request.Request(url)
+            req.add_header('User-Agent', self.user_agent)
+            with self._opener.open(req, timeout=self.TIMEOUT) as response:
+                data = response.read(self.MAX_ICON_BYTES + 1)
+        except (urllib.error.URLError, OSError, ValueError):
+            return None
+        if len(data) > self.MAX_ICON_BYTES:
+            return None
+        return self._decode(data)
+
+    def _decode(self, data: bytes) -> Optional[GdkPixbuf.Pixbuf]:
+        """Decode image data and scale it to a square thumbnail."""
+        loader = GdkPixbuf.PixbufLoader()
+        try:
+            loader.write(data)
+            loader.close()
+        except GLib.Error:
+            return None
+        pixbuf = loader.get_pixbuf()
+        if pixbuf is None:
+            return None
+        if pixbuf.get_width() != self.size or pixbuf.get_height() != self.size:
+            pixbuf = pixbuf.scale_simple(self.size, self.size, GdkPixbuf.InterpType.BILINEAR)
+        return pixbuf
+
+    def _deliver(self, url: str, pixbuf: Optional[GdkPixbuf.Pixbuf]):
+        """Main loop: turn the pixbuf into a texture and run callbacks."""
+        self._futures.pop(url, None)
+        callbacks = self._waiting.pop(url, [])
+
+        if pixbuf is None:
+            self._failed.add(url)
+            return False
+
+        texture = Gdk.Texture.new_for_pixbuf(pixbuf)
+        self._textures[url] = texture
+        while len(self._textures) > self.memory_limit:
+            self._textures.popitem(last=False)
+            self._count('evictions')
+
+        for callback in callbacks:
+            callback(texture)
+        return False
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self._stats[key] += 1
@@ -1,51 +1,171 @@
 """
 Favorites management for PyRadio.
-Handles adding, removing, and persisting favorite stations.
+Handles adding, removing, ordering, grouping and persisting favorite stations.
 """
 
-from typing import List, Dict, Optional
+from gi.repository import GObject
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
 from .config import Config
+from .playlists import CUSTOM_UUID_PREFIX, custom_station, read_playlist, url_key, write_playlist
 
+# Station fields saved with each favorite's UUID, so favorites can be
+# listed and played before their live records have been fetched
+SNAPSHOT_FIELDS = ('name', 'url', 'url_alternate', 'favicon', 'country', 'codec', 'bitrate')
 
-class FavoritesManager:
-    """Manages user's favorite radio stations."""
+
+class FavoritesManager(GObject.GObject):
+    """Manages user's favorite radio stations.
+
+    Favorites are kept in a dict keyed by station UUID, whose order is
+    the user's order, so lookups and removals are O(1). Each favorite
+    can belong to a group (folder); the default group is "".
+
+    Only the UUID, the group and a small snapshot of each station are
+    saved; update_metadata() brings the records up to date.
+    """
+
+    # 'changed' is emitted for a single station added or removed, so views
+    # can update just that station; 'reordered' when the order, the groups
+    # or many favorites at once changed
+    __gsignals__ = {
+        'changed': (GObject.SignalFlags.RUN_FIRST, None, (str, bool)),  # (uuid, is favorite)
+        'reordered': (GObject.SignalFlags.RUN_FIRST, None, ()),
+        'updated': (GObject.SignalFlags.RUN_FIRST, None, ()),  # station records refreshed
+    }
 
     def __init__(self, config: Config):
+        super().__init__()
         self.config = config
-        self._favorites: List[Dict] = []
+        self._favorites: Dict[str, Dict] = {}  # uuid -> station, in user order
+        self._groups: Dict[str, str] = {}  # uuid -> group, for grouped favorites
         self._load()
 
     def _load(self):
         """Load favorites from config."""
-        self._favorites = self.config.load_favorites()
+        self._favorites = {}
+        self._groups = {}
+        saved_fields = {'stationuuid', 'group', *SNAPSHOT_FIELDS}
+        full_snapshots = False
+        for entry in self.config.load_favorites():
+            station = dict(entry)
+            uuid = station.get('stationuuid')
+            if not uuid:
+                continue
+            group = station.pop('group', '')
+            self._favorites[uuid] = station
+            if group:
+                self._groups[uuid] = group
+            full_snapshots = full_snapshots or not saved_fields.issuperset(station)
+
+        # Older versions saved whole station records; slim the file down
+        if full_snapshots:
+            self._save()
 
     def _save(self):
-        """Save favorites to config."""
-        self.config.save_favorites(self._favorites)
+        """Save favorites to config: UUID, group and station snapshot."""
+        groups = self._groups
+        entries = []
+        for uuid, station in self._favorites.items():
+            entry = {'stationuuid': uuid}
+            if uuid in groups:
+                entry['group'] = groups[uuid]
+            for field in SNAPSHOT_FIELDS:
+                if station.get(field):
+                    entry[field] = station[field]
+            entries.append(entry)
+        self.config.save_favorites(entries)
 
-    def add(self, station: Dict) -> bool:
+    def add(self, station: Dict, group: str = '') -> bool:
         """Add a station to favorites. Returns True if added, False if already existed."""
         uuid = station.get('stationuuid')
         if not uuid:
             return False
 
         # Check if already in favorites
-        if self.is_favorite(uuid):
+        if uuid in self._favorites:
             return False
 
-        self._favorites.append(station)
+        # Keep a plain dict: stations may be views into a StationTable
+        self._favorites[uuid] = dict(station)
+        if group:
+            self._groups[uuid] = group
         self._save()
+        self.emit('changed', uuid, True)
         return True
 
+    def add_many(self, stations: Iterable[Dict], group: str = '') -> int:
+        """Add many stations with a single save. Returns how many were new."""
+        added = 0
+        for station in stations:
+            uuid = station.get('stationuuid')
+            if not uuid or uuid in self._favorites:
+                continue
+            self._favorites[uuid] = dict(station)
+            if group:
+                self._groups[uuid] = group
+            added += 1
+        if added:
+            self._save()
+            self.emit('reordered')
+        return added
+
+    def import_playlist(self, path: Path, stations: Iterable[Dict] = (),
+                        group: str = '') -> Tuple[int, int]:
+        """Add the entries of an M3U/M3U8, PLS or XSPF playlist to favorites.
+
+        Entries are matched by stream URL against stations (e.g. the
+        station cache); unmatched ones become custom stations. Returns
+        (matched, custom) counts of the stations added. Raises
+        PlaylistError or OSError if the file cannot be read.
+        """
+        # Playlists may hold either stream URL; a station's main URL wins
+        # over another station's alternate one
+        by_url = {}
+        alternates = {}
+        for station in stations:
+            url = station.get('url')
+            if url:
+                by_url.setdefault(url_key(url), station)
+            alternate = station.get('url_alternate')
+            if alternate:
+                alternates.setdefault(url_key(alternate), station)
+        for key, station in alternates.items():
+            by_url.setdefault(key, station)
+
+        new_stations = []
+        matched = custom = 0
+        seen = set()
+        for entry in read_playlist(path):
+            station = by_url.get(url_key(entry['url']))
+            if station is None:
+                station = custom_station(entry)
+            uuid = station.get('stationuuid')
+            if uuid in seen or uuid in self._favorites:
+                continue
+            seen.add(uuid)
+            new_stations.append(station)
+            if uuid.startswith(CUSTOM_UUID_PREFIX):
+                custom += 1
+            else:
+                matched += 1
+
+        self.add_many(new_stations, group)
+        return matched, custom
+
+    def export_playlist(self, path: Path, group: Optional[str] = None):
+        """Write favorites (or one group) to a playlist; format from the extension."""
+        write_playlist(path, self.get_all(group))
+
     def remove(self, station_uuid: str) -> bool:
         """Remove a station from favorites by UUID. Returns True if removed."""
-        initial_len = len(self._favorites)
-        self._favorites = [s for s in self._favorites if s.get('stationuuid') != station_uuid]
+        if self._favorites.pop(station_uuid, None) is None:
+            return False
 
-        if len(self._favorites) < initial_len:
-            self._save()
-            return True
-        return False
+        self._groups.pop(station_uuid, None)
+        self._save()
+        self.emit('changed', station_uuid, False)
+        return True
 
     def toggle(self, station: Dict) -> bool:
         """Toggle favorite status. Returns True if now favorite, False if removed."""
@@ -62,17 +182,126 @@ class FavoritesManager:
 
     def is_favorite(self, station_uuid: str) -> bool:
         """Check if a station is in favorites."""
-        return any(s.get('stationuuid') == station_uuid for s in self._favorites)
+        return station_uuid in self._favorites
+
+    def is_favorite_many(self, station_uuids: Iterable[str]) -> List[bool]:
+        """Favorite status of many stations at once, in the given order."""
+        favorites = self._favorites
+        return [uuid in favorites for uuid in station_uuids]
+
+    def uuids(self) -> List[str]:
+        """UUIDs of all favorites, in user order."""
+        return list(self._favorites)
+
+    def update_metadata(self, stations: Iterable[Dict]) -> List[str]:
+        """Replace favorites' records with fresh ones; returns the changed UUIDs.
 
-    def get_all(self) -> List[Dict]:
-        """Get all favorite stations."""
-        return self._favorites.copy()
+        Only records that differ are replaced, and the file is only
+        saved if a snapshot field changed.
+        """
+        changed = []
+        snapshot_changed = False
+        for station in stations:
+            uuid = station.get('stationuuid')
+            current = self._favorites.get(uuid)
+            if current is None:
+                continue
+            fresh = dict(station)
+            if fresh == current:
+                continue
+            # _save drops empty fields, so missing, '' and 0 are the same
+            if any((fresh.get(f) or None) != (current.get(f) or None) for f in SNAPSHOT_FIELDS):
+                snapshot_changed = True
+            self._favorites[uuid] = fresh
+            changed.append(uuid)
+
+        if snapshot_changed:
+            self._save()
+        if changed:
+            self.emit('updated')
+        return changed
+
+    def get(self, station_uuid: str) -> Optional[Dict]:
+        """A favorite station by UUID."""
+        return self._favorites.get(station_uuid)
+
+    def get_all(self, group: Optional[str] = None) -> List[Dict]:
+        """Get all favorite stations in user order, or those of one group."""
+        if group is None:
+            return list(self._favorites.values())
+        groups = self._groups
+        return [station for uuid, station in self._favorites.items()
+                if groups.get(uuid, '') == group]
 
     def get_count(self) -> int:
         """Get number of favorite stations."""
         return len(self._favorites)
 
+    def move(self, station_uuid: str, position: int) -> bool:
+        """Move a favorite to position in the user order. Returns True if moved."""
+        if station_uuid not in self._favorites:
+            return False
+        uuids = list(self._favorites)
+        uuids.remove(station_uuid)
+        uuids.insert(position, station_uuid)
+        return self.reorder(uuids)
+
+    def reorder(self, station_uuids: List[str]) -> bool:
+        """Put favorites in the given order; unlisted ones keep their order at the end."""
+        favorites = self._favorites
+        order = [uuid for uuid in dict.fromkeys(station_uuids) if uuid in favorites]
+        placed = set(order)
+        order += [uuid for uuid in favorites if uuid not in placed]
+        if order == list(favorites):
+            return False
+
+        self._favorites = {uuid: favorites[uuid] for uuid in order}
+        self._save()
+        self.emit('reordered')
+        return True
+
+    def get_group(self, station_uuid: str) -> str:
+        """Group of a favorite ("" if ungrouped)."""
+        return self._groups.get(station_uuid, '')
+
+    def set_group(self, station_uuid: str, group: str) -> bool:
+        """Put a favorite in a group ("" to ungroup). Returns True if changed."""
+        if station_uuid not in self._favorites or self.get_group(station_uuid) == group:
+            return False
+        if group:
+            self._groups[station_uuid] = group
+        else:
+            del self._groups[station_uuid]
+        self._save()
+        self.emit('reordered')
+        return True
+
+    def groups(self) -> List[str]:
+        """Names of the groups in use, in order of first appearance."""
+        groups = self._groups
+        return list(dict.fromkeys(groups[uuid] for uuid in self._favorites if uuid in groups))
+
+    def rename_group(self, old_name: str, new_name: str):
+        """Rename a group (or merge it into another)."""
+        changed = False
+        for uuid, group in list(self._groups.items()):
+            if group == old_name:
+                if new_name:
+                    self._groups[uuid] = new_name
+                else:
+                    del self._groups[uuid]
+                changed = True
+        if changed:
+            self._save()
+            self.emit('reordered')
+
+    def remove_group(self, group: str):
+        """Ungroup the favorites of a group; they stay favorites."""
+        self.rename_group(group, '')
+
     def clear(self):
         """Remove all favorites."""
-        self._favorites = []
+        self._favorites = {}
+        self._groups = {}
         self._save()
+        self.emit('reordered')
@@ -0,0 +1,226 @@
+"""
+Background station fetching for PyRadio.
+Runs RadioBrowser requests on a thread pool and hands the results
+back to the GTK main loop.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor, Future
+import sqlite3
+from typing import Callable, Dict, List, Optional
+
+from gi.repository import GLib
+
+from .station_fetcher import FetchError, StationFetcher
+from .station_store import StationStoreWriter
+
+
+class FetchWorker:
+    """Runs station fetches off the main loop.
+
+    Every call to a fetch method starts a new generation. Results from an
+    older generation are dropped, so pressing Refresh again effectively
+    cancels whatever was still in flight.
+    """
+
+    def __init__(self, fetcher: StationFetcher, max_workers: int = 4):
+        self.fetcher = fetcher
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='pyradio-fetch')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._futures: List[Future] = []
+        self._closed = False
+
+    def fetch_mixed(self, on_progress: Callable[[str], None],
+                    on_done: Callable[[List[Dict]], None]):
+        """Fetch Dutch and international top stations concurrently.
+
+        on_progress(message) and on_done(stations) are always called on
+        the main loop, and never for a superseded fetch.
+        """
+        generation = self._begin()
+
+        jobs = [
+            ('Dutch stations', self.fetcher.fetch_dutch_stations, 500),
+            ('international stations', self.fetcher.fetch_top_stations, 150),
+        ]
+        results: Dict[str, List[Dict]] = {}
+
+        def job_done(label: str, future: Future):
+            if future.cancelled():
+                return
+            try:
+                stations = future.result()
+            except Exception as e:
+                print(f"Station fetch error ({label}): {e}")
+                stations = []
+
+            with self._lock:
+                if generation != self._generation:
+                    return
+                results[label] = stations
+                finished = len(results)
+
+            self._post(generation, on_progress,
+                       f"Fetched {len(stations)} {label} ({finished}/{len(jobs)})...")
+
+            if finished == len(jobs):
+                # Keep the original priority order: Dutch stations first
+                merged = StationFetcher.merge_stations(
+                    *(results[label] for label, _, _ in jobs)
+                )
+                self._post(generation, on_done, merged)
+
+        futures = [self._executor.submit(func, limit) for _, func, limit in jobs]
+        with self._lock:
+            self._futures.extend(futures)
+        # Callbacks are attached outside the lock: they run immediately
+        # if the future has already finished.
+        for (label, _, _), future in zip(jobs, futures):
+            future.add_done_callback(lambda f, label=label: job_done(label, f))
+
+    def sync_catalogue(self, cache_writer: StationStoreWriter,
+                       on_page: Callable[[List[Dict]], None],
+                       on_done: Callable[[int], None]):
+        """Page through the full catalogue, writing each page to the cache.
+
+        on_page(stations) is called on the main loop for every page as it
+        arrives; on_done(total) once the cache has been committed. A
+        superseded sync stops after its current page and discards its
+        partial cache. A page that fails discards the partial cache too,
+        and on_done(0) is called.
+        """
+        generation = self._begin()
+
+        def run():
+            seen_uuids = set()
+            try:
+                for page in self.fetcher.iter_all_stations():
+                    if generation != self._generation:
+                        cache_writer.abort()
+                        return
+                    # Offset paging can repeat a station if the catalogue
+                    # changes between pages
+                    page = [s for s in page if s['stationuuid'] not in seen_uuids]
+                    seen_uuids.update(s['stationuuid'] for s in page)
+                    cache_writer.write_batch(page)
+                    self._post(generation, on_page, page)
+            except (FetchError, sqlite3.Error) as e:
+                print(f"Catalogue sync failed: {e}")
+                cache_writer.abort()
+                self._post(generation, on_done, 0)
+                return
+
+            if generation != self._generation:
+                cache_writer.abort()
+                return
+            if cache_writer.count:
+                cache_writer.commit()
+            else:
+                cache_writer.abort()
+            self._post(generation, on_done, cache_writer.count)
+
+        def sync_done(future: Future):
+            # A sync cancelled before it started still holds an open cache file
+            if future.cancelled():
+                cache_writer.abort()
+
+        future = self._executor.submit(run)
+        future.add_done_callback(sync_done)
+        with self._lock:
+            self._futures.append(future)
+
+    def sync_changes(self, stations: List[Dict], last_change_uuid: str,
+                     on_progress: Callable[[str], None],
+                     on_done: Callable[..., None],
+                     add_new: bool = False):
+        """Bring a cached station list up to date with the changed-stations feed.
+
+        on_done(stations, marker, updated, removed_uuids) receives the
+        merged list, the new change marker and the delta that produced
+        it: the current records of the changed stations and the UUIDs of
+        those that are gone. It gets (None, None, None, None) if a delta
+        sync was not possible and the caller should fall back to a full
+        fetch.
+        """
+        generation = self._begin()
+
+        def run():
+            try:
+                result = self.fetcher.fetch_changes(last_change_uuid)
+                if result is None:
+                    self._post(generation, on_done, None, None, None, None)
+                    return
+                changed_uuids, marker = result
+
+                if not add_new:
+                    # Only stations we already have are worth looking up
+                    changed_uuids &= {s.get('stationuuid') for s in stations}
+                current = self.fetcher.fetch_by_uuids(sorted(changed_uuids))
+            except FetchError as e:
+                print(e)
+                self._post(generation, on_done, None, None, None, None)
+                return
+
+            merged = StationFetcher.merge_changes(stations, changed_uuids,
+                                                  current, add_new)
+            # Changed stations without a current record were deleted or broke
+            removed = changed_uuids - {s['stationuuid'] for s in current}
+            self._post(generation, on_progress,
+                       f"Updated {len(current)} stations, removed {len(removed)}")
+            self._post(generation, on_done, merged, marker, current, removed)
+
+        future = self._executor.submit(run)
+        with self._lock:
+            self._futures.append(future)
+
+    def lookup_stations(self, uuids: List[str],
+                        on_done: Callable[[Optional[List[Dict]]], None]):
+        """Fetch the current records of stations by UUID, in batched requests.
+
+        on_done(stations) is called on the main loop, with None if the
+        lookup failed. Lookups are independent of the fetch generations,
+        so a refresh does not cancel them.
+        """
+        def run():
+            try:
+                stations = self.fetcher.fetch_by_uuids(uuids)
+            except FetchError as e:
+                print(e)
+                stations = None
+
+            def dispatch():
+                if not self._closed:
+                    on_done(stations)
+                return False
+            GLib.idle_add(dispatch)
+
+        self._executor.submit(run)
+
+    def cancel(self):
+        """Cancel the current fetch; pending callbacks will not fire."""
+        self._begin()
+
+    def shutdown(self):
+        """Cancel outstanding work and stop the worker threads."""
+        self._closed = True
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def _begin(self) -> int:
+        """Start a new generation, cancelling jobs that have not started yet."""
+        with self._lock:
+            self._generation += 1
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+            return self._generation
+
+    def _post(self, generation: int, callback: Callable, *args):
+        """Run callback on the main loop if generation is still current."""
+        def dispatch():
+            if generation == self._generation:
+                callback(*args)
+            return False
+        GLib.idle_add(dispatch)
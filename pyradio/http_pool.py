@@ -0,0 +1,156 @@
+"""
+Pooled HTTP transport for PyRadio.
+Keeps connections alive between requests, reuses TLS sessions and
+asks for gzip-compressed responses.
+"""
+
+import gzip
+import http.client
+import ssl
+import threading
+import urllib.parse
+from typing import Dict, List, Optional, Tuple
+
+
+class HTTPStatusError(OSError):
+    """Raised when the server answers with a non-200 status."""
+
+    def __init__(self, url: str, status: int, reason: str):
+        super().__init__(f"HTTP {status} {reason} for {url}")
+        self.status = status
+
+
+class _PooledHTTPSConnection(http.client.HTTPSConnection):
+    """HTTPS connection that resumes the last TLS session for its host."""
+
+    def __init__(self, host: str, port: int, timeout: float,
+                 context: ssl.SSLContext, tls_sessions: Dict[str, ssl.SSLSession]):
+        super().__init__(host, port, timeout=timeout, context=context)
+        self._tls_sessions = tls_sessions
+
+    def connect(self):
+        http.client.HTTPConnection.connect(self)
+        self.sock = self._context.wrap_socket(
+            self.sock,
+            server_hostname=self.host,
+            session=self._tls_sessions.get(self.host)
+        )
+        if self.sock.session is not None:
+            self._tls_sessions[self.host] = self.sock.session
+
+
+class _CountingReader:
+    """File-like wrapper that counts the raw bytes read from a response."""
+
+    def __init__(self, response: http.client.HTTPResponse):
+        self._response = response
+        self.count = 0
+
+    def read(self, size: int = -1) -> bytes:
+        data = self._response.read(size if size >= 0 else None)
+        self.count += len(data)
+        return data
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive HTTP(S) connections."""
+
+    def __init__(self, timeout: float = 10, max_idle_per_host: int = 4):
+        self.timeout = timeout
+        self.max_idle_per_host = max_idle_per_host
+
+        self._ssl_context = ssl.create_default_context()
+        self._tls_sessions: Dict[str, ssl.SSLSession] = {}
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+
+        # Transport counters, useful for benchmarking
+        self.stats = {
+            'requests': 0,
+            'connections_opened': 0,
+            'bytes_received': 0,
+            'bytes_decoded': 0,
+        }
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None) -> bytes:
+        """GET url and return the decoded response body."""
+        parts = urllib.parse.urlsplit(url)
+        port = parts.port or (443 if parts.scheme == 'https' else 80)
+        key = (parts.scheme, parts.hostname, port)
+        path = parts.path or '/'
+        if parts.query:
+            path += '?' + parts.query
+
+        request_headers = {'Accept-Encoding': 'gzip', 'Connection': 'keep-alive'}
+        request_headers.update(headers or {})
+
+        for attempt in range(2):
+            conn, reused = self._checkout(key)
+            try:
+                conn.request('GET', path, headers=request_headers)
+                response = conn.getresponse()
+                body = self._read_body(response)
+            except (http.client.HTTPException, OSError):
+                conn.close()
+                # The server may have dropped an idle keep-alive connection;
+                # retry once on a fresh one.
+                if reused and attempt == 0:
+                    continue
+                raise
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._checkin(key, conn)
+
+            if response.status != 200:
+                raise HTTPStatusError(url, response.status, response.reason)
+            return body
+
+    def close(self):
+        """Close all idle connections."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for connections in idle.values():
+            for conn in connections:
+                conn.close()
+
+    def _checkout(self, key: Tuple[str, str, int]) -> Tuple[http.client.HTTPConnection, bool]:
+        """Take an idle connection for key, or open a new one."""
+        with self._lock:
+            self.stats['requests'] += 1
+            connections = self._idle.get(key)
+            if connections:
+                return connections.pop(), True
+            self.stats['connections_opened'] += 1
+
+        scheme, host, port = key
+        if scheme == 'https':
+            conn = _PooledHTTPSConnection(host, port, self.timeout,
+                                          self._ssl_context, self._tls_sessions)
+        else:
+            conn = http.client.HTTPConnection(host, port, timeout=self.timeout)
+        return conn, False
+
+    def _checkin(self, key: Tuple[str, str, int], conn: http.client.HTTPConnection):
+        """Return a connection to the pool for reuse."""
+        with self._lock:
+            connections = self._idle.setdefault(key, [])
+            if len(connections) < self.max_idle_per_host:
+                connections.append(conn)
+                return
+        conn.close()
+
+    def _read_body(self, response: http.client.HTTPResponse) -> bytes:
+        """Read the full body, decompressing gzip as it streams in."""
+        raw = _CountingReader(response)
+        if response.getheader('Content-Encoding', '').lower() == 'gzip':
+            with gzip.GzipFile(fileobj=raw) as decoded:
+                body = decoded.read()
+        else:
+            body = raw.read()
+
+        with self._lock:
+            self.stats['bytes_received'] += raw.count
+            self.stats['bytes_decoded'] += len(body)
+        return body
@@ -41,6 +41,13 @@ class PyRadioApplication(Gtk.Application):
         # Set up keyboard shortcuts
         self.set_accels_for_action('app.quit', ['<Control>q'])
 
+    def do_shutdown(self):
+        """Called once when the application exits."""
+        if self.config:
+            # Write out any saves still waiting in the background
+            self.config.close()
+        Gtk.Application.do_shutdown(self)
+
     def do_activate(self):
         """Called when the application is activated."""
         # Create window if it doesn't exist
@@ -0,0 +1,123 @@
+"""
+RadioBrowser mirror selection for PyRadio.
+Tracks latency and health of the API servers and routes requests to
+the fastest healthy one.
+"""
+
+import http.client
+import threading
+import time
+from typing import List, Optional
+
+from .http_pool import HTTPConnectionPool
+
+
+class Mirror:
+    """Health and latency state for a single API server."""
+
+    def __init__(self, base_url: str):
+        self.base_url = base_url.rstrip('/')
+        self.latency: Optional[float] = None  # Smoothed round-trip time in seconds
+        self.failures = 0                     # Consecutive failures
+        self.open_until = 0.0                 # Circuit breaker open until this time
+
+    def is_available(self, now: float) -> bool:
+        """True unless the circuit breaker is open."""
+        return now >= self.open_until
+
+
+class MirrorManager:
+    """Keeps a list of RadioBrowser servers ordered by health and latency.
+
+    Each mirror has a circuit breaker: after failure_threshold consecutive
+    failures it is skipped for cooldown seconds, then given another try.
+    """
+
+    DEFAULT_MIRRORS = [
+        "https://de1.api.radio-browser.info",
+        "https://de2.api.radio-browser.info",
+        "https://fi1.api.radio-browser.info",
+    ]
+
+    # Cheap endpoint used for latency probes
+    PROBE_ENDPOINT = "json/stats"
+
+    def __init__(self, mirrors: Optional[List[str]] = None,
+                 failure_threshold: int = 2, cooldown: float = 60,
+                 probe_timeout: float = 3):
+        self.mirrors = [Mirror(url) for url in (mirrors or self.DEFAULT_MIRRORS)]
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self._probe_http = HTTPConnectionPool(timeout=probe_timeout, max_idle_per_host=1)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    def candidates(self) -> List[Mirror]:
+        """Mirrors to try for a request, best first.
+
+        Available mirrors come first, fastest first (unprobed mirrors keep
+        their configured order after probed ones). If every breaker is
+        open, all mirrors are returned, soonest-to-recover first.
+        """
+        now = time.monotonic()
+        with self._lock:
+            available = [m for m in self.mirrors if m.is_available(now)]
+            if not available:
+                return sorted(self.mirrors, key=lambda m: m.open_until)
+
+            return sorted(available, key=lambda m: (m.latency is None, m.latency or 0))
+
+    def record_success(self, mirror: Mirror, latency: Optional[float] = None):
+        """Close the mirror's breaker and fold in a latency sample."""
+        with self._lock:
+            mirror.failures = 0
+            mirror.open_until = 0.0
+            if latency is not None:
+                if mirror.latency is None:
+                    mirror.latency = latency
+                else:
+                    # Exponentially weighted moving average
+                    mirror.latency = 0.7 * mirror.latency + 0.3 * latency
+
+    def record_failure(self, mirror: Mirror):
+        """Count a failure, opening the breaker once the threshold is hit."""
+        with self._lock:
+            mirror.failures += 1
+            if mirror.failures >= self.failure_threshold:
+                mirror.open_until = time.monotonic() + self.cooldown
+                print(f"Mirror {mirror.base_url} unavailable, retrying in {self.cooldown:.0f}s")
+
+    def probe_all(self):
+        """Measure the round-trip latency of every mirror."""
+        for mirror in list(self.mirrors):
+            if self._stop_event.is_set():
+                return
+            start = time.monotonic()
+            try:
+                self._probe_http.get(f"{mirror.base_url}/{self.PROBE_ENDPOINT}")
+            except (OSError, http.client.HTTPException):
+                self.record_failure(mirror)
+            else:
+                self.record_success(mirror, time.monotonic() - start)
+
+    def start_probing(self, interval: float = 300):
+        """Probe all mirrors now and then every interval seconds, in the background."""
+        if self._probe_thread and self._probe_thread.is_alive():
+            return
+
+        def run():
+            while not self._stop_event.is_set():
+                self.probe_all()
+                self._stop_event.wait(interval)
+
+        self._stop_event.clear()
+        self._probe_thread = threading.Thread(target=run, name='pyradio-mirror-probe',
+                                              daemon=True)
+        self._probe_thread.start()
+
+    def stop(self):
+        """Stop background probing and close probe connections."""
+        self._stop_event.set()
+        self._probe_http.close()
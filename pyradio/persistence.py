@@ -0,0 +1,138 @@
+"""
+Write-behind persistence for PyRadio.
+Coalesces repeated saves of the same file and writes them atomically
+on a background thread.
+"""
+
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Tuple
+
+
+def atomic_write(path: Path, data: bytes, fsync: bool = False):
+    """Write data to path so readers see either the old or the new file.
+
+    The data goes to a temporary file in the same directory which then
+    replaces path. With fsync, the file and directory are flushed to
+    disk so the new contents also survive a power loss.
+    """
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
+
+    if fsync:
+        dir_fd = os.open(path.parent, os.O_RDONLY)
+        try:
+            os.fsync(dir_fd)
+        finally:
+            os.close(dir_fd)
+
+
+class WriteBehindWriter:
+    """Background writer that coalesces saves per file.
+
+    schedule(path, render) replaces any pending write of path, so a burst
+    of saves (e.g. dragging the volume slider) becomes a single write once
+    the file has been quiet for delay seconds. render() runs on the writer
+    thread and must return the file contents; it should only use data the
+    caller will not modify afterwards.
+    """
+
+    def __init__(self, delay: float = 0.5, fsync: bool = False):
+        self.delay = delay
+        self.fsync = fsync
+
+        # Counters, useful for tests and diagnostics
+        self.scheduled = 0
+        self.writes = 0
+
+        # path -> (due time, version, render)
+        self._pending: Dict[Path, Tuple[float, int, Callable[[], bytes]]] = {}
+        self._version = 0
+        self._written: Dict[Path, int] = {}  # Version last written per path
+        self._cond = threading.Condition()
+        self._write_lock = threading.Lock()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name='pyradio-writer', daemon=True)
+        self._thread.start()
+
+    def schedule(self, path: Path, render: Callable[[], bytes]):
+        """Write render() to path after delay seconds without newer saves."""
+        with self._cond:
+            self._version += 1
+            if self._closed:
+                # Too late for the background thread; write synchronously
+                self._write(path, self._version, render)
+                return
+            self.scheduled += 1
+            self._pending[path] = (time.monotonic() + self.delay, self._version, render)
+            self._cond.notify()
+
+    def discard(self, path: Path):
+        """Drop a pending write of path."""
+        with self._cond:
+            self._pending.pop(path, None)
+
+    def flush(self):
+        """Write everything pending now, on the calling thread."""
+        with self._cond:
+            pending, self._pending = self._pending, {}
+        for path, (_, version, render) in pending.items():
+            self._write(path, version, render)
+
+    def close(self):
+        """Flush pending writes and stop the writer thread."""
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join()
+        self.flush()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed:
+                    if not self._pending:
+                        self._cond.wait()
+                        continue
+                    next_due = min(entry[0] for entry in self._pending.values())
+                    remaining = next_due - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return
+
+                now = time.monotonic()
+                due = {path: entry for path, entry in self._pending.items() if entry[0] <= now}
+                for path in due:
+                    del self._pending[path]
+
+            for path, (_, version, render) in due.items():
+                self._write(path, version, render)
+
+    def _write(self, path: Path, version: int, render: Callable[[], bytes]):
+        with self._write_lock:
+            # A flush on another thread may already have written newer data
+            if version <= self._written.get(path, 0):
+                return
+            self._written[path] = version
+            try:
+                atomic_write(path, render(), self.fsync)
+                self.writes += 1
+            except Exception as e:
+                print(f"Error writing {path.name}: {e}")
@@ -1,57 +1,159 @@
 """
 Audio player using GStreamer for internet radio streaming.
-Handles playback and metadata extraction.
+Handles playback, metadata extraction and pre-rolling of stations
+likely to be played next.
 """
 
+import random
+import time
+
 import gi
 gi.require_version('Gst', '1.0')
-from gi.repository import Gst, GObject
-from typing import Optional, Callable
+from gi.repository import Gst, GObject, GLib
+from typing import Dict, List, Optional, Callable
+
+from .qos import PlaySession
+
+
+class _Standby:
+    """A pipeline pre-rolling a stream, ready to be made audible."""
+
+    def __init__(self, url: str, playbin):
+        self.url = url
+        self.playbin = playbin
+        self.title: Optional[str] = None
+        self.expire_id = None
 
 
 class Player(GObject.GObject):
-    """GStreamer-based audio player for internet radio streams."""
+    """GStreamer-based audio player for internet radio streams.
+
+    Besides the audible pipeline, up to max_standby standby pipelines
+    connect to and buffer stations passed to preroll() (paused, so
+    silent). play() for such a station swaps the standby pipeline in
+    instead of connecting from scratch.
+
+    When a playing stream fails or ends, the player reconnects with
+    exponential backoff, alternating between the station's URLs, and
+    only emits 'error' once retry_budget attempts in a row have failed.
+
+    Each play is recorded in a PlaySession (self.qos): time to first
+    audio, buffering, underruns and bitrate changes. 'qos-changed' is
+    emitted as it changes and 'qos-finished' with the session's dict
+    when the play ends.
+    """
 
     # Custom signals for UI updates
     __gsignals__ = {
         'metadata-changed': (GObject.SignalFlags.RUN_FIRST, None, (str, str)),  # (key, value)
         'state-changed': (GObject.SignalFlags.RUN_FIRST, None, (str,)),  # state name
         'error': (GObject.SignalFlags.RUN_FIRST, None, (str,)),  # error message
+        'reconnecting': (GObject.SignalFlags.RUN_FIRST, None, (int, float)),  # (attempt, delay s)
+        'reconnected': (GObject.SignalFlags.RUN_FIRST, None, (int, float)),  # (attempts, downtime s)
+        'qos-changed': (GObject.SignalFlags.RUN_FIRST, None, ()),
+        'qos-finished': (GObject.SignalFlags.RUN_FIRST, None, (object,)),  # session dict
     }
 
-    def __init__(self):
+    PREROLL_DELAY_MS = 300  # A selection must rest this long to be pre-rolled
+    # Live streams go stale while paused and servers drop idle listeners
+    STANDBY_TIMEOUT_S = 30
+    # Most a standby pipeline buffers before the network read stalls, which
+    # caps the bandwidth pre-rolls take
+    STANDBY_BUFFER_BYTES = 512 * 1024
+
+    # Reconnect delays double from RECONNECT_BASE_S up to RECONNECT_MAX_S;
+    # each is randomized down to half so listeners of a failed server do
+    # not all come back at once
+    RECONNECT_BASE_S = 1.0
+    RECONNECT_MAX_S = 30.0
+    # Playing this long counts as recovered and restores the retry budget
+    RECONNECT_STABLE_S = 10
+
+    def __init__(self, max_standby: int = 2, retry_budget: int = 5):
         super().__init__()
 
         # Initialize GStreamer
         Gst.init(None)
 
         # Create playbin element (handles everything)
-        self.playbin = Gst.ElementFactory.make('playbin', 'player')
+        self.playbin = self._make_playbin('player')
         if not self.playbin:
             raise RuntimeError("Failed to create GStreamer playbin")
 
-        # Connect to bus for messages
-        bus = self.playbin.get_bus()
-        bus.add_signal_watch()
-        bus.connect('message', self._on_message)
+        # Standby pipelines by URL, least recently requested first
+        self.max_standby = max_standby
+        self._standby: Dict[str, _Standby] = {}
+        self._preroll_source_id = None
 
         # Current stream info
         self.current_url: Optional[str] = None
         self.current_title: Optional[str] = None
         self.current_bitrate: Optional[int] = None
         self.is_playing: bool = False
+        # Quality record of the current play
+        self.qos: Optional[PlaySession] = None
+        self._buffering = False  # Paused until the buffer fills
+
+        # Reconnecting: URLs to alternate between, failed attempts in a row,
+        # when the current outage began and totals since play()
+        self.retry_budget = retry_budget
+        self._urls: List[str] = []
+        self._url_index = 0
+        self._attempts = 0
+        self._down_since: Optional[float] = None
+        self._reconnect_source_id = None
+        self._stable_source_id = None
+        self.reconnect_count = 0
+        self.downtime = 0.0
 
-    def play(self, url: str):
-        """Start playing a radio stream."""
+    def _make_playbin(self, name: Optional[str] = None):
+        """A new playbin with its bus watched, or None if it can't be made."""
+        playbin = Gst.ElementFactory.make('playbin', name)
+        if not playbin:
+            return None
+        bus = playbin.get_bus()
+        bus.add_signal_watch()
+        bus.connect('message', self._on_message, playbin)
+        return playbin
+
+    @staticmethod
+    def _release_playbin(playbin):
+        playbin.set_state(Gst.State.NULL)
+        playbin.get_bus().remove_signal_watch()
+
+    def play(self, url: str, alternate_url: Optional[str] = None):
+        """Start playing a radio stream, from a standby pipeline if there is one.
+
+        alternate_url is another URL of the same stream, tried in turns
+        with url when reconnecting.
+        """
         if not url:
             return
 
+        self._cancel_pending_preroll()
+        standby = self._standby.pop(url, None)
+
         # Stop current playback
         self.stop()
 
-        # Set new URI
         self.current_url = url
-        self.playbin.set_property('uri', url)
+        self.qos = PlaySession(url)
+        self._urls = [url] + ([alternate_url] if alternate_url and alternate_url != url else [])
+        self._url_index = 0
+        self._attempts = 0
+        self.reconnect_count = 0
+        self.downtime = 0.0
+
+        if standby is not None:
+            # Already connected and buffered: make it the audible pipeline
+            if standby.expire_id:
+                GLib.source_remove(standby.expire_id)
+            volume = self.playbin.get_property('volume')
+            self._release_playbin(self.playbin)
+            self.playbin = standby.playbin
+            self.playbin.set_property('volume', volume)
+        else:
+            self.playbin.set_property('uri', url)
 
         # Start playback
         ret = self.playbin.set_state(Gst.State.PLAYING)
@@ -61,9 +163,80 @@ class Player(GObject.GObject):
 
         self.is_playing = True
         self.emit('state-changed', 'playing')
+        if standby is not None and standby.title:
+            self.current_title = standby.title
+            self.emit('metadata-changed', 'title', standby.title)
+
+    def preroll(self, url: Optional[str]):
+        """Connect to and buffer a stream that may be played next.
+
+        Requests are debounced, so moving through the station list only
+        pre-rolls where the selection stops. The least recently requested
+        standby pipeline makes room for a new one.
+        """
+        self._cancel_pending_preroll()
+        if url and self.max_standby > 0 and url != self.current_url:
+            self._preroll_source_id = GLib.timeout_add(
+                self.PREROLL_DELAY_MS, self._start_preroll, url)
+
+    def _cancel_pending_preroll(self):
+        if self._preroll_source_id:
+            GLib.source_remove(self._preroll_source_id)
+            self._preroll_source_id = None
+
+    def _start_preroll(self, url: str):
+        self._preroll_source_id = None
+        if url == self.current_url:
+            return False
+
+        standby = self._standby.pop(url, None)
+        if standby is None:
+            while len(self._standby) >= self.max_standby:
+                self._drop_standby(next(iter(self._standby)))
+            playbin = self._make_playbin()
+            if not playbin:
+                return False
+            playbin.set_property('uri', url)
+            playbin.set_property('buffer-size', self.STANDBY_BUFFER_BYTES)
+            # Paused: connects and buffers up to the first audio, silently
+            if playbin.set_state(Gst.State.PAUSED) == Gst.StateChangeReturn.FAILURE:
+                self._release_playbin(playbin)
+                return False
+            standby = _Standby(url, playbin)
+        elif standby.expire_id:
+            GLib.source_remove(standby.expire_id)
+
+        self._standby[url] = standby  # Most recently requested last
+        standby.expire_id = GLib.timeout_add_seconds(
+            self.STANDBY_TIMEOUT_S, self._expire_standby, url)
+        return False
+
+    def _expire_standby(self, url: str):
+        standby = self._standby.get(url)
+        if standby is not None:
+            standby.expire_id = None
+            self._drop_standby(url)
+        return False
+
+    def _drop_standby(self, url: str):
+        """Stop and discard a standby pipeline."""
+        standby = self._standby.pop(url, None)
+        if standby is None:
+            return
+        if standby.expire_id:
+            GLib.source_remove(standby.expire_id)
+        self._release_playbin(standby.playbin)
 
     def stop(self):
         """Stop playback."""
+        self._cancel_reconnect()
+        self._down_since = None
+        self._buffering = False
+        if self.qos is not None:
+            session, self.qos = self.qos, None
+            session.reconnects = self.reconnect_count
+            session.finish()
+            self.emit('qos-finished', session.to_dict())
         self.playbin.set_state(Gst.State.NULL)
         self.is_playing = False
         self.current_url = None
@@ -79,8 +252,14 @@ class Player(GObject.GObject):
         """Get current volume (0.0 to 1.0)."""
         return self.playbin.get_property('volume')
 
-    def _on_message(self, bus, message):
+    def _on_message(self, bus, message, playbin):
         """Handle GStreamer bus messages."""
+        if playbin is not self.playbin:
+            self._on_standby_message(message, playbin)
+            return
+        if not self.is_playing:
+            return  # Left over from a stopped stream; nothing to reconnect
+
         t = message.type
 
         if t == Gst.MessageType.ERROR:
@@ -89,12 +268,15 @@ class Player(GObject.GObject):
             print(error_msg)
             if debug:
                 print(f"Debug info: {debug}")
-            self.emit('error', error_msg)
-            self.stop()
+            if not (self._is_recoverable(err) and self._reconnect()):
+                self.emit('error', error_msg)
+                self.stop()
 
         elif t == Gst.MessageType.EOS:
-            # End of stream (shouldn't happen for radio, but handle anyway)
-            self.stop()
+            # End of stream: for radio, the server dropped the connection
+            if not self._reconnect():
+                self.emit('error', "The station stopped streaming")
+                self.stop()
 
         elif t == Gst.MessageType.TAG:
             # Metadata tags (song title, bitrate, etc.)
@@ -104,7 +286,130 @@ class Player(GObject.GObject):
         elif t == Gst.MessageType.STATE_CHANGED:
             if message.src == self.playbin:
                 old_state, new_state, pending = message.parse_state_changed()
-                # Could emit more granular state changes here if needed
+                if new_state == Gst.State.PLAYING:
+                    self._on_playing()
+
+        elif t == Gst.MessageType.BUFFERING:
+            self._on_buffering(message.parse_buffering())
+
+        elif t == Gst.MessageType.LATENCY:
+            # An element's latency changed; redistribute it over the pipeline
+            self.playbin.recalculate_latency()
+            if self.qos is not None:
+                self.qos.latency_changes += 1
+
+        elif t == Gst.MessageType.CLOCK_LOST:
+            # Going through PAUSED makes the pipeline pick a new clock
+            self.playbin.set_state(Gst.State.PAUSED)
+            self.playbin.set_state(Gst.State.PLAYING)
+            if self.qos is not None:
+                self.qos.clock_lost += 1
+                self.emit('qos-changed')
+
+        elif t == Gst.MessageType.QOS:
+            # A sink dropped or played a buffer late: an audible glitch
+            if self.qos is not None:
+                self.qos.underruns += 1
+                self.emit('qos-changed')
+
+    def _on_buffering(self, percent: int):
+        """Pause while the network buffer refills, so audio does not stutter."""
+        if self.qos is not None:
+            self.qos.buffering(percent)
+        if not self.is_playing:
+            return
+        if percent < 100 and not self._buffering:
+            self._buffering = True
+            self.playbin.set_state(Gst.State.PAUSED)
+            self.emit('qos-changed')
+        elif percent >= 100 and self._buffering:
+            self._buffering = False
+            self.playbin.set_state(Gst.State.PLAYING)
+            self.emit('qos-changed')
+
+    def _on_playing(self):
+        """The audible pipeline reached PLAYING."""
+        now = time.monotonic()
+        if self.qos is not None and self.qos.time_to_audio_ms is None:
+            self.qos.audio_started()
+            self.emit('qos-changed')
+        if self._down_since is not None:
+            self.downtime += now - self._down_since
+            self._down_since = None
+            self.emit('reconnected', self.reconnect_count, self.downtime)
+        if self._attempts and not self._stable_source_id:
+            self._stable_source_id = GLib.timeout_add_seconds(
+                self.RECONNECT_STABLE_S, self._on_stable)
+
+    def _on_stable(self):
+        """Playing long enough since the last reconnect: restore the retry budget."""
+        self._stable_source_id = None
+        self._attempts = 0
+        return False
+
+    @staticmethod
+    def _is_recoverable(err) -> bool:
+        """Whether an error may go away by connecting again (unlike missing codecs)."""
+        return not (err.matches(Gst.StreamError.quark(), Gst.StreamError.CODEC_NOT_FOUND)
+                    or err.matches(Gst.CoreError.quark(), Gst.CoreError.MISSING_PLUGIN))
+
+    def _reconnect(self) -> bool:
+        """Schedule the next reconnect attempt; False once the retry budget is spent."""
+        if not self.is_playing or not self._urls:
+            return False
+        if self._reconnect_source_id:
+            return True  # Already waiting for the next attempt
+        if self._stable_source_id:
+            GLib.source_remove(self._stable_source_id)
+            self._stable_source_id = None
+        if self._attempts >= self.retry_budget:
+            return False
+
+        if self._down_since is None:
+            self._down_since = time.monotonic()
+        delay = min(self.RECONNECT_MAX_S, self.RECONNECT_BASE_S * 2 ** self._attempts)
+        delay = random.uniform(delay / 2, delay)
+        self._attempts += 1
+        self._reconnect_source_id = GLib.timeout_add(int(delay * 1000), self._on_reconnect_due)
+        self.emit('reconnecting', self._attempts, delay)
+        self.emit('state-changed', 'reconnecting')
+        return True
+
+    def _on_reconnect_due(self):
+        """Connect again, to the next of the station's URLs."""
+        self._reconnect_source_id = None
+        self._url_index = (self._url_index + 1) % len(self._urls)
+        self.reconnect_count += 1
+        # READY rather than NULL keeps the pipeline and its audio device
+        self.playbin.set_state(Gst.State.READY)
+        self.playbin.set_property('uri', self._urls[self._url_index])
+        if self.playbin.set_state(Gst.State.PLAYING) == Gst.StateChangeReturn.FAILURE:
+            if not self._reconnect():
+                self.emit('error', "Could not reconnect to the station")
+                self.stop()
+        return False
+
+    def _cancel_reconnect(self):
+        if self._reconnect_source_id:
+            GLib.source_remove(self._reconnect_source_id)
+            self._reconnect_source_id = None
+        if self._stable_source_id:
+            GLib.source_remove(self._stable_source_id)
+            self._stable_source_id = None
+
+    def _on_standby_message(self, message, playbin):
+        """Track a standby pipeline; its failures are dropped silently."""
+        standby = next((s for s in self._standby.values() if s.playbin is playbin), None)
+        if standby is None:
+            return  # Already dropped
+        t = message.type
+        if t in (Gst.MessageType.ERROR, Gst.MessageType.EOS):
+            # The station will connect from scratch if it is played
+            self._drop_standby(standby.url)
+        elif t == Gst.MessageType.TAG:
+            success, title = message.parse_tag().get_string('title')
+            if success and title:
+                standby.title = title
 
     def _process_tags(self, taglist):
         """Process metadata tags from stream."""
@@ -138,6 +443,7 @@ class Player(GObject.GObject):
             bitrate_kbps = bitrate // 1000
             if self.current_bitrate != bitrate_kbps:
                 self.current_bitrate = bitrate_kbps
+                self._record_bitrate(bitrate_kbps)
                 self.emit('metadata-changed', 'bitrate', str(bitrate_kbps))
 
         # Also check for nominal-bitrate (some streams use this)
@@ -145,10 +451,18 @@ class Player(GObject.GObject):
         if success and nominal and not self.current_bitrate:
             bitrate_kbps = nominal // 1000
             self.current_bitrate = bitrate_kbps
+            self._record_bitrate(bitrate_kbps)
             self.emit('metadata-changed', 'bitrate', str(bitrate_kbps))
 
+    def _record_bitrate(self, kbps: int):
+        if self.qos is not None:
+            self.qos.bitrate(kbps)
+
     def cleanup(self):
         """Clean up resources."""
+        self._cancel_pending_preroll()
+        for url in list(self._standby):
+            self._drop_standby(url)
         self.stop()
         self.playbin.set_state(Gst.State.NULL)
 
@@ -0,0 +1,177 @@
+"""
+Playlist import and export for PyRadio.
+Streaming readers and writers for M3U/M3U8, PLS and XSPF, so large
+playlists are never held in memory as a whole.
+"""
+
+import hashlib
+import urllib.parse
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, Optional, TextIO
+from xml.sax.saxutils import escape
+
+FORMATS = ('m3u', 'pls', 'xspf')
+
+# UUID prefix of stations imported from playlists that RadioBrowser does not know
+CUSTOM_UUID_PREFIX = 'custom:'
+
+_XSPF_NS = 'http://xspf.org/ns/0/'
+
+
+class PlaylistError(Exception):
+    """A playlist could not be read."""
+
+
+def url_key(url: str) -> str:
+    """Stream URL normalized for matching (scheme and host lowercased)."""
+    url = url.strip()
+    try:
+        parts = urllib.parse.urlsplit(url)
+    except ValueError:
+        return url
+    return urllib.parse.urlunsplit((parts.scheme.lower(), parts.netloc.lower(),
+                                    parts.path.rstrip('/'), parts.query, ''))
+
+
+def custom_station(entry: Dict) -> Dict:
+    """Station record for a playlist entry not found in the station cache."""
+    digest = hashlib.sha1(url_key(entry['url']).encode('utf-8')).hexdigest()
+    return {
+        'stationuuid': CUSTOM_UUID_PREFIX + digest,
+        'name': entry.get('name') or entry['url'],
+        'url': entry['url'],
+    }
+
+
+def detect_format(path: Path) -> str:
+    """Playlist format of path, from its extension."""
+    suffix = path.suffix.lower().lstrip('.')
+    if suffix in ('m3u', 'm3u8'):
+        return 'm3u'
+    if suffix in FORMATS:
+        return suffix
+    raise PlaylistError(f"Unknown playlist format: {path.name}")
+
+
+def read_playlist(path: Path) -> Iterator[Dict]:
+    """Entries of a playlist file as {'name', 'url'} dicts, one at a time."""
+    fmt = detect_format(path)
+    try:
+        if fmt == 'xspf':
+            with open(path, 'rb') as f:
+                yield from iter_xspf(f)
+            return
+        with open(path, 'r', encoding='utf-8-sig', errors='replace') as f:
+            yield from (iter_m3u(f) if fmt == 'm3u' else iter_pls(f))
+    except ET.ParseError as e:
+        raise PlaylistError(f"Invalid playlist {path.name}: {e}")
+
+
+def write_playlist(path: Path, stations: Iterable[Dict], fmt: Optional[str] = None):
+    """Write stations to a playlist file, in the format of its extension by default."""
+    fmt = fmt or detect_format(path)
+    writer = {'m3u': write_m3u, 'pls': write_pls, 'xspf': write_xspf}[fmt]
+    with open(path, 'w', encoding='utf-8', newline='\n') as f:
+        writer(f, stations)
+
+
+def iter_m3u(lines: Iterable[str]) -> Iterator[Dict]:
+    """Parse (extended) M3U: a URL per line, optionally titled by #EXTINF."""
+    title = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith('#'):
+            if line.upper().startswith('#EXTINF:'):
+                # #EXTINF:<duration> [attributes],<title>
+                _, _, title = line.partition(',')
+                title = title.strip() or None
+            continue
+        yield {'name': title or line, 'url': line}
+        title = None
+
+
+def iter_pls(lines: Iterable[str]) -> Iterator[Dict]:
+    """Parse PLS: numbered FileN/TitleN keys, entry by entry."""
+    number = None
+    entry: Dict = {}
+    for line in lines:
+        key, sep, value = line.strip().partition('=')
+        if not sep:
+            continue
+        key = key.strip().lower()
+        for prefix, field in (('file', 'url'), ('title', 'name')):
+            if key.startswith(prefix) and key[len(prefix):].isdigit():
+                break
+        else:
+            continue
+
+        if key[len(prefix):] != number:
+            # Keys of one entry are grouped; a new number starts a new entry
+            if entry.get('url'):
+                yield _pls_entry(entry)
+            number, entry = key[len(prefix):], {}
+        entry[field] = value.strip()
+
+    if entry.get('url'):
+        yield _pls_entry(entry)
+
+
+def _pls_entry(entry: Dict) -> Dict:
+    return {'name': entry.get('name') or entry['url'], 'url': entry['url']}
+
+
+def iter_xspf(stream) -> Iterator[Dict]:
+    """Parse XSPF incrementally, discarding each track once read."""
+    parents = []
+    for event, element in ET.iterparse(stream, events=('start', 'end')):
+        if event == 'start':
+            parents.append(element)
+            continue
+        parents.pop()
+        if _local_name(element.tag) != 'track':
+            continue
+        fields = {}
+        for child in element:
+            name = _local_name(child.tag)
+            if name in ('location', 'title') and name not in fields and child.text:
+                fields[name] = child.text.strip()
+        # Drop the track from the tree so memory use stays flat
+        if parents:
+            parents[-1].remove(element)
+        if fields.get('location'):
+            yield {'name': fields.get('title') or fields['location'], 'url': fields['location']}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1]
+
+
+def write_m3u(f: TextIO, stations: Iterable[Dict]):
+    f.write('#EXTM3U\n')
+    for station in stations:
+        name = ' '.join(station.get('name', '').split())
+        f.write(f"#EXTINF:-1,{name}\n{station.get('url', '')}\n")
+
+
+def write_pls(f: TextIO, stations: Iterable[Dict]):
+    f.write('[playlist]\n')
+    count = 0
+    for count, station in enumerate(stations, 1):
+        name = ' '.join(station.get('name', '').split())
+        f.write(f"File{count}={station.get('url', '')}\nTitle{count}={name}\nLength{count}=-1\n")
+    # Allowed at the end, which lets the stations be written as they come
+    f.write(f"NumberOfEntries={count}\nVersion=2\n")
+
+
+def write_xspf(f: TextIO, stations: Iterable[Dict]):
+    f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+            f'<playlist version="1" xmlns="{_XSPF_NS}">\n  <trackList>\n')
+    for station in stations:
+        f.write(f"    <track>\n"
+                f"      <location>{escape(station.get('url', ''))}</location>\n"
+                f"      <title>{escape(station.get('name', ''))}</title>\n"
+                f"    </track>\n")
+    f.write('  </trackList>\n</playlist>\n')
@@ -0,0 +1,188 @@
+"""
+Playback quality of service for PyRadio.
+Records how each play went (time to first audio, buffering, underruns,
+bitrate over time) and keeps a rolling history per station.
+"""
+
+import json
+import time
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional
+
+FORMAT_VERSION = 1
+
+SESSIONS_PER_STATION = 20  # Plays remembered per station
+MAX_STATIONS = 500  # Stations remembered, least recently played dropped first
+MAX_TIMELINE = 200  # Bitrate changes recorded per play
+
+
+class PlaySession:
+    """Quality record of one play, from play() to stop.
+
+    Times are taken from a monotonic clock; durations are kept in ms.
+    started_at and ended_at are wall-clock epoch seconds, for export only.
+    A buffering event is the pipeline waiting for data after audio had
+    started (buffering before the first audio counts towards
+    time_to_audio_ms instead).
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        self.started_at = time.time()
+        self._started = time.monotonic()
+        self.time_to_audio_ms: Optional[int] = None
+        self.buffering_events = 0
+        self.buffering_ms = 0
+        self.underruns = 0  # Buffers the audio sink dropped or played late
+        self.clock_lost = 0
+        self.latency_changes = 0
+        self.reconnects = 0
+        self.bitrate_timeline: List[List[int]] = []  # [seconds into the play, kbps]
+        self.ended_at: Optional[float] = None
+        self._ended: Optional[float] = None
+        self._buffering_since: Optional[float] = None
+
+    def audio_started(self):
+        """The pipeline reached PLAYING."""
+        if self.time_to_audio_ms is None:
+            self.time_to_audio_ms = self._ms_since(self._started)
+
+    def buffering(self, percent: int):
+        """A BUFFERING message: percent of the buffer filled."""
+        if self.time_to_audio_ms is None:
+            return
+        if percent < 100 and self._buffering_since is None:
+            self._buffering_since = time.monotonic()
+            self.buffering_events += 1
+        elif percent >= 100 and self._buffering_since is not None:
+            self.buffering_ms += self._ms_since(self._buffering_since)
+            self._buffering_since = None
+
+    def bitrate(self, kbps: int):
+        """The stream bitrate changed."""
+        if len(self.bitrate_timeline) < MAX_TIMELINE:
+            self.bitrate_timeline.append([self._ms_since(self._started) // 1000, kbps])
+
+    def finish(self):
+        """End the play; an unfinished buffering event counts up to now."""
+        if self._buffering_since is not None:
+            self.buffering(100)
+        self.ended_at = time.time()
+        self._ended = time.monotonic()
+
+    @property
+    def listened_ms(self) -> int:
+        """Time since the first audio, until the end of the play."""
+        if self.time_to_audio_ms is None:
+            return 0
+        end = self._ended if self._ended is not None else time.monotonic()
+        return max(0, int((end - self._started) * 1000) - self.time_to_audio_ms)
+
+    @property
+    def rebuffer_ratio(self) -> float:
+        """Share of the listening time spent buffering."""
+        listened = self.listened_ms
+        return self.buffering_ms / listened if listened else 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            'url': self.url,
+            'started_at': self.started_at,
+            'ended_at': self.ended_at,
+            'time_to_audio_ms': self.time_to_audio_ms,
+            'listened_ms': self.listened_ms,
+            'buffering_events': self.buffering_events,
+            'buffering_ms': self.buffering_ms,
+            'rebuffer_ratio': round(self.rebuffer_ratio, 4),
+            'underruns': self.underruns,
+            'clock_lost': self.clock_lost,
+            'latency_changes': self.latency_changes,
+            'reconnects': self.reconnects,
+            'bitrate_timeline': self.bitrate_timeline,
+        }
+
+    @staticmethod
+    def _ms_since(since: float) -> int:
+        return int((time.monotonic() - since) * 1000)
+
+
+def summarize(sessions: Iterable[Dict]) -> Dict:
+    """Aggregate session dicts of one station."""
+    sessions = list(sessions)
+    starts = sorted(s['time_to_audio_ms'] for s in sessions
+                    if s.get('time_to_audio_ms') is not None)
+    listened = sum(s.get('listened_ms', 0) for s in sessions)
+    buffering = sum(s.get('buffering_ms', 0) for s in sessions)
+    return {
+        'plays': len(sessions),
+        'failed_starts': len(sessions) - len(starts),
+        'median_time_to_audio_ms': starts[len(starts) // 2] if starts else None,
+        'buffering_events': sum(s.get('buffering_events', 0) for s in sessions),
+        'rebuffer_ratio': round(buffering / listened, 4) if listened else 0.0,
+        'underruns': sum(s.get('underruns', 0) for s in sessions),
+        'reconnects': sum(s.get('reconnects', 0) for s in sessions),
+        'listened_ms': listened,
+    }
+
+
+class QosStore:
+    """Rolling per-station history of play sessions.
+
+    Keeps the last SESSIONS_PER_STATION sessions of the MAX_STATIONS
+    most recently played stations, keyed by station UUID.
+    """
+
+    def __init__(self):
+        self._sessions: Dict[str, Deque[Dict]] = {}  # Least recently played first
+
+    def add(self, station_uuid: str, session: Dict):
+        """Record a finished session of a station."""
+        sessions = self._sessions.pop(station_uuid, None)
+        if sessions is None:
+            sessions = deque(maxlen=SESSIONS_PER_STATION)
+        sessions.append(session)
+        self._sessions[station_uuid] = sessions
+        while len(self._sessions) > MAX_STATIONS:
+            del self._sessions[next(iter(self._sessions))]
+
+    def sessions(self, station_uuid: str) -> List[Dict]:
+        """Remembered sessions of a station, oldest first."""
+        return list(self._sessions.get(station_uuid, ()))
+
+    def summary(self, station_uuid: str) -> Optional[Dict]:
+        """Aggregated stats of a station, or None if it has no sessions."""
+        sessions = self._sessions.get(station_uuid)
+        return summarize(sessions) if sessions else None
+
+    def copy(self) -> 'QosStore':
+        """Copy whose history does not change with this store's."""
+        store = QosStore()
+        store._sessions = {uuid: deque(sessions, maxlen=SESSIONS_PER_STATION)
+                           for uuid, sessions in self._sessions.items()}
+        return store
+
+    def to_bytes(self, pretty: bool = False) -> bytes:
+        """Serialize the history, with per-station summaries for analysis."""
+        stations = {
+            uuid: {'summary': summarize(sessions), 'sessions': list(sessions)}
+            for uuid, sessions in self._sessions.items()
+        }
+        state = {'version': FORMAT_VERSION, 'exported_at': time.time(), 'stations': stations}
+        if pretty:
+            return json.dumps(state, indent=2).encode('utf-8')
+        return json.dumps(state, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, data: bytes) -> 'QosStore':
+        """Load a serialized history (empty if unusable)."""
+        store = cls()
+        try:
+            state = json.loads(data)
+            if state.get('version') != FORMAT_VERSION:
+                return store
+            for uuid, entry in state['stations'].items():
+                for session in entry['sessions']:
+                    store.add(uuid, session)
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return cls()
+        return store
@@ -0,0 +1,272 @@
+"""
+Local station search for PyRadio.
+An inverted token index over station names, tags, countries and
+languages with prefix matching, typo tolerance through trigrams and
+ranking that favours popular stations.
+"""
+
+import base64
+import json
+import math
+import re
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, List, Mapping, Optional, Set
+
+FIELDS = ('name', 'tags', 'country', 'language')
+# How much a match in each field counts, in FIELDS order
+FIELD_WEIGHTS = (4.0, 2.0, 1.0, 1.0)
+
+EXACT, PREFIX, FUZZY = 1.0, 0.6, 0.3  # Weight of each kind of term match
+VOTES_WEIGHT = 0.5  # Score added per factor e of votes
+
+FORMAT_VERSION = 1
+
+_WORD_RE = re.compile(r'\w+')
+_PARTS_RE = re.compile(r'[^\W\d_]+|\d+')  # Letter and digit runs
+
+
+def fold(text: str) -> str:
+    """Fold text for matching: case-insensitive and without accents."""
+    text = text.casefold()
+    if text.isascii():
+        return text
+    return ''.join(c for c in unicodedata.normalize('NFKD', text)
+                   if not unicodedata.combining(c))
+
+
+def tokenize(text: str) -> List[str]:
+    """Words of text, folded."""
+    return _WORD_RE.findall(fold(text))
+
+
+def index_tokens(text: str) -> Set[str]:
+    """Tokens under which text is indexed.
+
+    Besides the words themselves, letter/digit runs inside words and
+    pairs of adjacent words are indexed, so "Radio2" is found by
+    "radio 2" and "NPO Radio 2" by "npo radio2".
+    """
+    words = tokenize(text)
+    tokens = set(words)
+    for word in words:
+        parts = _PARTS_RE.findall(word)
+        if len(parts) > 1:
+            tokens.update(parts)
+    for first, second in zip(words, words[1:]):
+        tokens.add(first + second)
+    return tokens
+
+
+def trigrams(token: str) -> Set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Edit distance of a and b counting transpositions, or limit + 1 if above limit."""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            cost = ca != cb
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (previous2 is not None and i > 1 and j > 1
+                    and ca == b[j - 2] and a[i - 2] == cb):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SearchIndex:
+    """Inverted index over a list of stations.
+
+    Stations are identified by their position in the list the index was
+    built from; search() returns positions, best match first. Stations
+    can be added in batches as they arrive.
+    """
+
+    def __init__(self):
+        self.uuids: List[str] = []
+        self._votes = array('i')
+        # token -> postings, each station position * len(FIELDS) + field
+        self._postings: Dict[str, array] = {}
+        self._sorted_tokens: Optional[List[str]] = None
+        self._trigrams: Dict[str, List[str]] = defaultdict(list)
+        self._untrigrammed: List[str] = []  # Tokens not in _trigrams yet
+
+    @classmethod
+    def build(cls, stations: Iterable[Mapping]) -> 'SearchIndex':
+        index = cls()
+        index.add(stations)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.uuids)
+
+    def add(self, stations: Iterable[Mapping]):
+        """Index stations, appended after the ones already indexed."""
+        postings = self._postings
+        # Countries, languages and tag lists repeat a lot; tokenize each once
+        token_cache: Dict[str, Set[str]] = {}
+        for station in stations:
+            doc = len(self.uuids) * len(FIELDS)
+            self.uuids.append(station.get('stationuuid') or '')
+            self._votes.append(int(station.get('votes') or 0))
+            for field_number, field in enumerate(FIELDS):
+                value = station.get(field) or ''
+                if not value:
+                    continue
+                if field_number:
+                    tokens = token_cache.get(value)
+                    if tokens is None:
+                        tokens = token_cache[value] = index_tokens(value)
+                else:
+                    tokens = index_tokens(value)
+                for token in tokens:
+                    posting = postings.get(token)
+                    if posting is None:
+                        posting = postings[token] = array('I')
+                        self._untrigrammed.append(token)
+                        self._sorted_tokens = None
+                    posting.append(doc + field_number)
+
+    def search(self, text: str, limit: Optional[int] = None) -> List[int]:
+        """Positions of the stations matching every word of text, best first."""
+        scores: Optional[Dict[int, float]] = None
+        for term in dict.fromkeys(tokenize(text)):
+            term_scores = self._match_term(term)
+            if scores is None:
+                scores = term_scores
+            else:
+                scores = {doc: score + term_scores[doc]
+                          for doc, score in scores.items() if doc in term_scores}
+            if not scores:
+                return []
+        if scores is None:
+            return []
+
+        votes = self._votes
+        ranked = sorted(scores, key=lambda doc: scores[doc] + VOTES_WEIGHT * math.log1p(
+            max(votes[doc], 0)), reverse=True)
+        return ranked[:limit] if limit is not None else ranked
+
+    def _match_term(self, term: str) -> Dict[int, float]:
+        """Score per station for one query word: its best matching token."""
+        scores: Dict[int, float] = {}
+        self._score_token(scores, term, EXACT)
+
+        # Prefixes; a single letter would expand to most of the vocabulary
+        if len(term) >= 2:
+            tokens = self._tokens()
+            for position in range(bisect_left(tokens, term), len(tokens)):
+                token = tokens[position]
+                if not token.startswith(term):
+                    break
+                if token != term:
+                    self._score_token(scores, token, PREFIX)
+
+        if not scores and len(term) >= 4:
+            limit = 1 if len(term) <= 5 else 2
+            for token in self._fuzzy_candidates(term, limit):
+                if edit_distance(term, token, limit) <= limit:
+                    self._score_token(scores, token, FUZZY)
+        return scores
+
+    def _score_token(self, scores: Dict[int, float], token: str, weight: float):
+        posting = self._postings.get(token)
+        if posting is None:
+            return
+        field_count = len(FIELDS)
+        for entry in posting:
+            doc, field_number = divmod(entry, field_count)
+            score = weight * FIELD_WEIGHTS[field_number]
+            if score > scores.get(doc, 0.0):
+                scores[doc] = score
+
+    def _tokens(self) -> List[str]:
+        """All indexed tokens, sorted for prefix lookups."""
+        if self._sorted_tokens is None:
+            self._sorted_tokens = sorted(self._postings)
+        return self._sorted_tokens
+
+    def _fuzzy_candidates(self, term: str, limit: int) -> Set[str]:
+        """Tokens sharing enough trigrams with term to be within limit edits."""
+        if self._untrigrammed:
+            for token in self._untrigrammed:
+                if len(token) >= 3:
+                    for trigram in trigrams(token):
+                        self._trigrams[trigram].append(token)
+            self._untrigrammed = []
+
+        term_trigrams = trigrams(term)
+        # Each edit changes at most three trigrams
+        needed = max(1, len(term_trigrams) - 3 * limit)
+        shared: Dict[str, int] = defaultdict(int)
+        for trigram in term_trigrams:
+            for token in self._trigrams.get(trigram, ()):
+                if abs(len(token) - len(term)) <= limit:
+                    shared[token] += 1
+        return {token for token, count in shared.items() if count >= needed}
+
+    def to_bytes(self, timestamp: float) -> bytes:
+        """Serialize the index for the station cache stamped timestamp."""
+        tokens = list(self._postings)
+        offsets = array('I', [0])
+        postings = array('I')
+        for token in tokens:
+            postings.extend(self._postings[token])
+            offsets.append(len(postings))
+        return json.dumps({
+            'version': FORMAT_VERSION,
+            'timestamp': timestamp,
+            'uuids': self.uuids,
+            'votes': base64.b64encode(self._votes.tobytes()).decode('ascii'),
+            'tokens': tokens,
+            'offsets': base64.b64encode(offsets.tobytes()).decode('ascii'),
+            'postings': base64.b64encode(postings.tobytes()).decode('ascii'),
+        }, separators=(',', ':')).encode('utf-8')
+
+    @classmethod
+    def from_bytes(cls, data: bytes, timestamp: float,
+                   stations: Optional[List[Mapping]] = None) -> Optional['SearchIndex']:
+        """Load a serialized index, or None if it is not for this cache.
+
+        With stations given, the index must have been built from exactly
+        these stations in this order.
+        """
+        try:
+            state = json.loads(data)
+            if state.get('version') != FORMAT_VERSION or state.get('timestamp') != timestamp:
+                return None
+            uuids = state['uuids']
+            if stations is not None and (
+                    len(uuids) != len(stations)
+                    or any(u != s.get('stationuuid') for u, s in zip(uuids, stations))):
+                return None
+
+            index = cls()
+            index.uuids = uuids
+            index._votes.frombytes(base64.b64decode(state['votes']))
+            offsets = array('I')
+            offsets.frombytes(base64.b64decode(state['offsets']))
+            postings = array('I')
+            postings.frombytes(base64.b64decode(state['postings']))
+        except (ValueError, KeyError, TypeError):
+            return None
+
+        tokens = state['tokens']
+        if len(offsets) != len(tokens) + 1 or len(index._votes) != len(uuids):
+            return None
+        index._postings = {
+            token: postings[offsets[i]:offsets[i + 1]] for i, token in enumerate(tokens)
+        }
+        index._untrigrammed = list(tokens)
+        return index
@@ -0,0 +1,204 @@
+"""
+Compact binary snapshot of the station cache for fast startup.
+
+Layout (all integers in the byte order recorded in the header):
+
+    header      magic, version, byte order, timestamp, count,
+                string count, body size, CRC32 of the body
+    columns     one uint32 array per string column (indexes into the
+                string table), one int32 array per numeric column
+    offsets     uint32 array of string start offsets (+1 end offset)
+    strings     UTF-8 string data, each distinct string stored once and
+                followed by a NUL byte
+
+The file is opened with mmap and records are decoded only when they
+are accessed.
+"""
+
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional
+
+from .persistence import atomic_write
+from .station_store import COLUMNS
+from .station_table import StationTable
+
+MAGIC = b'PYRC'
+VERSION = 3
+
+# magic, version, little-endian flag, timestamp, count, string count, body size, crc32
+HEADER = struct.Struct('<4sHHdIIQI')
+
+NUMERIC_COLUMNS = ('votes', 'bitrate')
+STRING_COLUMNS = tuple(c for c in COLUMNS if c not in NUMERIC_COLUMNS)
+
+_LITTLE_ENDIAN = 1 if sys.byteorder == 'little' else 0
+
+
+def read_header(path: Path) -> Optional[tuple]:
+    """Read only the snapshot header: (timestamp, count), or None if unusable."""
+    try:
+        with open(path, 'rb') as f:
+            data = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(data) < HEADER.size:
+        return None
+
+    magic, version, little_endian, timestamp, count, _, _, _ = HEADER.unpack(data)
+    if magic != MAGIC or version != VERSION or little_endian != _LITTLE_ENDIAN:
+        return None
+    return timestamp, count
+
+
+def encode_snapshot(stations: Sequence[Dict], timestamp: float) -> bytes:
+    """Encode stations as a binary snapshot."""
+    strings: Dict[str, int] = {}
+
+    def intern(value) -> int:
+        value = value or ''
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    columns = []
+    for column in STRING_COLUMNS:
+        columns.append(array('I', (intern(s.get(column)) for s in stations)))
+    for column in NUMERIC_COLUMNS:
+        columns.append(array('i', (int(s.get(column) or 0) for s in stations)))
+
+    offsets = array('I', [0])
+    blob = bytearray()
+    for value in strings:  # dicts keep insertion order, i.e. index order
+        # NUL separators let the whole table be decoded with one split()
+        blob += value.replace('\0', '').encode('utf-8') + b'\0'
+        offsets.append(len(blob))
+
+    body = b''.join(c.tobytes() for c in columns) + offsets.tobytes() + bytes(blob)
+    header = HEADER.pack(MAGIC, VERSION, _LITTLE_ENDIAN, timestamp, len(stations),
+                         len(strings), len(body), zlib.crc32(body))
+    return header + body
+
+
+def write_snapshot(path: Path, stations: Sequence[Dict], timestamp: float):
+    """Write stations to a binary snapshot, replacing path atomically."""
+    atomic_write(path, encode_snapshot(stations, timestamp))
+
+
+class StationSnapshot(Sequence):
+    """Read-only, lazily decoded view of a binary station snapshot."""
+
+    def __init__(self, path: Path):
+        self._views: List[memoryview] = []
+        self._file = open(path, 'rb')
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            self._file.close()
+            raise ValueError(f"Invalid station snapshot: {path}")
+
+        try:
+            (magic, version, little_endian, self.timestamp, self._count,
+             string_count, body_size, checksum) = HEADER.unpack_from(self._mmap, 0)
+            if magic != MAGIC or version != VERSION or little_endian != _LITTLE_ENDIAN:
+                raise ValueError(f"Unsupported station snapshot: {path}")
+            if HEADER.size + body_size != len(self._mmap):
+                raise ValueError(f"Truncated station snapshot: {path}")
+
+            mapped = self._view(memoryview(self._mmap))
+            body = self._view(mapped[HEADER.size:])
+            if zlib.crc32(body) != checksum:
+                raise ValueError(f"Corrupt station snapshot: {path}")
+        except (ValueError, struct.error):
+            self.close()
+            raise
+
+        # Typed views straight onto the mapped file, nothing is copied
+        column_bytes = self._count * 4
+        self._columns = {}
+        offset = 0
+        for column in STRING_COLUMNS:
+            self._columns[column] = self._view(body[offset:offset + column_bytes].cast('I'))
+            offset += column_bytes
+        for column in NUMERIC_COLUMNS:
+            self._columns[column] = self._view(body[offset:offset + column_bytes].cast('i'))
+            offset += column_bytes
+
+        offsets_bytes = (string_count + 1) * 4
+        self._offsets = self._view(body[offset:offset + offsets_bytes].cast('I'))
+        self._strings = self._view(body[offset + offsets_bytes:])
+        self._decoded: Dict[int, str] = {}
+        self._column_list = [(c, self._columns[c], c in NUMERIC_COLUMNS) for c in COLUMNS]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._count))]
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("station index out of range")
+
+        decoded = self._decoded
+        station = {}
+        for column, values, numeric in self._column_list:
+            value = values[index]
+            if not numeric:
+                string = decoded.get(value)
+                value = string if string is not None else self._string(value)
+            station[column] = value
+        return station
+
+    def __iter__(self) -> Iterator[Dict]:
+        columns = self._decode_columns()
+        for row in zip(*(columns[c] for c in COLUMNS)):
+            yield dict(zip(COLUMNS, row))
+
+    def to_list(self) -> List[Dict]:
+        """Decode every station."""
+        return list(self)
+
+    def to_table(self) -> StationTable:
+        """Decode every station into a StationTable."""
+        return StationTable.from_columns(self._decode_columns())
+
+    def _decode_columns(self) -> Dict[str, list]:
+        """Decode all columns in bulk rather than record by record."""
+        strings = bytes(self._strings).decode('utf-8').split('\0')
+        return {
+            column: values.tolist() if numeric else [strings[i] for i in values]
+            for column, values, numeric in self._column_list
+        }
+
+    def close(self):
+        """Release the memory map."""
+        self._columns = {}
+        self._column_list = []
+        self._offsets = self._strings = None
+        for view in reversed(self._views):
+            view.release()
+        self._views = []
+        self._mmap.close()
+        self._file.close()
+
+    def _view(self, view: memoryview) -> memoryview:
+        """Track a view of the map so close() can release it."""
+        self._views.append(view)
+        return view
+
+    def _string(self, index: int) -> str:
+        """Decode a string table entry, caching repeated values."""
+        value = self._decoded.get(index)
+        if value is None:
+            start, end = self._offsets[index], self._offsets[index + 1] - 1
+            value = self._decoded[index] = bytes(self._strings[start:end]).decode('utf-8')
+        return value
@@ -3,25 +3,42 @@ Radio station fetcher using RadioBrowser API.
 Fetches stations from the public RadioBrowser directory.
 """
 
+import http.client
 import json
-import urllib.request
 import urllib.parse
-import urllib.error
-from typing import List, Dict, Optional
+import threading
+from typing import List, Dict, Iterator, Optional, Sequence, Set, Tuple
+
+from .http_pool import HTTPConnectionPool, HTTPStatusError
+from .mirrors import MirrorManager
+from .station_table import StationTable
+
+
+class FetchError(Exception):
+    """Raised when a RadioBrowser request fails on every mirror."""
 
 
 class StationFetcher:
     """Fetches radio stations from RadioBrowser API."""
 
-    # RadioBrowser API base URL (uses DNS-based load balancing)
-    API_BASE = "https://de1.api.radio-browser.info/json"
-
-    def __init__(self):
+    def __init__(self, mirrors: Optional[List[str]] = None):
         self.user_agent = "PyRadio/1.0"
+        # Shared by all fetcher methods (and worker threads)
+        self.http = HTTPConnectionPool(timeout=10)
+        # RadioBrowser API servers, fastest healthy one first
+        self.mirrors = MirrorManager(mirrors)
 
-    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict]:
-        """Make HTTP request to RadioBrowser API."""
-        url = f"{self.API_BASE}/{endpoint}"
+        # Newest change seen in fetched data, as (lastchangetime, changeuuid).
+        # The changeuuid is the marker for incremental syncs.
+        self._latest_change: Tuple[str, str] = ('', '')
+        self._change_lock = threading.Lock()
+
+    def _request(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Make HTTP request to RadioBrowser API, failing over between mirrors.
+
+        Raises FetchError if no mirror returns a usable response.
+        """
+        path = f"json/{endpoint}"
 
         if params:
             # Build query string
@@ -29,26 +46,45 @@ class StationFetcher:
             for key, value in params.items():
                 query_parts.append(f"{key}={urllib.parse.quote(str(value))}")
             if query_parts:
-                url += "?" + "&".join(query_parts)
+                path += "?" + "&".join(query_parts)
 
-        try:
-            req = urllib.request.Request(url)
-            req.add_header('User-Agent', self.user_agent)
+        last_error: Optional[Exception] = None
+        for mirror in self.mirrors.candidates():
+            url = f"{mirror.base_url}/{path}"
+            try:
+                data = self.http.get(url, headers={'User-Agent': self.user_agent})
+            except HTTPStatusError as e:
+                if e.status < 500:
+                    # The request itself is bad; another mirror won't help
+                    raise FetchError(f"Error fetching stations: {e}") from e
+                last_error = e
+                self.mirrors.record_failure(mirror)
+                continue
+            except (OSError, http.client.HTTPException) as e:
+                last_error = e
+                self.mirrors.record_failure(mirror)
+                continue
 
-            with urllib.request.urlopen(req, timeout=10) as response:
-                data = response.read()
+            self.mirrors.record_success(mirror)
+            try:
                 return json.loads(data.decode('utf-8'))
-        except urllib.error.URLError as e:
-            print(f"Network error fetching stations: {e}")
-            return []
-        except json.JSONDecodeError as e:
-            print(f"Error parsing station data: {e}")
+            except (json.JSONDecodeError, UnicodeDecodeError) as e:
+                raise FetchError(f"Error parsing station data: {e}") from e
+
+        raise FetchError(f"Network error fetching stations: {last_error}")
+
+    def _make_request(self, endpoint: str, params: Optional[Dict] = None) -> List[Dict]:
+        """Make HTTP request to RadioBrowser API, returning [] on failure."""
+        try:
+            return self._request(endpoint, params)
+        except FetchError as e:
+            print(e)
             return []
         except Exception as e:
             print(f"Unexpected error fetching stations: {e}")
             return []
 
-    def fetch_dutch_stations(self, limit: int = 500) -> List[Dict]:
+    def fetch_dutch_stations(self, limit: int = 500) -> StationTable:
         """Fetch ALL Dutch radio stations (increased limit to ensure comprehensive coverage)."""
         stations = self._make_request("stations/search", {
             "country": "The Netherlands",
@@ -59,7 +95,7 @@ class StationFetcher:
         })
         return self._normalize_stations(stations)
 
-    def fetch_top_stations(self, limit: int = 200) -> List[Dict]:
+    def fetch_top_stations(self, limit: int = 200) -> StationTable:
         """Fetch top-voted stations from all countries."""
         stations = self._make_request("stations/search", {
             "order": "votes",
@@ -69,10 +105,10 @@ class StationFetcher:
         })
         return self._normalize_stations(stations)
 
-    def search_stations(self, query: str, limit: int = 100) -> List[Dict]:
+    def search_stations(self, query: str, limit: int = 100) -> StationTable:
         """Search for stations by name."""
         if not query.strip():
-            return []
+            return StationTable()
 
         stations = self._make_request("stations/search", {
             "name": query,
@@ -83,7 +119,7 @@ class StationFetcher:
         })
         return self._normalize_stations(stations)
 
-    def fetch_by_country(self, country: str, limit: int = 500) -> List[Dict]:
+    def fetch_by_country(self, country: str, limit: int = 500) -> StationTable:
         """Fetch stations from a specific country."""
         stations = self._make_request("stations/search", {
             "country": country,
@@ -104,7 +140,7 @@ class StationFetcher:
         except Exception:
             return []
 
-    def fetch_mixed_stations(self) -> List[Dict]:
+    def fetch_mixed_stations(self) -> StationTable:
         """Fetch a mix of Dutch stations and international top stations."""
         # Get ALL Dutch stations first (prioritized) - increased to 500 to ensure complete coverage
         dutch = self.fetch_dutch_stations(500)
@@ -112,28 +148,151 @@ class StationFetcher:
         # Get international top stations
         international = self.fetch_top_stations(150)
 
-        # Combine, avoiding duplicates
-        seen_uuids = set()
-        result = []
+        return self.merge_stations(dutch, international)
+
+    def iter_all_stations(self, page_size: int = 1000) -> Iterator[StationTable]:
+        """Page through the full RadioBrowser catalogue.
+
+        Yields one normalized page at a time so callers can process and
+        store stations without holding the whole catalogue in memory.
+        Raises FetchError if a page cannot be fetched, so a failed page is
+        never mistaken for the end of the catalogue.
+        """
+        offset = 0
+        while True:
+            # Order by name so paging stays stable while votes change
+            page = self._request("stations", {
+                "order": "name",
+                "offset": offset,
+                "limit": page_size,
+                "hidebroken": "true"
+            })
+            if not page:
+                break
+
+            yield self._normalize_stations(page)
+
+            if len(page) < page_size:
+                break
+            offset += len(page)
 
-        for station in dutch + international:
+    def change_marker(self) -> Optional[str]:
+        """The changeuuid of the newest station change fetched so far."""
+        with self._change_lock:
+            return self._latest_change[1] or None
+
+    def fetch_changes(self, last_change_uuid: str, page_size: int = 10000,
+                      max_changes: int = 50000) -> Optional[Tuple[Set[str], str]]:
+        """Fetch the UUIDs of stations changed since last_change_uuid.
+
+        Returns (changed_uuids, new_marker), or None if there are more than
+        max_changes changes and a full re-download is cheaper, or if a full
+        page has no marker to continue from. Raises FetchError on network
+        failure.
+        """
+        changed_uuids: Set[str] = set()
+        marker = last_change_uuid
+        total = 0
+
+        while True:
+            changes = self._request("stations/changed", {
+                "lastchangeuuid": marker,
+                "limit": page_size
+            })
+            for change in changes:
+                if change.get('stationuuid'):
+                    changed_uuids.add(change['stationuuid'])
+            next_marker = next((c['changeuuid'] for c in reversed(changes)
+                                if c.get('changeuuid')), None)
+
+            total += len(changes)
+            if total > max_changes:
+                return None
+            if len(changes) < page_size:
+                return changed_uuids, next_marker or marker
+            if not next_marker or next_marker == marker:
+                # The next request would return this page again
+                return None
+            marker = next_marker
+
+    def fetch_by_uuids(self, uuids: List[str], batch_size: int = 100) -> StationTable:
+        """Fetch the current records of stations by UUID, many per request.
+
+        Broken stations are left out, like the hidebroken searches.
+        Raises FetchError on network failure.
+        """
+        stations = []
+        for i in range(0, len(uuids), batch_size):
+            batch = uuids[i:i + batch_size]
+            records = self._request("stations/byuuid", {"uuids": ",".join(batch)})
+            stations.extend(r for r in records if r.get('lastcheckok', 1))
+        return self._normalize_stations(stations)
+
+    @staticmethod
+    def merge_changes(stations: Sequence[Dict], changed_uuids: Set[str],
+                      current: Sequence[Dict], add_new: bool = False) -> StationTable:
+        """Merge updated station records into a station list by UUID.
+
+        Changed stations missing from current were deleted (or are now
+        broken) and are dropped. Stations not in the list yet are only
+        appended when add_new is set.
+        """
+        current_by_uuid = {s['stationuuid']: s for s in current}
+        merged = StationTable()
+
+        for station in stations:
             uuid = station.get('stationuuid')
-            if uuid and uuid not in seen_uuids:
-                seen_uuids.add(uuid)
-                result.append(station)
+            if uuid in changed_uuids:
+                updated = current_by_uuid.pop(uuid, None)
+                if updated:
+                    merged.append(updated)
+            else:
+                merged.append(station)
+
+        if add_new:
+            merged.extend(current_by_uuid.values())
+        return merged
+
+    @staticmethod
+    def merge_stations(*station_lists: Sequence[Dict]) -> StationTable:
+        """Combine station lists in order, avoiding duplicates."""
+        seen_uuids = set()
+        result = StationTable()
+
+        for stations in station_lists:
+            for station in stations:
+                uuid = station.get('stationuuid')
+                if uuid and uuid not in seen_uuids:
+                    seen_uuids.add(uuid)
+                    result.append(station)
 
         return result
 
-    def _normalize_stations(self, stations: List[Dict]) -> List[Dict]:
+    def close(self):
+        """Stop mirror probing and close pooled connections."""
+        self.mirrors.stop()
+        self.http.close()
+
+    def _normalize_stations(self, stations: List[Dict]) -> StationTable:
         """Normalize station data from API response."""
-        normalized = []
+        normalized = StationTable()
+        latest_change = ('', '')
 
         for station in stations:
-            # Extract and normalize relevant fields
+            change = (station.get('lastchangetime_iso8601') or '',
+                      station.get('changeuuid') or '')
+            if change[0] and change[1] and change > latest_change:
+                latest_change = change
+
+            # Extract and normalize relevant fields; the listed URL is kept
+            # as an alternate when it differs from the resolved one
+            url = station.get('url_resolved') or station.get('url', '')
+            alternate = station.get('url', '')
             normalized_station = {
                 'stationuuid': station.get('stationuuid', ''),
                 'name': station.get('name', 'Unknown Station'),
-                'url': station.get('url_resolved') or station.get('url', ''),
+                'url': url,
+                'url_alternate': alternate if alternate != url else '',
                 'homepage': station.get('homepage', ''),
                 'favicon': station.get('favicon', ''),
                 'country': station.get('country', ''),
@@ -143,10 +302,16 @@ class StationFetcher:
                 'votes': station.get('votes', 0),
                 'codec': station.get('codec', ''),
                 'bitrate': station.get('bitrate', 0),
+                # Tells whether a station changed without comparing every field
+                'lastchangetime': change[0],
             }
 
             # Only add stations with valid URLs
             if normalized_station['url']:
                 normalized.append(normalized_station)
 
+        with self._change_lock:
+            if latest_change > self._latest_change:
+                self._latest_change = latest_change
+
         return normalized
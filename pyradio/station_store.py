@@ -0,0 +1,301 @@
+"""
+SQLite-backed station store for PyRadio.
+Persists the station cache with indexes for filtering and sorting and
+an FTS5 index for full-text search over names and tags.
+"""
+
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+from .station_table import FIELDS as COLUMNS
+
+# ORDER BY clauses for the list view sort fields
+ORDERS = {
+    'country': "country != 'The Netherlands', country COLLATE NOCASE, votes DESC",
+    'name': "name COLLATE NOCASE",
+    'bitrate': "bitrate DESC",
+    'votes': "votes DESC",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS stations (
+    id INTEGER PRIMARY KEY,
+    stationuuid TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL DEFAULT '',
+    url TEXT NOT NULL DEFAULT '',
+    url_alternate TEXT NOT NULL DEFAULT '',
+    homepage TEXT NOT NULL DEFAULT '',
+    favicon TEXT NOT NULL DEFAULT '',
+    country TEXT NOT NULL DEFAULT '',
+    countrycode TEXT NOT NULL DEFAULT '',
+    language TEXT NOT NULL DEFAULT '',
+    tags TEXT NOT NULL DEFAULT '',
+    votes INTEGER NOT NULL DEFAULT 0,
+    codec TEXT NOT NULL DEFAULT '',
+    bitrate INTEGER NOT NULL DEFAULT 0,
+    lastchangetime TEXT NOT NULL DEFAULT ''
+);
+CREATE INDEX IF NOT EXISTS idx_stations_country ON stations(country, votes DESC);
+CREATE INDEX IF NOT EXISTS idx_stations_votes ON stations(votes DESC);
+CREATE INDEX IF NOT EXISTS idx_stations_bitrate ON stations(bitrate DESC);
+CREATE INDEX IF NOT EXISTS idx_stations_codec ON stations(codec);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS stations_fts USING fts5(
+    name, tags, content='stations', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS stations_fts_insert AFTER INSERT ON stations BEGIN
+    INSERT INTO stations_fts(rowid, name, tags) VALUES (new.id, new.name, new.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS stations_fts_delete AFTER DELETE ON stations BEGIN
+    INSERT INTO stations_fts(stations_fts, rowid, name, tags)
+    VALUES ('delete', old.id, old.name, old.tags);
+END;
+CREATE TRIGGER IF NOT EXISTS stations_fts_update AFTER UPDATE ON stations BEGIN
+    INSERT INTO stations_fts(stations_fts, rowid, name, tags)
+    VALUES ('delete', old.id, old.name, old.tags);
+    INSERT INTO stations_fts(rowid, name, tags) VALUES (new.id, new.name, new.tags);
+END;
+"""
+
+_INSERT = (
+    f"INSERT INTO stations ({', '.join(COLUMNS)}) "
+    f"VALUES ({', '.join('?' for _ in COLUMNS)}) "
+    f"ON CONFLICT(stationuuid) DO UPDATE SET "
+    + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS[1:])
+)
+
+
+def _connect(db_path: Path) -> sqlite3.Connection:
+    """Open a connection usable from worker threads."""
+    conn = sqlite3.connect(str(db_path), timeout=30, check_same_thread=False)
+    # WAL lets the UI keep reading while a sync writes
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+
+def _row_values(station: Dict) -> tuple:
+    """Station dict to a tuple of column values."""
+    return tuple(
+        station.get(c) or (0 if c in ('votes', 'bitrate') else '')
+        for c in COLUMNS
+    )
+
+
+class StationStore:
+    """Station cache stored in SQLite, queryable without loading everything.
+
+    Reads and writes go through separate connections, so with WAL a
+    long write on a worker thread does not block reads on the main loop.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        self._conn = _connect(db_path)
+        self._conn.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        self._write_conn = _connect(db_path)
+        self._write_lock = threading.Lock()
+
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+            self._add_missing_columns()
+            try:
+                self._conn.executescript(FTS_SCHEMA)
+                self.has_fts = True
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5; search falls back to LIKE
+                print("Warning: SQLite FTS5 not available, using slower search")
+                self.has_fts = False
+
+    def load_all(self) -> List[Dict]:
+        """All stations, in the order they were stored."""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM stations ORDER BY id"
+            ).fetchall()
+        return [dict(row) for row in rows]
+
+    def count(self) -> int:
+        """Number of stored stations."""
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM stations").fetchone()[0]
+
+    def query(self, text: str = '', order: str = 'country',
+              limit: Optional[int] = None, offset: int = 0,
+              fields: Sequence[str] = COLUMNS, **filters) -> List[Dict]:
+        """Stations matching text and exact-match column filters, sorted by order.
+
+        text matches name and tags through the full-text index (as word
+        prefixes) and country as a substring. Only the given fields of
+        each station are read.
+        """
+        for field in fields:
+            if field not in COLUMNS:
+                raise ValueError(f"Unknown station column: {field}")
+
+        where = []
+        args: List = []
+
+        text = text.strip()
+        if text:
+            if self.has_fts:
+                # Quote each word so FTS syntax characters are taken literally
+                match = " ".join('"' + word.replace('"', '""') + '"*' for word in text.split())
+                where.append("(id IN (SELECT rowid FROM stations_fts WHERE stations_fts MATCH ?)"
+                             " OR country LIKE ?)")
+                args += [match, f"%{text}%"]
+            else:
+                where.append("(name LIKE ? OR tags LIKE ? OR country LIKE ?)")
+                args += [f"%{text}%"] * 3
+
+        for column, value in filters.items():
+            if column not in COLUMNS:
+                raise ValueError(f"Unknown station column: {column}")
+            where.append(f"{column} = ?")
+            args.append(value)
+
+        sql = f"SELECT {', '.join(fields)} FROM stations"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += f" ORDER BY {ORDERS.get(order, 'id')}"
+        if limit is not None:
+            sql += " LIMIT ? OFFSET ?"
+            args += [limit, offset]
+
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [dict(row) for row in rows]
+
+    def replace_all(self, stations: Iterable[Dict], timestamp: Optional[float] = None):
+        """Replace the stored stations and stamp the store (default: now)."""
+        with self._write_lock, self._write_conn:
+            self._write_conn.execute("DELETE FROM stations")
+            self._write_conn.executemany(_INSERT, (_row_values(s) for s in stations))
+            self._set_meta('timestamp', time.time() if timestamp is None else timestamp)
+
+    def upsert(self, stations: Iterable[Dict], timestamp: Optional[float] = None):
+        """Insert new stations and update existing ones by UUID."""
+        self.apply_changes(stations, (), timestamp)
+
+    def delete(self, uuids: Iterable[str], timestamp: Optional[float] = None):
+        """Remove stations by UUID."""
+        self.apply_changes((), uuids, timestamp)
+
+    def apply_changes(self, updated: Iterable[Dict], removed_uuids: Iterable[str],
+                      timestamp: Optional[float] = None):
+        """Upsert updated stations and delete removed ones in one transaction.
+
+        Only the rows of these stations are touched. With a timestamp the
+        store is stamped too, as after a full write.
+        """
+        with self._write_lock, self._write_conn:
+            self._write_conn.executemany("DELETE FROM stations WHERE stationuuid = ?",
+                                         ((u,) for u in removed_uuids))
+            self._write_conn.executemany(_INSERT, (_row_values(s) for s in updated))
+            if timestamp is not None:
+                self._set_meta('timestamp', timestamp)
+
+    def timestamp(self) -> float:
+        """Time the store was last fully written (0 if never)."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'timestamp'"
+            ).fetchone()
+        return float(row[0]) if row else 0.0
+
+    def clear(self):
+        """Remove all stations."""
+        with self._write_lock, self._write_conn:
+            self._write_conn.execute("DELETE FROM stations")
+            self._write_conn.execute("DELETE FROM meta WHERE key = 'timestamp'")
+
+    def open_writer(self) -> 'StationStoreWriter':
+        """Start replacing the stored stations in batches."""
+        return StationStoreWriter(self.db_path)
+
+    def close(self):
+        """Close the database connections."""
+        with self._write_lock:
+            self._write_conn.close()
+        with self._lock:
+            self._conn.close()
+
+    def _add_missing_columns(self):
+        """Add columns introduced after the store was created."""
+        existing = {row[1] for row in self._conn.execute("PRAGMA table_info(stations)")}
+        for column in COLUMNS:
+            if column not in existing:
+                self._conn.execute(
+                    f"ALTER TABLE stations ADD COLUMN {column} TEXT NOT NULL DEFAULT ''")
+
+    def _set_meta(self, key: str, value):
+        self._write_conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)",
+                           (key, str(value)))
+
+
+class StationStoreWriter:
+    """Replaces the stored stations batch by batch.
+
+    All batches go into a single transaction on a separate connection, so
+    readers keep seeing the old stations until commit() and an interrupted
+    sync leaves the store untouched.
+    """
+
+    def __init__(self, db_path: Path):
+        self.count = 0
+        self._conn: Optional[sqlite3.Connection] = None
+        self._db_path = db_path
+
+    def write_batch(self, stations: List[Dict]):
+        """Add a batch of stations.
+
+        If the batch fails, everything written so far is discarded and
+        the write lock released before the error is raised.
+        """
+        try:
+            if self._conn is None:
+                self._conn = _connect(self._db_path)
+                self._conn.execute("BEGIN IMMEDIATE")
+                self._conn.execute("DELETE FROM stations")
+            self._conn.executemany(_INSERT, (_row_values(s) for s in stations))
+        except BaseException:
+            self.abort()
+            raise
+        self.count += len(stations)
+
+    def commit(self):
+        """Make the written stations the current store contents."""
+        if self._conn is None:
+            return
+        try:
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('timestamp', ?)",
+                               (str(time.time()),))
+            self._conn.commit()
+        except sqlite3.Error as e:
+            print(f"Error saving cache: {e}")
+        finally:
+            self._conn.close()
+            self._conn = None
+
+    def abort(self):
+        """Discard everything written so far."""
+        self.count = 0
+        if self._conn is None:
+            return
+        try:
+            self._conn.rollback()
+        except sqlite3.Error as e:
+            print(f"Error discarding cache: {e}")
+        finally:
+            self._conn.close()
+            self._conn = None
@@ -0,0 +1,163 @@
+"""
+Compact columnar station storage for PyRadio.
+Keeps stations as columns instead of one dict per station: repeated
+values (country, codec, language) are dictionary-encoded and numbers
+live in typed arrays. Rows are exposed as read-only mapping views, so
+code written for station dicts keeps working.
+"""
+
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List
+
+# Field order matches the dicts built by StationFetcher._normalize_stations
+FIELDS = (
+    'stationuuid', 'name', 'url', 'url_alternate', 'homepage', 'favicon', 'country',
+    'countrycode', 'language', 'tags', 'votes', 'codec', 'bitrate', 'lastchangetime',
+)
+# Few distinct values, stored once each and referenced by code
+CATEGORY_FIELDS = ('country', 'countrycode', 'language', 'codec')
+NUMERIC_FIELDS = ('votes', 'bitrate')
+TEXT_FIELDS = tuple(f for f in FIELDS if f not in CATEGORY_FIELDS + NUMERIC_FIELDS)
+
+
+class StationRecord(Mapping):
+    """Read-only view of one station in a StationTable."""
+
+    __slots__ = ('_table', '_index')
+
+    def __init__(self, table: 'StationTable', index: int):
+        self._table = table
+        self._index = index
+
+    def __getitem__(self, key: str):
+        return self._table.value(self._index, key)
+
+    def get(self, key: str, default=None):
+        try:
+            return self._table.value(self._index, key)
+        except KeyError:
+            return default
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __eq__(self, other):
+        if isinstance(other, StationRecord) and other._table is self._table:
+            return other._index == self._index
+        return super().__eq__(other)
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"StationRecord({dict(self)!r})"
+
+
+class StationTable(Sequence):
+    """Append-only table of stations stored column by column.
+
+    Rows are read as StationRecord views made on access, so the table
+    holds no per-station objects.
+    """
+
+    def __init__(self):
+        self._text: Dict[str, List[str]] = {f: [] for f in TEXT_FIELDS}
+        self._codes: Dict[str, array] = {f: array('I') for f in CATEGORY_FIELDS}
+        self._values: Dict[str, List[str]] = {f: [] for f in CATEGORY_FIELDS}
+        self._value_codes: Dict[str, Dict[str, int]] = {f: {} for f in CATEGORY_FIELDS}
+        self._numbers: Dict[str, array] = {f: array('i') for f in NUMERIC_FIELDS}
+
+    @classmethod
+    def from_stations(cls, stations: Iterable[Mapping]) -> 'StationTable':
+        """Build a table from station dicts (or records)."""
+        table = cls()
+        table.extend(stations)
+        return table
+
+    @classmethod
+    def from_columns(cls, columns: Dict[str, list]) -> 'StationTable':
+        """Build a table from one equally long list of values per field."""
+        table = cls()
+        for field in TEXT_FIELDS:
+            table._text[field] = list(columns[field])
+        for field in CATEGORY_FIELDS:
+            encode = table._encoder(field)
+            table._codes[field] = array('I', (encode(v) for v in columns[field]))
+        for field in NUMERIC_FIELDS:
+            table._numbers[field] = array('i', columns[field])
+        return table
+
+    def append(self, station: Mapping):
+        """Add a station; only the known fields are kept."""
+        for field in TEXT_FIELDS:
+            self._text[field].append(station.get(field) or '')
+        for field in CATEGORY_FIELDS:
+            self._codes[field].append(self._encoder(field)(station.get(field)))
+        for field in NUMERIC_FIELDS:
+            self._numbers[field].append(int(station.get(field) or 0))
+
+    def extend(self, stations: Iterable[Mapping]):
+        for station in stations:
+            self.append(station)
+
+    def value(self, index: int, field: str):
+        """A single field of the station at index."""
+        column = self._text.get(field)
+        if column is not None:
+            return column[index]
+        codes = self._codes.get(field)
+        if codes is not None:
+            return self._values[field][codes[index]]
+        numbers = self._numbers.get(field)
+        if numbers is not None:
+            return numbers[index]
+        raise KeyError(field)
+
+    def column(self, field: str) -> list:
+        """All values of a field, in row order."""
+        if field in self._text:
+            return list(self._text[field])
+        if field in self._codes:
+            values = self._values[field]
+            return [values[code] for code in self._codes[field]]
+        if field in self._numbers:
+            return self._numbers[field].tolist()
+        raise KeyError(field)
+
+    def distinct_values(self, field: str) -> List[str]:
+        """Distinct values of a dictionary-encoded field."""
+        return list(self._values[field])
+
+    def __len__(self) -> int:
+        return len(self._text[FIELDS[0]])
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [StationRecord(self, i) for i in range(*index.indices(len(self)))]
+        count = len(self)
+        if index < 0:
+            index += count
+        if not 0 <= index < count:
+            raise IndexError("station index out of range")
+        return StationRecord(self, index)
+
+    def __iter__(self) -> Iterator[StationRecord]:
+        for index in range(len(self)):
+            yield StationRecord(self, index)
+
+    def _encoder(self, field: str):
+        """Function mapping a value of field to its dictionary code."""
+        codes = self._value_codes[field]
+        values = self._values[field]
+
+        def encode(value) -> int:
+            value = value or ''
+            code = codes.get(value)
+            if code is None:
+                code = codes[value] = len(values)
+                values.append(value)
+            return code
+        return encode
@@ -0,0 +1,280 @@
+"""
+Stream health checks for PyRadio.
+Opens station streams on a thread pool, reads only the response headers
+and the first audio bytes, and records how quickly each stream starts.
+"""
+
+import json
+import socket
+import ssl
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, Iterable, List, Mapping, Optional
+
+from gi.repository import GLib
+
+PROBE_TIMEOUT = 5  # Seconds for connecting and for each read
+MAX_REDIRECTS = 3
+MAX_HEADER_BYTES = 16 * 1024
+USER_AGENT = 'PyRadio/1.0'
+
+FORMAT_VERSION = 1
+
+# Content types a stream can be served with that are not audio
+NON_AUDIO_TYPES = ('text/html', 'text/plain', 'application/json')
+
+_SSL_CONTEXT = ssl.create_default_context()
+
+
+class ProbeError(OSError):
+    """A stream did not answer like a stream."""
+
+
+def probe_stream(url: str, timeout: float = PROBE_TIMEOUT) -> Dict:
+    """Open a stream and time it, without downloading more than its first bytes.
+
+    Returns a dict with 'ok', 'checked' (epoch seconds) and, as far as
+    the stream got, 'connect_ms' (DNS, TCP and TLS, redirects
+    included), 'first_byte_ms' (first audio byte after the request),
+    'content_type', 'bitrate' (kbps, from the icy-br header) and
+    'error'.
+    """
+    result: Dict = {'ok': False, 'checked': time.time()}
+    started = time.monotonic()
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            parts = urllib.parse.urlsplit(url)
+            if parts.scheme not in ('http', 'https') or not parts.hostname:
+                raise ProbeError(f"Unsupported stream URL: {url}")
+            port = parts.port or (443 if parts.scheme == 'https' else 80)
+
+            sock = socket.create_connection((parts.hostname, port), timeout=timeout)
+            try:
+                if parts.scheme == 'https':
+                    sock = _SSL_CONTEXT.wrap_socket(sock, server_hostname=parts.hostname)
+                result['connect_ms'] = _elapsed_ms(started)
+
+                path = parts.path or '/'
+                if parts.query:
+                    path += '?' + parts.query
+                request_sent = time.monotonic()
+                sock.sendall((
+                    f"GET {path} HTTP/1.0\r\nHost: {parts.netloc}\r\n"
+                    f"User-Agent: {USER_AGENT}\r\nAccept: */*\r\nIcy-MetaData: 0\r\n\r\n"
+                ).encode('latin-1'))
+                status, headers, body = _read_response_head(sock)
+
+                if status in (301, 302, 303, 307, 308) and headers.get('location'):
+                    url = urllib.parse.urljoin(url, headers['location'])
+                    continue
+                if status != 200:
+                    raise ProbeError(f"HTTP {status}")
+
+                if not body:
+                    body = sock.recv(1024)
+                if not body:
+                    raise ProbeError("Stream closed before sending audio")
+                result['first_byte_ms'] = _elapsed_ms(request_sent)
+            finally:
+                sock.close()
+
+            content_type = headers.get('content-type', '').split(';')[0].strip().lower()
+            result['content_type'] = content_type
+            bitrate = headers.get('icy-br', '').split(',')[0].strip()
+            if bitrate.isdigit():
+                result['bitrate'] = int(bitrate)
+            if content_type in NON_AUDIO_TYPES:
+                raise ProbeError(f"Not an audio stream ({content_type})")
+            result['ok'] = True
+            return result
+
+        raise ProbeError("Too many redirects")
+    except (OSError, ValueError) as e:
+        result['error'] = str(e) or type(e).__name__
+        return result
+
+
+def encode_results(results: Dict[str, Dict]) -> bytes:
+    """Serialize probe results for saving."""
+    return json.dumps({'version': FORMAT_VERSION, 'results': results},
+                      separators=(',', ':')).encode('utf-8')
+
+
+def decode_results(data: bytes) -> Dict[str, Dict]:
+    """Load serialized probe results ({} if unusable)."""
+    try:
+        state = json.loads(data)
+        if state.get('version') != FORMAT_VERSION:
+            return {}
+        results = state['results']
+    except (ValueError, KeyError, TypeError, AttributeError):
+        return {}
+    return results if isinstance(results, dict) else {}
+
+
+def _read_response_head(sock) -> tuple:
+    """Read a response's status line and headers: (status, headers, body bytes read)."""
+    data = b''
+    while True:
+        end = data.find(b'\r\n\r\n')
+        separator = 4
+        if end < 0:
+            end = data.find(b'\n\n')
+            separator = 2
+        if end >= 0:
+            break
+        if len(data) > MAX_HEADER_BYTES:
+            raise ProbeError("Response headers too long")
+        chunk = sock.recv(4096)
+        if not chunk:
+            raise ProbeError("Connection closed before a response")
+        data += chunk
+
+    lines = data[:end].decode('latin-1').splitlines()
+    # SHOUTcast servers answer "ICY 200 OK" rather than "HTTP/1.x 200 OK"
+    fields = lines[0].split(None, 2) if lines else []
+    if len(fields) < 2 or not fields[1].isdigit():
+        raise ProbeError("Not an HTTP response")
+    headers = {}
+    for line in lines[1:]:
+        name, sep, value = line.partition(':')
+        if sep:
+            headers[name.strip().lower()] = value.strip()
+    return int(fields[1]), headers, data[end + separator:]
+
+
+def _elapsed_ms(since: float) -> int:
+    return int((time.monotonic() - since) * 1000)
+
+
+def start_time_ms(result: Optional[Mapping]) -> Optional[int]:
+    """Connect plus first byte time of a successful probe, else None."""
+    if not result or not result.get('ok'):
+        return None
+    return result.get('connect_ms', 0) + result.get('first_byte_ms', 0)
+
+
+class StreamProber:
+    """Probes station streams with bounded concurrency and keeps the results.
+
+    Results are kept per station UUID; check() skips stations checked
+    less than max_age seconds ago. Every check() starts a new generation
+    and stations of an older one that have not been probed yet are
+    dropped.
+    """
+
+    RESULT_DELAY_MS = 1000  # Results reach the main loop in batches this often
+
+    def __init__(self, results: Optional[Dict[str, Dict]] = None,
+                 max_workers: int = 8, max_age: float = 24 * 3600):
+        self.results: Dict[str, Dict] = results or {}
+        self.max_age = max_age
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix='pyradio-probe')
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._futures: List[Future] = []
+        self._done: List[str] = []  # UUIDs probed since the last batch
+        self._batch_source_id = None
+        self._remaining = 0
+        self._on_results: Optional[Callable[[List[str]], None]] = None
+        self._closed = False
+
+    def get(self, station_uuid: str) -> Optional[Dict]:
+        """Last probe result of a station, if any."""
+        return self.results.get(station_uuid)
+
+    def is_unreachable(self, station_uuid: str) -> bool:
+        """Whether the last probe of a station failed."""
+        result = self.results.get(station_uuid)
+        return result is not None and not result.get('ok')
+
+    def check(self, stations: Iterable[Mapping],
+              on_results: Callable[[List[str]], None]) -> int:
+        """Probe the stations not checked recently; returns how many will be.
+
+        on_results(uuids) is called on the main loop with the stations
+        probed since the last call, the last time with everything left
+        once the check is finished; with nothing to probe it is called
+        once with an empty list.
+        """
+        now = time.time()
+        todo = []
+        seen = set()
+        for station in stations:
+            uuid = station.get('stationuuid')
+            url = station.get('url')
+            if not uuid or not url or uuid in seen:
+                continue
+            seen.add(uuid)
+            result = self.results.get(uuid)
+            if result is None or now - result.get('checked', 0) >= self.max_age:
+                todo.append((uuid, url))
+
+        with self._lock:
+            self._generation += 1
+            generation = self._generation
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+            self._remaining = len(todo)
+            self._on_results = on_results
+            if not todo:
+                # Nothing will finish, so report completion here
+                if self._batch_source_id is not None:
+                    GLib.source_remove(self._batch_source_id)
+                self._batch_source_id = GLib.timeout_add(0, self._deliver)
+
+        def run(uuid: str, url: str):
+            if generation != self._generation:
+                return
+            result = probe_stream(url)
+            with self._lock:
+                if generation != self._generation:
+                    return
+                self.results[uuid] = result
+                self._done.append(uuid)
+                self._remaining -= 1
+                last = self._remaining == 0
+                if last or self._batch_source_id is None:
+                    delay = 0 if last else self.RESULT_DELAY_MS
+                    if self._batch_source_id is not None:
+                        GLib.source_remove(self._batch_source_id)
+                    self._batch_source_id = GLib.timeout_add(delay, self._deliver)
+
+        futures = [self._executor.submit(run, uuid, url) for uuid, url in todo]
+        with self._lock:
+            self._futures.extend(futures)
+        return len(todo)
+
+    def _deliver(self):
+        """Hand the results gathered so far to on_results (main loop)."""
+        with self._lock:
+            self._batch_source_id = None
+            uuids, self._done = self._done, []
+            on_results = self._on_results
+            finished = self._remaining == 0
+        if (uuids or finished) and on_results and not self._closed:
+            on_results(uuids)
+        return False
+
+    def cancel(self):
+        """Stop probing; results already gathered are kept."""
+        with self._lock:
+            self._generation += 1
+            for future in self._futures:
+                future.cancel()
+            self._futures = []
+
+    def shutdown(self):
+        """Cancel outstanding probes and stop the worker threads."""
+        self._closed = True
+        self.cancel()
+        self._executor.shutdown(wait=False)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Copy of the results, safe to serialize on another thread."""
+        with self._lock:
+            return dict(self.results)
@@ -0,0 +1,173 @@
+"""
+Facet panel - narrows the station list by codec, bitrate, language,
+country, tags and votes, with live station counts per value.
+"""
+
+import gi
+gi.require_version('Gtk', '4.0')
+from gi.repository import Gtk
+from typing import Dict, List, Set, Tuple
+
+from ..facets import FACETS, RANGE_FACETS
+
+
+class FacetPanel(Gtk.Box):
+    """Check buttons per facet value; ranges are chosen one at a time."""
+
+    VALUES_SHOWN = 12  # Most common values listed per facet
+
+    TITLES = {
+        'codec': "Codec",
+        'bitrate': "Bitrate",
+        'language': "Language",
+        'countrycode': "Country",
+        'tags': "Tags",
+        'votes': "Popularity",
+    }
+
+    def __init__(self, on_changed):
+        super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=6)
+        self.set_size_request(220, -1)
+
+        # on_changed(selection): selection maps facet -> list of chosen values
+        self.on_changed = on_changed
+        self.selection: Dict[str, Set] = {facet: set() for facet in FACETS}
+
+        self._value_boxes: Dict[str, Gtk.Box] = {}
+        self._buttons: Dict[str, Dict[object, Gtk.CheckButton]] = {f: {} for f in FACETS}
+        self._shown: Dict[str, List] = {facet: [] for facet in FACETS}
+        self._updating = False  # Set while buttons are changed programmatically
+
+        self._build_ui()
+
+    def _build_ui(self):
+        """Build the panel UI."""
+        header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=6)
+        header_box.set_margin_start(12)
+        header_box.set_margin_end(12)
+        header_box.set_margin_top(8)
+
+        title = Gtk.Label()
+        title.set_markup('<b>Filters</b>')
+        title.set_xalign(0)
+        title.set_hexpand(True)
+        header_box.append(title)
+
+        self.clear_button = Gtk.Button(label="Clear")
+        self.clear_button.add_css_class("flat")
+        self.clear_button.set_sensitive(False)
+        self.clear_button.connect('clicked', self._on_clear_clicked)
+        header_box.append(self.clear_button)
+        self.append(header_box)
+
+        facets_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=4)
+        facets_box.set_margin_start(12)
+        facets_box.set_margin_end(12)
+        facets_box.set_margin_bottom(12)
+        for facet in FACETS:
+            label = Gtk.Label()
+            label.set_markup(f'<span size="small" weight="bold">{self.TITLES[facet]}</span>')
+            label.set_xalign(0)
+            label.set_margin_top(8)
+            facets_box.append(label)
+
+            value_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=0)
+            self._value_boxes[facet] = value_box
+            facets_box.append(value_box)
+
+        scrolled = Gtk.ScrolledWindow()
+        scrolled.set_vexpand(True)
+        scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
+        scrolled.set_child(facets_box)
+        self.append(scrolled)
+
+    def get_selection(self) -> Dict[str, List]:
+        """Chosen values per facet, leaving out facets with none chosen."""
+        return {facet: sorted(values, key=str) for facet, values in self.selection.items() if values}
+
+    def set_counts(self, counts: Dict[str, List[Tuple[object, int]]]):
+        """Show (value, count) pairs per facet, as returned by FacetIndex.counts()."""
+        self._updating = True
+        for facet in FACETS:
+            pairs = counts.get(facet, [])
+            values = [value for value, _ in pairs]
+            if values != self._shown[facet]:
+                self._rebuild_buttons(facet, values)
+            buttons = self._buttons[facet]
+            for value, count in pairs:
+                button = buttons[value]
+                button.set_label(f"{self._value_label(facet, value)} ({count:,})")
+                # Values leading to no stations stay visible but can't be chosen
+                button.set_sensitive(count > 0 or value in self.selection[facet])
+        self._updating = False
+
+    def clear(self):
+        """Unselect every value, without notifying."""
+        self._updating = True
+        for facet in FACETS:
+            self.selection[facet] = set()
+            for button in self._buttons[facet].values():
+                button.set_active(False)
+            any_button = self._buttons[facet].get(None)
+            if any_button is not None:
+                any_button.set_active(True)
+        self._updating = False
+        self.clear_button.set_sensitive(False)
+
+    def _rebuild_buttons(self, facet: str, values: List):
+        """Replace the check buttons of a facet with ones for values."""
+        value_box = self._value_boxes[facet]
+        child = value_box.get_first_child()
+        while child is not None:
+            next_child = child.get_next_sibling()
+            value_box.remove(child)
+            child = next_child
+
+        buttons: Dict[object, Gtk.CheckButton] = {}
+        group = None
+        if facet in RANGE_FACETS:
+            # Ranges are nested, so they work as radio buttons with an "Any" choice
+            group = Gtk.CheckButton(label="Any")
+            group.set_active(not self.selection[facet])
+            group.connect('toggled', self._on_value_toggled, facet, None)
+            value_box.append(group)
+            buttons[None] = group
+
+        for value in values:
+            button = Gtk.CheckButton(label=self._value_label(facet, value))
+            if group is not None:
+                button.set_group(group)
+            button.set_active(value in self.selection[facet])
+            button.connect('toggled', self._on_value_toggled, facet, value)
+            value_box.append(button)
+            buttons[value] = button
+
+        self._buttons[facet] = buttons
+        self._shown[facet] = values
+
+    @staticmethod
+    def _value_label(facet: str, value) -> str:
+        if facet == 'bitrate':
+            return f"≥ {value} kbps"
+        if facet == 'votes':
+            return f"≥ {value:,} votes"
+        return str(value)
+
+    def _on_value_toggled(self, button: Gtk.CheckButton, facet: str, value):
+        if self._updating:
+            return
+        if facet in RANGE_FACETS:
+            if not button.get_active():
+                return  # The newly chosen radio button reports the change
+            self.selection[facet] = set() if value is None else {value}
+        elif button.get_active():
+            self.selection[facet].add(value)
+        else:
+            self.selection[facet].discard(value)
+
+        self.clear_button.set_sensitive(any(self.selection.values()))
+        self.on_changed(self.get_selection())
+
+    def _on_clear_clicked(self, button):
+        self.clear()
+        self.on_changed(self.get_selection())
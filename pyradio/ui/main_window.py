@@ -2,41 +2,85 @@
 Main application window for PyRadio.
 """
 
+import sqlite3
+import threading
+from pathlib import Path
+
 import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GLib, Gio
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Set
 
+from .facet_panel import FacetPanel
 from .now_playing import NowPlayingPanel
 from .station_list import StationListView
 from ..player import Player
 from ..favorites import FavoritesManager
+from ..playlists import CUSTOM_UUID_PREFIX, PlaylistError
 from ..station_fetcher import StationFetcher
+from ..fetch_worker import FetchWorker
+from ..favicons import FaviconLoader
+from ..facets import FacetIndex
+from ..search_index import SearchIndex
+from ..stream_prober import StreamProber
+from ..station_table import StationTable
 from ..config import Config
 
 
 class MainWindow(Gtk.ApplicationWindow):
     """Main application window."""
 
+    STORE_SEARCH_PAGE = 200  # Store search matches read on the main loop
+
     def __init__(self, app, config: Config):
         super().__init__(application=app, title="PyRadio")
 
         self.config = config
 
         # Initialize components
-        self.player = Player()
+        self.player = Player(max_standby=config.get_setting('preroll_stations', 2),
+                             retry_budget=config.get_setting('reconnect_attempts', 5))
         self.favorites = FavoritesManager(config)
-        self.fetcher = StationFetcher()
+        self.favorites.connect('changed', self._on_favorites_changed)
+        self.favorites.connect('reordered', self._on_favorites_reordered)
+        self.favorites.connect('updated', self._on_favorites_updated)
+        self.fetcher = StationFetcher(config.get_setting('api_mirrors') or None)
+        self.fetcher.mirrors.start_probing()
+        self.favicon_loader = None
+        if config.get_setting('show_favicons', True):
+            self.favicon_loader = FaviconLoader(
+                config.favicon_dir,
+                disk_limit=config.get_setting('favicon_cache_mb', 20) * 1024 * 1024
+            )
+        self.fetch_worker = FetchWorker(self.fetcher)
+        self.prober = StreamProber(
+            config.load_stream_health(),
+            max_age=config.get_setting('health_check_hours', 24) * 3600
+        )
 
         # Connect player signals
         self.player.connect('metadata-changed', self._on_metadata_changed)
         self.player.connect('state-changed', self._on_state_changed)
         self.player.connect('error', self._on_player_error)
+        self.player.connect('reconnecting', self._on_player_reconnecting)
+        self.player.connect('reconnected', self._on_player_reconnected)
+        self.player.connect('qos-changed', self._on_qos_changed)
+        self.player.connect('qos-finished', self._on_qos_finished)
+        self.qos_store = config.load_playback_stats()
 
         # State
-        self.all_stations = []
+        self.all_stations = StationTable()
+        self.store_in_sync = False  # True while all_stations matches the station store
+        self._synced_stations = StationTable()  # Pages of a running catalogue sync
+        self.search_index: Optional[SearchIndex] = None  # Index of all_stations
+        self._sync_index = SearchIndex()  # Built up page by page during a catalogue sync
+        self._index_generation = 0
+        self._store_search_generation = 0
+        self.facet_index: Optional[FacetIndex] = None  # Facets of all_stations
+        self._facet_generation = 0
         self.current_view = "all"  # "all" or "favorites"
         self.current_station: Optional[Dict] = None
+        self.playing_station: Optional[Dict] = None
 
         # Build UI
         self.set_default_size(900, 600)
@@ -44,6 +88,8 @@ class MainWindow(Gtk.ApplicationWindow):
 
         # Load stations
         GLib.idle_add(self._load_stations)
+        GLib.idle_add(self._refresh_favorites)
+        GLib.idle_add(self._check_favorites_health)
 
         # Set initial volume
         saved_volume = self.config.get_setting('volume', 0.8)
@@ -63,6 +109,8 @@ class MainWindow(Gtk.ApplicationWindow):
         self.search_entry = Gtk.SearchEntry()
         self.search_entry.set_placeholder_text("Search stations...")
         self.search_entry.set_size_request(300, -1)
+        # The station list debounces filtering itself
+        self.search_entry.set_search_delay(0)
         self.search_entry.connect('search-changed', self._on_search_changed)
         header.set_title_widget(self.search_entry)
 
@@ -72,6 +120,13 @@ class MainWindow(Gtk.ApplicationWindow):
         refresh_btn.connect('clicked', self._on_refresh_clicked)
         header.pack_start(refresh_btn)
 
+        # Facet panel toggle
+        self.filters_button = Gtk.ToggleButton()
+        self.filters_button.set_icon_name("view-list-symbolic")
+        self.filters_button.set_tooltip_text("Filter by Codec, Bitrate, Language and Tags")
+        self.filters_button.connect('toggled', self._on_filters_toggled)
+        header.pack_start(self.filters_button)
+
         # Add Sort menu
         sort_btn = Gtk.MenuButton()
         sort_btn.set_icon_name("view-sort-ascending-symbolic")
@@ -83,9 +138,27 @@ class MainWindow(Gtk.ApplicationWindow):
         menu.append("Name (A-Z)", "app.sort_name")
         menu.append("Bitrate (High-Low)", "app.sort_bitrate")
         menu.append("Votes (Popularity)", "app.sort_votes")
+        menu.append("Bitrate, then Votes", "app.sort_bitrate_votes")
+        menu.append("Fastest to Start", "app.sort_start_time")
+        menu.append("Relevance (Search)", "app.sort_relevance")
+        health_section = Gio.Menu()
+        health_section.append("Hide Unreachable Stations", "app.hide_unreachable")
+        health_section.append("Check Listed Streams", "app.check_streams")
+        menu.append_section(None, health_section)
         sort_btn.set_menu_model(menu)
         header.pack_end(sort_btn)
 
+        # Playlist import/export menu
+        playlist_btn = Gtk.MenuButton()
+        playlist_btn.set_icon_name("document-open-symbolic")
+        playlist_btn.set_tooltip_text("Playlists")
+        playlist_menu = Gio.Menu()
+        playlist_menu.append("Import Playlist...", "app.import_playlist")
+        playlist_menu.append("Export Favorites...", "app.export_favorites")
+        playlist_menu.append("Export Playback Stats...", "app.export_playback_stats")
+        playlist_btn.set_menu_model(playlist_menu)
+        header.pack_end(playlist_btn)
+
         self.set_titlebar(header)
 
         # Setup actions for sort menu
@@ -122,7 +195,11 @@ class MainWindow(Gtk.ApplicationWindow):
         self.station_list = StationListView(
             on_station_selected=self._on_station_selected,
             on_station_activated=self._on_station_activated,
-            is_favorite_func=lambda uuid: self.favorites.is_favorite(uuid)
+            is_favorite_func=self.favorites.is_favorite,
+            is_favorite_many_func=self.favorites.is_favorite_many,
+            search_func=self._search_stations,
+            favicon_loader=self.favicon_loader,
+            health_func=self.prober.get
         )
         paned.set_start_child(self.station_list)
 
@@ -135,7 +212,18 @@ class MainWindow(Gtk.ApplicationWindow):
         )
         paned.set_end_child(self.now_playing)
 
-        main_box.append(paned)
+        # Facet panel, left of the station list
+        self.facet_panel = FacetPanel(on_changed=self._on_facets_changed)
+        self.facet_revealer = Gtk.Revealer()
+        self.facet_revealer.set_transition_type(Gtk.RevealerTransitionType.SLIDE_RIGHT)
+        self.facet_revealer.set_child(self.facet_panel)
+
+        content_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
+        content_box.set_vexpand(True)
+        content_box.append(self.facet_revealer)
+        content_box.append(paned)
+        paned.set_hexpand(True)
+        main_box.append(content_box)
 
         # Status bar
         self.status_bar = Gtk.Label()
@@ -156,7 +244,10 @@ class MainWindow(Gtk.ApplicationWindow):
             ('sort_country', 'country'),
             ('sort_name', 'name'),
             ('sort_bitrate', 'bitrate'),
-            ('sort_votes', 'votes')
+            ('sort_votes', 'votes'),
+            ('sort_bitrate_votes', 'bitrate,votes'),
+            ('sort_start_time', 'start_time'),
+            ('sort_relevance', 'relevance')
         ]
 
         for action_name, sort_field in actions:
@@ -164,65 +255,292 @@ class MainWindow(Gtk.ApplicationWindow):
             action.connect('activate', self._on_sort_action, sort_field)
             self.get_application().add_action(action)
 
+        # Stream health actions
+        hide_action = Gio.SimpleAction.new_stateful(
+            'hide_unreachable', None, GLib.Variant.new_boolean(False))
+        hide_action.connect('change-state', self._on_hide_unreachable)
+        self.get_application().add_action(hide_action)
+        check_action = Gio.SimpleAction.new('check_streams', None)
+        check_action.connect('activate', lambda action, param: self._check_listed_health())
+        self.get_application().add_action(check_action)
+
+        # Playlist actions
+        for action_name, handler in (('import_playlist', self._on_import_playlist),
+                                     ('export_favorites', self._on_export_favorites),
+                                     ('export_playback_stats', self._on_export_playback_stats)):
+            action = Gio.SimpleAction.new(action_name, None)
+            action.connect('activate', handler)
+            self.get_application().add_action(action)
+
     def _load_stations(self, force_refresh: bool = False):
-        """Load stations from cache or API."""
-        # Try to load from cache first (unless forced)
-        if not force_refresh and self.config.is_cache_valid():
+        """Load stations from cache, then revalidate in the background.
+
+        Whatever cache exists is shown straight away, even if it has
+        expired, so the list never waits for the network.
+        """
+        if not self.all_stations:
             self.all_stations = self.config.load_cache()
+            self.store_in_sync = True
             if self.all_stations:
                 self._update_status(f"Loaded {len(self.all_stations)} stations from cache")
                 self._update_station_list()
-                return
+                self._index_stations(self.all_stations)
+                self._index_facets(self.all_stations)
+
+        # A fresh cache needs no revalidation (unless forced)
+        if self.all_stations and not force_refresh and self.config.is_cache_valid():
+            return
 
-        # Fetch from API
+        # An outdated cache only needs the stations changed since it was saved
+        marker = self.config.get_setting('last_change_uuid')
+        if self.all_stations and marker:
+            self._update_status("Checking RadioBrowser for station changes...")
+            self.fetch_worker.sync_changes(
+                self.all_stations, marker,
+                on_progress=self._update_status,
+                on_done=self._on_changes_synced,
+                add_new=self.config.get_setting('full_catalogue_sync', False)
+            )
+            return
+
+        self._fetch_all_stations()
+
+    def _fetch_all_stations(self):
+        """Download the station list from scratch."""
+        # Fetch from API on worker threads to avoid freezing the UI
         self._update_status("Fetching stations from RadioBrowser...")
+        if self.config.get_setting('full_catalogue_sync', False):
+            self._synced_stations = StationTable()
+            self._sync_index = SearchIndex()
+            self.fetch_worker.sync_catalogue(
+                self.config.open_cache_writer(),
+                on_page=self._on_catalogue_page,
+                on_done=self._on_catalogue_synced
+            )
+            return
 
-        # Run in background to avoid freezing UI
-        GLib.timeout_add(100, self._fetch_stations_bg)
+        self.fetch_worker.fetch_mixed(
+            on_progress=self._update_status,
+            on_done=self._on_stations_fetched
+        )
 
-    def _fetch_stations_bg(self):
-        """Background fetcher wrapper."""
-        try:
-            # Fetch mixed stations (Dutch + international)
-            stations = self.fetcher.fetch_mixed_stations()
-
-            if stations:
-                self.all_stations = stations
-                # Save to cache
-                self.config.save_cache(self.all_stations)
-                self._update_status(f"Loaded {len(self.all_stations)} stations")
-                self._update_station_list()
-            else:
-                self._update_status("Failed to fetch stations - check network connection")
-        except Exception as e:
-            self._update_status(f"Error fetching stations: {e}")
-            print(f"Station fetch error: {e}")
+    def _on_changes_synced(self, stations: Optional[List[Dict]], marker: Optional[str],
+                           updated: Optional[List[Dict]], removed: Optional[Set[str]]):
+        """Handle the result of a delta sync (runs on the main loop)."""
+        if stations is None:
+            # Marker unknown to the server, too many changes or network trouble
+            self._fetch_all_stations()
+            return
+
+        # Only the changed rows are written, off the main thread
+        self.config.update_cache(stations, updated, removed, marker)
+        self._apply_fresh_stations(stations)
+
+    def _on_stations_fetched(self, stations: List[Dict]):
+        """Handle stations fetched in the background (runs on the main loop)."""
+        if stations:
+            # Save to cache (off the main thread)
+            self.config.save_cache(stations, self.fetcher.change_marker())
+            self._apply_fresh_stations(stations)
+            self._update_status(f"Loaded {len(self.all_stations)} stations")
+        elif self.all_stations:
+            self._update_status("Could not refresh stations - showing cached list")
+        else:
+            self._update_status("Failed to fetch stations - check network connection")
+
+    def _on_catalogue_page(self, stations: List[Dict]):
+        """Handle one page of a full catalogue sync (runs on the main loop)."""
+        self._synced_stations.extend(stations)
+        self._sync_index.add(stations)
+        self._update_status(f"Syncing catalogue... {len(self._synced_stations)} stations")
+
+        # With nothing cached to show, show stations as soon as the first
+        # page arrives; otherwise keep the cached list until the sync is done.
+        if not self.all_stations:
+            self.all_stations = StationTable.from_stations(self._synced_stations)
+            self.store_in_sync = False
+            self._update_station_list()
+
+    def _on_catalogue_synced(self, total: int):
+        """Handle completion of a full catalogue sync."""
+        if total:
+            self.config.set_setting('last_change_uuid', self.fetcher.change_marker())
+            self._apply_fresh_stations(self._synced_stations, self._sync_index)
+            self._update_status(f"Loaded {total} stations")
+        elif self.all_stations:
+            self._update_status("Could not refresh stations - showing cached list")
+        else:
+            self._update_status("Failed to fetch stations - check network connection")
+        self._synced_stations = StationTable()
+        self._sync_index = SearchIndex()
+
+    def _apply_fresh_stations(self, stations: List[Dict], index: Optional[SearchIndex] = None):
+        """Swap in revalidated stations (already saved to the store)."""
+        self.all_stations = stations
+        self.store_in_sync = True
+        self._index_stations(stations, index)
+        # Facet filters apply again once the new facet index is built
+        self._index_facets(stations)
+        if self.current_view == "all":
+            # Only rows that changed are touched; selection and scroll stay
+            self.station_list.update_stations(self.all_stations)
+            if not self.current_station:
+                self.station_list.select_first()
+
+    def _index_stations(self, stations: List[Dict], index: Optional[SearchIndex] = None):
+        """Make the search index match stations, loading or building it off the main thread."""
+        self._index_generation += 1
+        generation = self._index_generation
+        if index is not None:
+            self._on_index_built(generation, index)
+            return
+
+        # Searches use the store until the new index is ready
+        self.search_index = None
+
+        def build():
+            # The saved index is several MB of JSON; read it here too
+            built = self.config.load_search_index(stations)
+            save = built is None
+            if save:
+                built = SearchIndex.build(stations)
+            GLib.idle_add(self._on_index_built, generation, built, save)
+        threading.Thread(target=build, name='pyradio-index', daemon=True).start()
+
+    def _on_index_built(self, generation: int, index: SearchIndex, save: bool = True):
+        """Use a search index, saving it if it is new (runs on the main loop)."""
+        if generation != self._index_generation:
+            return False
+        self.search_index = index
+        if save and self.store_in_sync:
+            self.config.save_search_index(index)
         return False
 
+    def _index_facets(self, stations: List[Dict]):
+        """Build the facet index of stations off the main thread."""
+        self._facet_generation += 1
+        generation = self._facet_generation
+        self.facet_index = None
+
+        def build():
+            built = FacetIndex.build(stations)
+            GLib.idle_add(self._on_facets_built, generation, built)
+        threading.Thread(target=build, name='pyradio-facets', daemon=True).start()
+
+    def _on_facets_built(self, generation: int, index: FacetIndex):
+        """Use a freshly built facet index (runs on the main loop)."""
+        if generation != self._facet_generation:
+            return False
+        self.facet_index = index
+        self._apply_facets()
+        return False
+
+    def _facet_matches(self) -> Optional[List[int]]:
+        """Indexes into all_stations allowed by the facet panel (None: all)."""
+        selection = self.facet_panel.get_selection()
+        index = self.facet_index
+        if not selection or index is None or len(index) != len(self.all_stations):
+            return None
+        return index.positions(index.query(selection))
+
+    def _apply_facets(self):
+        """Filter the list by the chosen facets and update the panel counts."""
+        index = self.facet_index
+        if index is None:
+            return
+        selection = self.facet_panel.get_selection()
+        self.facet_panel.set_counts(index.counts(selection, FacetPanel.VALUES_SHOWN))
+        if self.current_view != "all":
+            return
+        allowed = self._facet_matches()
+        self.station_list.set_allowed(allowed)
+        if allowed is not None:
+            self._update_status(f"{len(allowed)} stations match the filters")
+
+    def _on_facets_changed(self, selection: Dict[str, List]):
+        """Handle a facet value being chosen or unchosen."""
+        self._apply_facets()
+
+    def _on_filters_toggled(self, button):
+        """Show or hide the facet panel."""
+        self.facet_revealer.set_reveal_child(button.get_active())
+
     def _on_refresh_clicked(self, button):
         """Handle refresh button click."""
-        self.config.clear_cache()
+        # Only stations changed since the last sync are downloaded
         self._load_stations(force_refresh=True)
+        self._refresh_favorites()
+
+    def _refresh_favorites(self):
+        """Fetch the live records of the favorites (batched by UUID)."""
+        # Stations imported from playlists are unknown to RadioBrowser
+        uuids = [u for u in self.favorites.uuids() if not u.startswith(CUSTOM_UUID_PREFIX)]
+        if uuids:
+            self.fetch_worker.lookup_stations(uuids, self._on_favorites_fetched)
+        return False
+
+    def _on_favorites_fetched(self, stations: Optional[List[Dict]]):
+        """Apply fetched favorite records (runs on the main loop)."""
+        if stations is None:
+            return  # Offline; the saved snapshots keep working
+        self.favorites.update_metadata(stations)
+
+    def _check_favorites_health(self):
+        """Check the favorites' streams in the background."""
+        self.prober.check(self.favorites.get_all(), self._on_health_results)
+        return False
+
+    def _check_listed_health(self):
+        """Check the streams of the listed stations, up to a limit."""
+        limit = self.config.get_setting('health_check_limit', 1000)
+        count = self.prober.check(self.station_list.filtered_stations[:limit],
+                                  self._on_health_results)
+        if count:
+            self._update_status(f"Checking {count} streams...")
+        else:
+            self._update_status("Listed streams were checked recently")
+
+    def _on_health_results(self, uuids: List[str]):
+        """Show and save new stream health results (runs on the main loop)."""
+        if not uuids:
+            return  # Nothing needed checking
+        self.station_list.refresh_health()
+        self.config.save_stream_health(self.prober.snapshot())
+        unreachable = sum(1 for uuid in uuids if self.prober.is_unreachable(uuid))
+        self._update_status(f"Checked {len(uuids)} streams, {unreachable} unreachable")
+
+    def _on_hide_unreachable(self, action, value):
+        """Toggle hiding stations whose stream check failed."""
+        action.set_state(value)
+        self.station_list.set_hide_unreachable(value.get_boolean())
 
     def _on_sort_action(self, action, param, sort_field):
         """Handle sort action."""
         self.station_list.set_sort_order(sort_field)
+        if sort_field == 'start_time':
+            # Sorting by start time needs the listed stations checked
+            self._check_listed_health()
 
         # Update status
         sort_names = {
             'country': 'Country',
             'name': 'Name',
             'bitrate': 'Bitrate',
-            'votes': 'Popularity'
+            'votes': 'Popularity',
+            'bitrate,votes': 'Bitrate, then Popularity',
+            'start_time': 'Fastest to Start',
+            'relevance': 'Relevance'
         }
         self._update_status(f"Sorted by {sort_names.get(sort_field, sort_field)}")
 
     def _update_station_list(self):
         """Update the station list based on current view."""
         if self.current_view == "all":
-            self.station_list.set_stations(self.all_stations)
+            self.station_list.set_stations(self.all_stations, self._facet_matches())
         else:  # favorites
             self.station_list.set_stations(self.favorites.get_all())
+        # Facets index all stations, not the favorites
+        self.facet_panel.set_sensitive(self.current_view == "all")
 
         # Select first station if none selected
         if not self.current_station:
@@ -238,6 +556,55 @@ class MainWindow(Gtk.ApplicationWindow):
         search_text = entry.get_text()
         self.station_list.set_filter(search_text)
 
+    def _search_stations(self, text: str) -> Optional[List[Dict]]:
+        """Search all stations through the search index, best match first.
+
+        Falls back to the station store's full-text index while the
+        search index is being built.
+        """
+        self._store_search_generation += 1
+        if self.current_view != "all":
+            return None
+        index = self.search_index
+        if index is not None and len(index) == len(self.all_stations):
+            stations = self.all_stations
+            return [stations[i] for i in index.search(text)]
+        if self.store_in_sync:
+            return self._search_store(text)
+        return None
+
+    def _search_store(self, text: str) -> List[Dict]:
+        """First page of store matches for text, in the list's sort order.
+
+        Only UUIDs are read. The rest of the matches are read on a
+        thread and added to the list when they arrive.
+        """
+        generation = self._store_search_generation
+        sort_field = self.station_list.sort_field.split(',')[0]
+        order = 'votes' if sort_field == 'relevance' else sort_field
+        page = self.STORE_SEARCH_PAGE
+        first = self.config.store.query(text, order=order, limit=page, fields=('stationuuid',))
+        if len(first) < page:
+            return first
+
+        def read_rest():
+            try:
+                # LIMIT -1: no limit, only the offset
+                rest = self.config.store.query(text, order=order, limit=-1, offset=page,
+                                               fields=('stationuuid',))
+            except sqlite3.Error as e:
+                print(f"Error searching stations: {e}")
+                return
+            GLib.idle_add(self._on_store_search_rest, generation, text, rest)
+        threading.Thread(target=read_rest, name='pyradio-search', daemon=True).start()
+        return first
+
+    def _on_store_search_rest(self, generation: int, text: str, stations: List[Dict]):
+        """Add the remaining store matches of a search (runs on the main loop)."""
+        if generation == self._store_search_generation:
+            self.station_list.add_search_results(text, stations)
+        return False
+
     def _on_view_toggled(self, button, view_name):
         """Handle view switcher toggle."""
         if not button.get_active():
@@ -262,6 +629,9 @@ class MainWindow(Gtk.ApplicationWindow):
         self.current_station = station
         is_fav = self.favorites.is_favorite(station.get('stationuuid', ''))
         self.now_playing.set_station(station, is_fav)
+        self._show_qos()
+        # Connect in the background so pressing play starts at once
+        self.player.preroll(station.get('url'))
 
     def _on_station_activated(self, station: Dict):
         """Handle station activation (double-click)."""
@@ -275,7 +645,9 @@ class MainWindow(Gtk.ApplicationWindow):
         url = station.get('url')
         if url:
             self._update_status(f"Playing: {station.get('name', 'Unknown')}")
-            self.player.play(url)
+            self.player.play(url, station.get('url_alternate'))
+            self.playing_station = station
+            self._show_qos()
             self.now_playing.set_playing(True)
 
     def _on_stop_clicked(self):
@@ -293,12 +665,72 @@ class MainWindow(Gtk.ApplicationWindow):
             self.favorites.remove(station.get('stationuuid', ''))
             self._update_status(f"Removed from favorites: {station.get('name', 'Unknown')}")
 
-        # Refresh station list to update favorite indicators
-        self.station_list.refresh()
+    def _on_favorites_changed(self, favorites, station_uuid: str, is_favorite: bool):
+        """Update the favorite indicator of the one station that changed."""
+        self.station_list.update_favorite(station_uuid, is_favorite)
 
-        # If in favorites view, update list
+        # In the favorites view the station also enters or leaves the list
         if self.current_view == "favorites":
-            self._update_station_list()
+            self.station_list.update_stations(self.favorites.get_all())
+
+    def _playlist_filters(self) -> Gio.ListStore:
+        """File dialog filters for the supported playlist formats."""
+        playlist_filter = Gtk.FileFilter()
+        playlist_filter.set_name("Playlists (M3U, PLS, XSPF)")
+        for pattern in ("*.m3u", "*.m3u8", "*.pls", "*.xspf"):
+            playlist_filter.add_pattern(pattern)
+        filters = Gio.ListStore.new(Gtk.FileFilter)
+        filters.append(playlist_filter)
+        return filters
+
+    def _on_import_playlist(self, action, param):
+        """Ask for a playlist file to add to favorites."""
+        dialog = Gtk.FileDialog(title="Import Playlist")
+        dialog.set_filters(self._playlist_filters())
+        dialog.open(self, None, self._on_import_file_chosen)
+
+    def _on_import_file_chosen(self, dialog, result):
+        try:
+            file = dialog.open_finish(result)
+        except GLib.Error:
+            return  # Cancelled
+        try:
+            # Entries are matched by URL against the station cache
+            matched, custom = self.favorites.import_playlist(Path(file.get_path()), self.all_stations)
+        except (PlaylistError, OSError) as e:
+            self._update_status(f"Could not import playlist: {e}")
+            return
+        self._update_status(f"Imported {matched + custom} favorites ({custom} not in the station list)")
+
+    def _on_export_favorites(self, action, param):
+        """Ask where to write the favorites as a playlist."""
+        dialog = Gtk.FileDialog(title="Export Favorites")
+        dialog.set_filters(self._playlist_filters())
+        dialog.set_initial_name("favorites.m3u")
+        dialog.save(self, None, self._on_export_file_chosen)
+
+    def _on_export_file_chosen(self, dialog, result):
+        try:
+            file = dialog.save_finish(result)
+        except GLib.Error:
+            return  # Cancelled
+        try:
+            self.favorites.export_playlist(Path(file.get_path()))
+        except (PlaylistError, OSError) as e:
+            self._update_status(f"Could not export favorites: {e}")
+            return
+        self._update_status(f"Exported {self.favorites.get_count()} favorites")
+
+    def _on_favorites_updated(self, favorites):
+        """Show refreshed favorite records; only changed rows are rebuilt."""
+        if self.current_view == "favorites":
+            self.station_list.update_stations(self.favorites.get_all())
+
+    def _on_favorites_reordered(self, favorites):
+        """Follow a new favorites order, or many changed favorites."""
+        self.station_list.refresh_favorites()
+        if self.current_view == "favorites":
+            self.station_list.update_stations(self.favorites.get_all())
 
     def _on_volume_changed(self, volume: float):
         """Handle volume change."""
@@ -320,6 +752,58 @@ class MainWindow(Gtk.ApplicationWindow):
         # Could update UI based on state if needed
         pass
 
+    def _show_qos(self):
+        """Show the playback quality of the station in the now playing panel."""
+        station = self.current_station
+        if station is None:
+            return
+        uuid = station.get('stationuuid', '')
+        playing = self.playing_station
+        session = None
+        if playing is not None and playing.get('stationuuid') == uuid:
+            session = self.player.qos
+        self.now_playing.update_qos(session, self.qos_store.summary(uuid))
+
+    def _on_qos_changed(self, player):
+        self._show_qos()
+
+    def _on_qos_finished(self, player, session: Dict):
+        """Add a finished play to the station's playback quality history."""
+        if self.playing_station is not None:
+            self.qos_store.add(self.playing_station.get('stationuuid', ''), session)
+            self.config.save_playback_stats(self.qos_store)
+            self.playing_station = None
+            self._show_qos()
+
+    def _on_export_playback_stats(self, action, param):
+        """Ask where to write the playback quality history as JSON."""
+        dialog = Gtk.FileDialog(title="Export Playback Stats")
+        dialog.set_initial_name("playback-stats.json")
+        dialog.save(self, None, self._on_export_stats_file_chosen)
+
+    def _on_export_stats_file_chosen(self, dialog, result):
+        try:
+            file = dialog.save_finish(result)
+        except GLib.Error:
+            return  # Cancelled
+        try:
+            Path(file.get_path()).write_bytes(self.qos_store.to_bytes(pretty=True))
+        except OSError as e:
+            self._update_status(f"Could not export playback stats: {e}")
+            return
+        self._update_status("Exported playback stats")
+
+    def _on_player_reconnecting(self, player, attempt: int, delay: float):
+        """Report a dropped stream being reconnected."""
+        self._update_status(f"Connection lost - reconnecting in {delay:.0f} s "
+                            f"(attempt {attempt} of {player.retry_budget})")
+
+    def _on_player_reconnected(self, player, reconnects: int, downtime: float):
+        """Report a stream that is back after reconnecting."""
+        name = self.current_station.get('name', 'Unknown') if self.current_station else 'Station'
+        self._update_status(f"{name} reconnected ({reconnects} reconnects, "
+                            f"{downtime:.1f} s without audio)")
+
     def _on_player_error(self, player, error: str):
         """Handle player errors."""
         self._update_status(f"Error: {error}")
@@ -334,4 +818,10 @@ class MainWindow(Gtk.ApplicationWindow):
 
     def cleanup(self):
         """Clean up resources before closing."""
+        self.fetch_worker.shutdown()
+        self.prober.shutdown()
+        self.fetcher.close()
+        if self.favicon_loader:
+            self.favicon_loader.shutdown()
         self.player.cleanup()
+        self.config.flush()
@@ -7,6 +7,8 @@ gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GLib, Pango
 from typing import Optional, Dict
 
+from ..qos import PlaySession
+
 
 class NowPlayingPanel(Gtk.Box):
     """Panel displaying currently playing station and controls."""
@@ -54,6 +56,13 @@ class NowPlayingPanel(Gtk.Box):
         self.info_label.set_markup('<span size="small" foreground="#888888">—</span>')
         self.append(self.info_label)
 
+        # Playback quality of the current play and the station's history
+        self.qos_label = Gtk.Label()
+        self.qos_label.set_wrap(True)
+        self.qos_label.set_max_width_chars(50)
+        self.qos_label.set_visible(False)
+        self.append(self.qos_label)
+
         # Playback controls
         controls_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
         controls_box.set_halign(Gtk.Align.CENTER)
@@ -165,6 +174,32 @@ class NowPlayingPanel(Gtk.Box):
                 info = " • ".join(info_parts)
                 self.info_label.set_markup(f'<span size="small" foreground="#888888">{info}</span>')
 
+    def update_qos(self, session: Optional[PlaySession], summary: Optional[Dict]):
+        """Show playback quality: the current play and the station's recent plays."""
+        lines = []
+        if session is not None:
+            parts = []
+            if session.time_to_audio_ms is not None:
+                parts.append(f"Started in {session.time_to_audio_ms / 1000:.2f} s")
+            else:
+                parts.append("Connecting...")
+            if session.buffering_events:
+                parts.append(f"{session.buffering_events} rebuffers "
+                             f"({session.rebuffer_ratio:.1%} of the time)")
+            if session.underruns:
+                parts.append(f"{session.underruns} underruns")
+            lines.append(" • ".join(parts))
+        if summary:
+            line = f"Last {summary['plays']} plays"
+            if summary['median_time_to_audio_ms'] is not None:
+                line += f": median start {summary['median_time_to_audio_ms'] / 1000:.2f} s"
+            line += f", {summary['rebuffer_ratio']:.1%} rebuffering"
+            lines.append(line)
+
+        text = GLib.markup_escape_text("\n".join(lines))
+        self.qos_label.set_markup(f'<span size="small" foreground="#888888">{text}</span>')
+        self.qos_label.set_visible(bool(lines))
+
     def update_favorite_status(self, is_favorite: bool):
         """Update favorite status (external change)."""
         self.is_favorite = is_favorite
@@ -214,6 +249,7 @@ class NowPlayingPanel(Gtk.Box):
         self.station_label.set_markup('<span size="x-large" weight="bold">No Station Selected</span>')
         self.title_label.set_markup('<span size="medium">—</span>')
         self.info_label.set_markup('<span size="small" foreground="#888888">—</span>')
+        self.qos_label.set_visible(False)
 
         self.play_button.set_sensitive(False)
         self.stop_button.set_sensitive(False)
@@ -2,99 +2,595 @@
 Station list view - displays radio stations in a scrollable list.
 """
 
+from bisect import bisect_left
+
 import gi
 gi.require_version('Gtk', '4.0')
 from gi.repository import Gtk, GLib, Pango, GObject, Gio
-from typing import List, Dict, Callable, Optional
+from typing import List, Dict, Callable, Optional, Set, Tuple
 
+from ..search_index import fold
+from ..station_table import StationTable
+from ..stream_prober import start_time_ms
 
-class StationListView(Gtk.Box):
-    """Scrollable list view for radio stations."""
 
-    def __init__(self, on_station_selected, on_station_activated, is_favorite_func):
+class StationItem(GObject.Object):
+    """List model entry: a station, or a country header when station is None."""
+
+    __gtype_name__ = 'PyRadioStationItem'
+
+    def __init__(self, key: tuple, station: Optional[Dict]):
+        super().__init__()
+        self.key = key
+        self.station = station
+
+
+class StationRow(Gtk.Box):
+    """Recycled row widget, showing either a station or a country header."""
+
+    def __init__(self, icon_size: Optional[int]):
+        super().__init__(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self.favicon_url = None
+
+        # Country header
+        self.header_label = Gtk.Label()
+        self.header_label.set_xalign(0)
+        self.header_label.set_margin_top(12)
+        self.header_label.set_margin_bottom(4)
+        self.append(self.header_label)
+
+        # Station
+        self.station_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
+        self.station_box.set_hexpand(True)
+        self.station_box.set_margin_top(8)
+        self.station_box.set_margin_bottom(8)
+
+        # Station icon, filled in once the row is bound
+        self.favicon_image = None
+        if icon_size:
+            self.favicon_image = Gtk.Image.new_from_icon_name("audio-x-generic-symbolic")
+            self.favicon_image.set_pixel_size(icon_size)
+            self.station_box.append(self.favicon_image)
+
+        info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
+        info_box.set_hexpand(True)
+
+        self.name_label = Gtk.Label()
+        self.name_label.set_xalign(0)
+        self.name_label.set_ellipsize(Pango.EllipsizeMode.END)
+        info_box.append(self.name_label)
+
+        self.details_label = Gtk.Label()
+        self.details_label.set_xalign(0)
+        self.details_label.set_ellipsize(Pango.EllipsizeMode.END)
+        info_box.append(self.details_label)
+        self.station_box.append(info_box)
+
+        self.fav_label = Gtk.Label(label="★")
+        self.fav_label.add_css_class("accent")
+        self.station_box.append(self.fav_label)
+        self.append(self.station_box)
+
+        self.set_margin_start(12)
+        self.set_margin_end(12)
+
+
+def _kept_pairs(old_keys: List[tuple], new_keys: List[tuple]) -> List[Tuple[int, int]]:
+    """(old index, new index) of the most keys that keep their order.
+
+    Keys are unique within each list, so this is the longest increasing
+    run of new positions taken in old order, found in O(n log n).
+    """
+    new_index = {key: j for j, key in enumerate(new_keys)}
+    pairs = [(i, new_index[key]) for i, key in enumerate(old_keys) if key in new_index]
+    if all(a[1] < b[1] for a, b in zip(pairs, pairs[1:])):
+        return pairs  # Nothing moved
+
+    tails: List[int] = []       # Smallest last new index of a run of each length
+    tail_pairs: List[int] = []  # Which pair ends that run
+    previous = [-1] * len(pairs)
+    for n, (_, j) in enumerate(pairs):
+        length = bisect_left(tails, j)
+        if length == len(tails):
+            tails.append(j)
+            tail_pairs.append(n)
+        else:
+            tails[length] = j
+            tail_pairs[length] = n
+        if length:
+            previous[n] = tail_pairs[length - 1]
+
+    kept = []
+    n = tail_pairs[-1] if tail_pairs else -1
+    while n >= 0:
+        kept.append(pairs[n])
+        n = previous[n]
+    kept.reverse()
+    return kept
+
+
+class StationListView(Gtk.Box):
+    """Scrollable list view for radio stations.
+
+    Built on Gtk.ListView: the stations live in a Gio.ListStore and only
+    the rows in view have widgets, which are recycled while scrolling.
+    """
+
+    FILTER_DELAY_MS = 80  # Debounce for typing in the search entry
+    FILTER_SLICE_US = 4000  # Filtering work per main loop iteration
+    # Rebuilds put the first rows (a screenful and some) in the model at
+    # once and append the rest in chunks, at most a frame budget per
+    # main loop iteration, so the window keeps repainting
+    POPULATE_FIRST = 200
+    POPULATE_CHUNK = 500
+    POPULATE_BUDGET_US = 8000
+    STALL_WARNING_MS = 100
+
+    def __init__(self, on_station_selected, on_station_activated, is_favorite_func,
+                 search_func=None, favicon_loader=None, is_favorite_many_func=None,
+                 health_func=None):
         super().__init__(orientation=Gtk.Orientation.VERTICAL, spacing=0)
 
         self.on_station_selected = on_station_selected
         self.on_station_activated = on_station_activated
         self.is_favorite_func = is_favorite_func
+        # Optional bulk variant: is_favorite_many_func(uuids) -> [bool]
+        self.is_favorite_many_func = is_favorite_many_func
+        # Optional indexed search: search_func(text) returns the matching
+        # stations, or None if it cannot answer for the current list.
+        # Further matches may follow through add_search_results().
+        self.search_func = search_func
+        # Optional FaviconLoader; icons are only loaded for rows in view
+        self.favicon_loader = favicon_loader
+        self._favicon_source_id = None
+        # Optional stream health: health_func(uuid) returns the last probe
+        # result of a station (see stream_prober), or None if unchecked
+        self.health_func = health_func
+        self.hide_unreachable = False
+        self._unreachable_mask: Optional[bytearray] = None
 
         self.stations: List[Dict] = []
         self.filtered_stations: List[Dict] = []
         self.filter_text = ""
         self.sort_field = "country"  # Default sort
 
+        # Folded "name, country, tags" per station, computed once per list
+        self._search_keys: List[str] = []
+        # Last local filter result (station indexes), refined while typing
+        self._last_query = ""
+        self._last_matches: Optional[List[int]] = None
+        self._filter_source_id = None
+        # Station indexes matching the filter (None: no filter), and whether
+        # they are ranked by search_func and not to be re-sorted
+        self._matches: Optional[List[int]] = None
+        self._matches_ranked = False
+        # Text filter result before the allowed restriction
+        self._text_matches: Optional[List[int]] = None
+        # Station indexes allowed by other filters, e.g. facets (None: all),
+        # and the same as a mask by index
+        self._allowed: Optional[List[int]] = None
+        self._allowed_mask: Optional[bytearray] = None
+
+        # Per station list: model items, their index by key and cached sort orders
+        self._model_items: List[StationItem] = []
+        self._versions: List[str] = []  # Last change time per station, if known
+        self._key_index: Dict[tuple, int] = {}
+        self._sort_orders: Dict[Tuple[str, ...], List[int]] = {}
+        self._countries: Optional[List[str]] = None
+
+        # Keys and stations of the rows currently shown, in order
+        self._item_keys: List[tuple] = []
+        # Rebuild in progress: items still to be appended to the model
+        self._pending_items: List[StationItem] = []
+        self._populated = 0
+        self._populate_source_id = None
+        # Timings of the last rebuild: items, chunks, longest_stall_ms, total_ms
+        self.rebuild_stats: Dict = {}
+        self._rebuild_started = 0
+        self._item_stations: List[Optional[Dict]] = []
+        # Row widgets currently bound to an item, and station rows by UUID
+        self._bound_rows: Dict[StationRow, StationItem] = {}
+        self._rows_by_uuid: Dict[str, StationRow] = {}
+
         self._build_ui()
 
     def _build_ui(self):
         """Build the list view UI."""
+        self.store = Gio.ListStore(item_type=StationItem)
+        self.selection = Gtk.SingleSelection(model=self.store)
+        self.selection.set_autoselect(False)
+        self.selection.set_can_unselect(True)
+        self.selection.connect('selection-changed', self._on_selection_changed)
+
+        factory = Gtk.SignalListItemFactory()
+        factory.connect('setup', self._on_factory_setup)
+        factory.connect('bind', self._on_factory_bind)
+        factory.connect('unbind', self._on_factory_unbind)
+
+        self.list_view = Gtk.ListView(model=self.selection, factory=factory)
+        self.list_view.connect('activate', self._on_activate)
+
+        # Add some styling
+        self.list_view.add_css_class("navigation-sidebar")
+
         # Create scrolled window
         scrolled = Gtk.ScrolledWindow()
         scrolled.set_vexpand(True)
         scrolled.set_hexpand(True)
         scrolled.set_policy(Gtk.PolicyType.NEVER, Gtk.PolicyType.AUTOMATIC)
-
-        # Create list box
-        self.list_box = Gtk.ListBox()
-        self.list_box.set_selection_mode(Gtk.SelectionMode.SINGLE)
-        self.list_box.connect('row-selected', self._on_row_selected)
-        self.list_box.connect('row-activated', self._on_row_activated)
-
-        # Add some styling
-        self.list_box.add_css_class("navigation-sidebar")
-
-        scrolled.set_child(self.list_box)
-        self.append(scrolled)
+        scrolled.set_child(self.list_view)
+        self.scrolled = scrolled
 
         # Status label for empty state
         self.status_label = Gtk.Label()
         self.status_label.set_markup('<span size="large" foreground="#888888">Loading stations...</span>')
         self.status_label.set_margin_top(40)
         self.status_label.set_margin_bottom(40)
-
-    def set_stations(self, stations: List[Dict]):
-        """Set the list of stations to display."""
-        self.stations = stations
+        self.status_label.set_valign(Gtk.Align.START)
+
+        self.stack = Gtk.Stack()
+        self.stack.set_vexpand(True)
+        self.stack.add_named(scrolled, 'list')
+        self.stack.add_named(self.status_label, 'status')
+        self.stack.set_visible_child_name('status')
+        self.append(self.stack)
+
+    def set_stations(self, stations: List[Dict], allowed: Optional[List[int]] = None):
+        """Set the list of stations to display.
+
+        allowed restricts the list to these station indexes, combined
+        with the filter text (see set_allowed).
+        """
+        self._cancel_filter()
+        self._set_station_data(stations, allowed)
         self._apply_filter()
 
+    def set_allowed(self, allowed: Optional[List[int]]):
+        """Only show the stations at these indexes (None: all of them).
+
+        Used for facet filters; the filter text narrows the allowed
+        stations further. The text filter is not rerun.
+        """
+        if allowed is None and self._allowed is None:
+            return
+        self._set_allowed(allowed)
+        if self._filter_source_id:
+            return  # The pending filter applies it when done
+        self._set_matches(self._text_matches, self._matches_ranked)
+        self._rebuild_list()
+
     def set_filter(self, filter_text: str):
-        """Filter stations by search text."""
-        self.filter_text = filter_text.lower()
-        self._apply_filter()
+        """Filter stations by search text.
+
+        The filter runs once typing pauses, in slices that yield to the
+        main loop, and narrows the previous result while the text only
+        grows.
+        """
+        self._cancel_filter()
+        self.filter_text = fold(filter_text.strip())
+        if not self.filter_text:
+            self._apply_filter()
+            return
+        self._filter_source_id = GLib.timeout_add(self.FILTER_DELAY_MS, self._start_filter)
+
+    def _set_allowed(self, allowed: Optional[List[int]]):
+        self._allowed = allowed
+        self._allowed_mask = None
+        if allowed is not None:
+            self._allowed_mask = bytearray(len(self.stations))
+            for index in allowed:
+                self._allowed_mask[index] = 1
+
+    def _set_station_data(self, stations: List[Dict], allowed: Optional[List[int]] = None,
+                          reuse: bool = False) -> Set[tuple]:
+        """Take a new station list and precompute its search keys.
+
+        With reuse, stations whose record did not change keep their model
+        item and search key from the previous list. Returns the keys of
+        the stations that are in both lists but changed.
+        """
+        previous = {}
+        if reuse:
+            previous = {item.key: (item, key, version) for item, key, version
+                        in zip(self._model_items, self._search_keys, self._versions)}
+        changed: Set[tuple] = set()
+        self.stations = stations
+        versions = self._column('lastchangetime')
+
+        # Model items are made once per list; rebuilds and re-sorts only
+        # rearrange them
+        model_items: List[StationItem] = []
+        search_keys: List[str] = []
+        for station, uuid, version in zip(stations, self._column('stationuuid'), versions):
+            key = ('station', uuid or id(station))
+            old = previous.get(key)
+            if old is not None and self._same_record(old[0].station, old[2], station, version):
+                item, search_key, _ = old
+                item.station = station
+            else:
+                if old is not None:
+                    changed.add(key)
+                item = StationItem(key, station)
+                search_key = fold(f"{station.get('name', '')}\0{station.get('country', '')}"
+                                  f"\0{station.get('tags', '')}")
+            model_items.append(item)
+            search_keys.append(search_key)
+
+        self._set_allowed(allowed)
+        self._search_keys = search_keys
+        self._last_query = ""
+        self._last_matches = None
+        self._model_items = model_items
+        self._versions = versions
+        self._key_index = {item.key: i for i, item in enumerate(model_items)}
+        self._sort_orders = {}
+        self._countries = None
+        self._unreachable_mask = None
+        return changed
+
+    @staticmethod
+    def _same_record(old: Dict, old_version: str, new: Dict, new_version: str) -> bool:
+        """Whether two records of one station hold the same data."""
+        if old is new:
+            return True
+        # Directory records carry their last change time; others (e.g.
+        # favorites imported from playlists) are compared field by field
+        if new_version:
+            return new_version == old_version
+        return old == new
+
+    def _column(self, field: str, default='') -> list:
+        """A field of every station, read column-wise from a StationTable."""
+        stations = self.stations
+        if isinstance(stations, StationTable):
+            return stations.column(field)
+        return [s.get(field, default) for s in stations]
+
+    def update_stations(self, stations: List[Dict], allowed: Optional[List[int]] = None):
+        """Replace the station list, changing only the rows that differ.
+
+        Unlike set_stations this keeps untouched rows, the selection and
+        the scroll position, so a background refresh does not disturb the
+        user.
+        """
+        if not self._item_keys:
+            self.set_stations(stations, allowed)
+            return
+
+        # The diff needs the model to hold the whole list
+        self._finish_population()
+        self._cancel_filter()
+        changed = self._set_station_data(stations, allowed, reuse=True)
+        self._filter_stations()
+        new_items = self._build_items()
+        if not new_items:
+            self._rebuild_list()
+            return
+        self._replace_items(new_items, changed)
+
+    def _replace_items(self, new_items: List[StationItem], changed: Set[tuple] = frozenset()):
+        """Change the model into new_items by splicing only what differs.
+
+        Items are told apart by key; changed holds the keys of stations
+        whose data changed, the only rows rebound where the order is the
+        same.
+        """
+        selected_uuid = self._selected_uuid()
+        adjustment = self.scrolled.get_vadjustment()
+        scroll_value = adjustment.get_value()
+
+        new_keys = [item.key for item in new_items]
+
+        # Splice the gaps between items kept in place, from the end so
+        # earlier positions stay valid
+        old_end, new_end = len(self._item_keys), len(new_keys)
+        for i, j in reversed([(-1, -1)] + _kept_pairs(self._item_keys, new_keys)):
+            if old_end - i > 1 or new_end - j > 1:
+                self.store.splice(i + 1, old_end - i - 1, new_items[j + 1:new_end])
+            if i >= 0 and new_keys[j] in changed:
+                # Same station in the same place, but its data changed
+                self.store.splice(i, 1, [new_items[j]])
+            old_end, new_end = i, j
+
+        self._item_keys = new_keys
+        self._item_stations = [item.station for item in new_items]
+
+        if selected_uuid:
+            self._select_uuid(selected_uuid)
+        adjustment.set_value(scroll_value)
 
     def _apply_filter(self):
         """Apply current filter and rebuild list."""
-        # Filter stations
-        if not self.filter_text:
-            self.filtered_stations = self.stations
-        else:
-            self.filtered_stations = [
-                s for s in self.stations
-                if self.filter_text in s.get('name', '').lower() or
-                   self.filter_text in s.get('country', '').lower() or
-                   self.filter_text in s.get('tags', '').lower()
-            ]
+        self._filter_stations()
 
         # Rebuild list
         self._rebuild_list()
 
+    def _filter_stations(self):
+        """Compute filtered_stations from stations and the filter text."""
+        if not self.filter_text:
+            self._set_matches(None, False)
+            return
+
+        matches = self.search_func(self.filter_text) if self.search_func else None
+        if matches is not None:
+            self._use_search_results(matches)
+            return
+
+        query = self.filter_text
+        keys = self._search_keys
+        self._finish_filter(query, [i for i in self._filter_candidates(query) if query in keys[i]])
+
+    def _filter_candidates(self, query: str):
+        """Station indexes that can match query."""
+        if self._last_matches is not None and query.startswith(self._last_query):
+            # Every match of the longer query also matched the shorter one
+            return self._last_matches
+        return range(len(self.stations))
+
+    def _finish_filter(self, query: str, matches: List[int]):
+        self._last_query = query
+        self._last_matches = matches
+        self._set_matches(matches, False)
+
+    def _use_search_results(self, matches: List[Dict]):
+        """Take the (ranked) stations returned by search_func as the filter result."""
+        key_index = self._key_index
+        indexes = (key_index.get(self._station_key(s)) for s in matches)
+        self._set_matches([i for i in indexes if i is not None], True)
+
+    def add_search_results(self, text: str, matches: List[Dict]):
+        """Append stations that search_func found for text after its first answer.
+
+        The rows are added in place, keeping the selection and scroll
+        position. Results for a text that is no longer the filter are
+        dropped.
+        """
+        if text != self.filter_text or not self._matches_ranked or self._filter_source_id:
+            return
+        current = self._text_matches or []
+        seen = set(current)
+        key_index = self._key_index
+        indexes = (key_index.get(self._station_key(s)) for s in matches)
+        added = [i for i in indexes if i is not None and i not in seen]
+        if not added:
+            return
+
+        self._finish_population()
+        self._set_matches(current + added, True)
+        new_items = self._build_items()
+        if self._item_keys and new_items:
+            self._replace_items(new_items)
+        else:
+            self._rebuild_list()
+
+    def _set_matches(self, matches: Optional[List[int]], ranked: bool):
+        """Take the text filter result, restricted to the allowed stations."""
+        self._text_matches = matches
+        self._matches_ranked = ranked
+        mask = self._allowed_mask
+        if mask is not None:
+            matches = self._allowed if matches is None else [i for i in matches if mask[i]]
+        if self.hide_unreachable and self.health_func:
+            unreachable = self._unreachable()
+            if matches is None:
+                matches = [i for i in range(len(self.stations)) if not unreachable[i]]
+            else:
+                matches = [i for i in matches if not unreachable[i]]
+        self._matches = matches
+        stations = self.stations
+        self.filtered_stations = stations if matches is None else [stations[i] for i in matches]
+
+    def _start_filter(self):
+        """Filter for the current text, in time slices on the main loop."""
+        self._filter_source_id = None
+        query = self.filter_text
+
+        matches = self.search_func(query) if self.search_func else None
+        if matches is not None:
+            self._use_search_results(matches)
+            self._rebuild_list()
+            return False
+
+        keys = self._search_keys
+        candidates = iter(self._filter_candidates(query))
+        found: List[int] = []
+
+        def step():
+            deadline = GLib.get_monotonic_time() + self.FILTER_SLICE_US
+            for count, index in enumerate(candidates, 1):
+                if query in keys[index]:
+                    found.append(index)
+                if count % 512 == 0 and GLib.get_monotonic_time() >= deadline:
+                    return True  # Continue in the next main loop iteration
+
+            self._filter_source_id = None
+            self._finish_filter(query, found)
+            self._rebuild_list()
+            return False
+
+        if step():
+            self._filter_source_id = GLib.idle_add(step)
+        return False
+
+    def _unreachable(self) -> bytearray:
+        """Per station, 1 if its last health check failed."""
+        if self._unreachable_mask is None:
+            health = self.health_func
+            mask = bytearray(len(self.stations))
+            for index, station in enumerate(self.stations):
+                result = health(station.get('stationuuid', ''))
+                if result is not None and not result.get('ok'):
+                    mask[index] = 1
+            self._unreachable_mask = mask
+        return self._unreachable_mask
+
+    def set_hide_unreachable(self, hide: bool):
+        """Leave out stations whose last health check failed."""
+        if hide == self.hide_unreachable:
+            return
+        self.hide_unreachable = hide
+        if self._filter_source_id:
+            return  # The pending filter applies it when done
+        self._set_matches(self._text_matches, self._matches_ranked)
+        self._rebuild_list()
+
+    def refresh_health(self):
+        """Take in new health check results.
+
+        Rows in view show the new results; if the list is sorted by start
+        time or hides unreachable stations it is updated in place, keeping
+        the selection and scroll position.
+        """
+        self._unreachable_mask = None
+        self._sort_orders = {fields: order for fields, order in self._sort_orders.items()
+                             if 'start_time' not in fields}
+        for row, item in self._bound_rows.items():
+            self._bind_row(row, item)
+        if not (self.hide_unreachable or self.sort_field == 'start_time'):
+            return
+        if self._filter_source_id:
+            return  # The pending filter applies it when done
+
+        self._finish_population()
+        self._set_matches(self._text_matches, self._matches_ranked)
+        new_items = self._build_items()
+        if self._item_keys and new_items:
+            self._replace_items(new_items)
+        else:
+            self._rebuild_list()
+
+    def _cancel_filter(self):
+        """Stop a pending or running filter."""
+        if self._filter_source_id:
+            GLib.source_remove(self._filter_source_id)
+            self._filter_source_id = None
+
     def set_sort_order(self, field: str):
-        """Set the sort order (name, country, bitrate, votes)."""
+        """Set the sort order (name, country, bitrate, votes, start_time, relevance).
+
+        Several fields separated by commas sort by each in turn, e.g.
+        "bitrate,votes". Relevance keeps the order of search_func results
+        while filtering and sorts by votes otherwise.
+        """
         self.sort_field = field
         self._rebuild_list()
 
     def _rebuild_list(self):
-        """Rebuild the list box with current filtered stations."""
-        # Clear existing rows
-        while True:
-            row = self.list_box.get_row_at_index(0)
-            if row is None:
-                break
-            self.list_box.remove(row)
+        """Replace the model contents with the current filtered stations.
+
+        Only the first rows are added right away; the rest follow from an
+        idle callback, cancelled if a newer rebuild supersedes it.
+        """
+        self._cancel_population()
+        started = GLib.get_monotonic_time()
 
-        # Add new rows
         if not self.filtered_stations:
             # Show empty state
-            if self.filter_text:
+            self.store.remove_all()
+            self._item_keys = []
+            self._item_stations = []
+            if self.filter_text or self._allowed is not None or self.hide_unreachable:
                 self.status_label.set_markup(
                     '<span size="large" foreground="#888888">No stations found</span>'
                 )
@@ -102,96 +598,216 @@ class StationListView(Gtk.Box):
                 self.status_label.set_markup(
                     '<span size="large" foreground="#888888">No stations available</span>'
                 )
-            self.list_box.append(self.status_label)
+            self.stack.set_visible_child_name('status')
+            return
+
+        items = self._build_items()
+        self._item_keys = [item.key for item in items]
+        self._item_stations = [item.station for item in items]
+        # The top of the list is what is in view after a rebuild
+        self.store.splice(0, self.store.get_n_items(), items[:self.POPULATE_FIRST])
+        self.stack.set_visible_child_name('list')
+
+        stall_ms = (GLib.get_monotonic_time() - started) / 1000
+        self.rebuild_stats = {'items': len(items), 'chunks': 1,
+                              'longest_stall_ms': stall_ms, 'total_ms': stall_ms}
+        self._rebuild_started = started
+        if len(items) > self.POPULATE_FIRST:
+            self._pending_items = items
+            self._populated = self.POPULATE_FIRST
+            self._populate_source_id = GLib.idle_add(self._populate_step)
         else:
-            # Sort stations
-            if self.sort_field == "country":
-                # Group by country (default view)
-                self._build_country_grouped_list()
-            else:
-                # Flat list sorted by field
-                self._build_flat_sorted_list()
-
-    def _build_country_grouped_list(self):
-        """Build list grouped by country."""
-        from collections import defaultdict
-        countries = defaultdict(list)
-        for station in self.filtered_stations:
-            country = station.get('country', 'Unknown')
-            countries[country].append(station)
-
-        # Sort countries: Netherlands first, then alphabetically
-        sorted_countries = sorted(countries.keys(),
-                                 key=lambda c: (c != 'The Netherlands', c.lower()))
-
-        # Add stations grouped by country
-        for country in sorted_countries:
-            # Add country header
-            header_row = Gtk.ListBoxRow()
-            header_row.set_selectable(False)
-            header_row.set_activatable(False)
-            header_box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL)
-            header_box.set_margin_start(12)
-            header_box.set_margin_end(12)
-            header_box.set_margin_top(12)
-            header_box.set_margin_bottom(4)
-
-            country_label = Gtk.Label()
+            self._report_rebuild()
+
+    def _populate_step(self):
+        """Append chunks of the pending rows until the frame budget is used."""
+        started = GLib.get_monotonic_time()
+        deadline = started + self.POPULATE_BUDGET_US
+        items = self._pending_items
+        while self._populated < len(items):
+            chunk = items[self._populated:self._populated + self.POPULATE_CHUNK]
+            self.store.splice(self._populated, 0, chunk)
+            self._populated += len(chunk)
+            if GLib.get_monotonic_time() >= deadline:
+                break
+
+        now = GLib.get_monotonic_time()
+        stats = self.rebuild_stats
+        stats['chunks'] += 1
+        stats['longest_stall_ms'] = max(stats['longest_stall_ms'], (now - started) / 1000)
+        if self._populated < len(items):
+            return True  # More in the next main loop iteration
+
+        stats['total_ms'] = (now - self._rebuild_started) / 1000
+        self._populate_source_id = None
+        self._pending_items = []
+        self._report_rebuild()
+        return False
+
+    def _finish_population(self):
+        """Add all pending rows now."""
+        if self._populate_source_id:
+            GLib.source_remove(self._populate_source_id)
+            self._populate_source_id = None
+            self.store.splice(self._populated, 0, self._pending_items[self._populated:])
+            self._pending_items = []
+
+    def _cancel_population(self):
+        """Drop the rows of a superseded rebuild that were not added yet."""
+        if self._populate_source_id:
+            GLib.source_remove(self._populate_source_id)
+            self._populate_source_id = None
+            self._pending_items = []
+
+    def _report_rebuild(self):
+        stats = self.rebuild_stats
+        if stats['longest_stall_ms'] > self.STALL_WARNING_MS:
+            print(f"Warning: station list rebuild ({stats['items']} rows) stalled "
+                  f"the main loop for {stats['longest_stall_ms']:.0f} ms")
+
+    def _build_items(self) -> List[StationItem]:
+        """Model items for the filtered stations, in display order.
+
+        Country headers are items with a None station. Item keys identify
+        an entry across rebuilds for update_stations.
+        """
+        if not self.filtered_stations:
+            return []
+
+        if self._matches_ranked and self.sort_field == "relevance":
+            order = self._matches
+        else:
+            order = self._sort_order(self._sort_fields())
+            if self._matches is not None:
+                # Keep the precomputed order, restricted to the matches
+                selected = bytearray(len(self.stations))
+                for index in self._matches:
+                    selected[index] = 1
+                order = [index for index in order if selected[index]]
+
+        if self.sort_field == "country":
+            # Group by country (default view)
+            return self._build_country_grouped_items(order)
+        model_items = self._model_items
+        return [model_items[i] for i in order]
+
+    def _build_country_grouped_items(self, order: List[int]) -> List[StationItem]:
+        """Items grouped by country, each group led by a header.
+
+        order is sorted by country already, so groups are consecutive.
+        """
+        model_items = self._model_items
+        if self._countries is None:
+            self._countries = self._column('country', 'Unknown')
+        countries = self._countries
+        items: List[Optional[StationItem]] = []
+        group_start = 0
+        country = None
+        for index in order:
+            if countries[index] != country or not items:
+                self._finish_group(items, group_start, country)
+                country = countries[index]
+                group_start = len(items)
+                items.append(None)  # Header, made once the group is counted
+            items.append(model_items[index])
+        self._finish_group(items, group_start, country)
+        return items
+
+    @staticmethod
+    def _finish_group(items: list, start: int, country: Optional[str]):
+        if items:
+            items[start] = StationItem(('header', country, len(items) - start - 1), None)
+
+    def _sort_fields(self) -> Tuple[str, ...]:
+        """Fields the current sort order sorts by, most significant first."""
+        if self.sort_field == "country":
+            # Netherlands first, then by country; most voted first within each
+            return ('country', 'votes')
+        if self.sort_field == "relevance":
+            return ('votes',)
+        return tuple(f.strip() for f in self.sort_field.split(',') if f.strip())
+
+    def _sort_order(self, fields: Tuple[str, ...]) -> List[int]:
+        """Station indexes sorted by fields, computed once per station list."""
+        order = self._sort_orders.get(fields)
+        if order is None:
+            order = list(range(len(self.stations)))
+            # Stable sorts, least significant field first
+            for field in reversed(fields):
+                values, descending = self._sort_values(field)
+                order.sort(key=values.__getitem__, reverse=descending)
+            self._sort_orders[fields] = order
+        return order
+
+    def _sort_values(self, field: str) -> Tuple[list, bool]:
+        """Sort key of every station for field, and whether to sort descending."""
+        stations = self.stations
+        if field == "country":
+            return [(c != 'The Netherlands', c.lower(), c)
+                    for c in self._column('country', 'Unknown')], False
+        if field == "name":
+            return [name.lower() for name in self._column('name')], False
+        if field in ("bitrate", "votes"):
+            return [value or 0 for value in self._column(field, 0)], True
+        if field == "start_time":
+            # Fastest to start first; unchecked, then unreachable stations last
+            health = self.health_func or (lambda uuid: None)
+            values = []
+            for station in stations:
+                result = health(station.get('stationuuid', ''))
+                start_ms = start_time_ms(result)
+                values.append((0 if start_ms is not None else 1 if result is None else 2,
+                               start_ms or 0))
+            return values, False
+        return [str(s.get(field, '')).lower() for s in stations], False
+
+    @staticmethod
+    def _station_key(station: Dict) -> tuple:
+        """Identity of a station entry across list updates."""
+        return ('station', station.get('stationuuid') or id(station))
+
+    def _on_factory_setup(self, factory, list_item: Gtk.ListItem):
+        size = self.favicon_loader.size if self.favicon_loader else None
+        list_item.set_child(StationRow(size))
+
+    def _on_factory_bind(self, factory, list_item: Gtk.ListItem):
+        item = list_item.get_item()
+        row = list_item.get_child()
+        # Headers can be neither selected nor activated
+        list_item.set_selectable(item.station is not None)
+        list_item.set_activatable(item.station is not None)
+        self._bound_rows[row] = item
+        if item.station is not None:
+            self._rows_by_uuid[item.station.get('stationuuid', '')] = row
+        self._bind_row(row, item)
+
+    def _on_factory_unbind(self, factory, list_item: Gtk.ListItem):
+        row = list_item.get_child()
+        item = self._bound_rows.pop(row, None)
+        if item is not None and item.station is not None:
+            uuid = item.station.get('stationuuid', '')
+            if self._rows_by_uuid.get(uuid) is row:
+                del self._rows_by_uuid[uuid]
+        row.favicon_url = None
+        self._schedule_favicon_cancel()
+
+    def _bind_row(self, row: StationRow, item: StationItem):
+        """Show an item in a row widget."""
+        station = item.station
+        row.header_label.set_visible(station is None)
+        row.station_box.set_visible(station is not None)
+
+        if station is None:
+            _, country, count = item.key
             escaped_country = GLib.markup_escape_text(country)
-            count = len(countries[country])
-            country_label.set_markup(
+            row.header_label.set_markup(
                 f'<span weight="bold" size="small" foreground="#666666">'
                 f'{escaped_country.upper()} ({count})</span>'
             )
-            country_label.set_xalign(0)
-            header_box.append(country_label)
-            header_row.set_child(header_box)
-            self.list_box.append(header_row)
-
-            # Add stations for this country (sorted by votes/popularity within country)
-            sorted_stations = sorted(countries[country], key=lambda s: s.get('votes', 0), reverse=True)
-            for station in sorted_stations:
-                row = self._create_station_row(station)
-                self.list_box.append(row)
-
-    def _build_flat_sorted_list(self):
-        """Build flat list sorted by current field."""
-        stations = list(self.filtered_stations)
-
-        if self.sort_field == "name":
-            stations.sort(key=lambda s: s.get('name', '').lower())
-        elif self.sort_field == "bitrate":
-            stations.sort(key=lambda s: s.get('bitrate', 0), reverse=True)
-        elif self.sort_field == "votes":
-            stations.sort(key=lambda s: s.get('votes', 0), reverse=True)
-
-        for station in stations:
-            row = self._create_station_row(station)
-            self.list_box.append(row)
-
-
-    def _create_station_row(self, station: Dict) -> Gtk.ListBoxRow:
-        """Create a list box row for a station."""
-        row = Gtk.ListBoxRow()
-        row.station_data = station  # Attach station data to row
-
-        box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=12)
-        box.set_margin_start(12)
-        box.set_margin_end(12)
-        box.set_margin_top(8)
-        box.set_margin_bottom(8)
-
-        # Station info box (vertical)
-        info_box = Gtk.Box(orientation=Gtk.Orientation.VERTICAL, spacing=2)
-        info_box.set_hexpand(True)
+            return
 
-        # Station name
-        name_label = Gtk.Label()
         name = GLib.markup_escape_text(station.get('name', 'Unknown Station'))
-        name_label.set_markup(f'<span weight="bold">{name}</span>')
-        name_label.set_xalign(0)
-        name_label.set_ellipsize(Pango.EllipsizeMode.END)
-        info_box.append(name_label)
+        row.name_label.set_markup(f'<span weight="bold">{name}</span>')
 
         # Station details (country, codec, bitrate)
         details = []
@@ -207,48 +823,105 @@ class StationListView(Gtk.Box):
         if bitrate:
             details.append(f"{bitrate} kbps")
 
-        if details:
-            details_text = " • ".join(details)
-            details_label = Gtk.Label()
-            details_label.set_markup(f'<span size="small" foreground="#888888">{details_text}</span>')
-            details_label.set_xalign(0)
-            details_label.set_ellipsize(Pango.EllipsizeMode.END)
-            info_box.append(details_label)
+        if self.health_func:
+            result = self.health_func(station.get('stationuuid', ''))
+            if result is not None:
+                start_ms = start_time_ms(result)
+                details.append(f"starts in {start_ms} ms" if start_ms is not None
+                               else "unreachable")
 
-        box.append(info_box)
+        details_text = GLib.markup_escape_text(" • ".join(details))
+        row.details_label.set_markup(f'<span size="small" foreground="#888888">{details_text}</span>')
+        row.details_label.set_visible(bool(details))
 
         # Favorite indicator
-        if self.is_favorite_func and self.is_favorite_func(station.get('stationuuid', '')):
-            fav_label = Gtk.Label(label="★")
-            fav_label.add_css_class("accent")
-            box.append(fav_label)
-
-        row.set_child(box)
-        return row
-
-    def _on_row_selected(self, list_box, row):
+        row.fav_label.set_visible(bool(
+            self.is_favorite_func and self.is_favorite_func(station.get('stationuuid', ''))
+        ))
+
+        if row.favicon_image is not None:
+            self._bind_favicon(row, station.get('favicon') or None)
+
+    def _bind_favicon(self, row: StationRow, url: Optional[str]):
+        """Show the favicon of url in a row, loading it if needed."""
+        row.favicon_url = url
+        texture = self.favicon_loader.lookup(url) if url else None
+        if texture is not None:
+            row.favicon_image.set_from_paintable(texture)
+            return
+
+        row.favicon_image.set_from_icon_name("audio-x-generic-symbolic")
+        if url:
+            def loaded(texture, row=row, url=url):
+                # The row may have been recycled for another station meanwhile
+                if row.favicon_url == url:
+                    row.favicon_image.set_from_paintable(texture)
+            self.favicon_loader.request(url, loaded)
+
+    def _schedule_favicon_cancel(self):
+        """Drop icon loads for rows scrolled away, shortly after they unbind."""
+        if not self.favicon_loader or self._favicon_source_id:
+            return
+        self._favicon_source_id = GLib.timeout_add(100, self._cancel_hidden_favicons)
+
+    def _cancel_hidden_favicons(self):
+        self._favicon_source_id = None
+        visible_urls = {row.favicon_url for row in self._bound_rows if row.favicon_url}
+        self.favicon_loader.cancel_pending(visible_urls)
+        return False
+
+    def _selected_uuid(self) -> Optional[str]:
+        item = self.selection.get_selected_item()
+        if item is None or item.station is None:
+            return None
+        return item.station.get('stationuuid')
+
+    def _select_uuid(self, station_uuid: str):
+        """Select the row of a station if it is listed."""
+        try:
+            position = self._item_keys.index(('station', station_uuid))
+        except ValueError:
+            return
+        if self.selection.get_selected() != position:
+            self.selection.set_selected(position)
+
+    def _on_selection_changed(self, selection, position, n_items):
         """Handle row selection."""
-        if row and hasattr(row, 'station_data') and self.on_station_selected:
-            self.on_station_selected(row.station_data)
+        item = selection.get_selected_item()
+        if item is not None and item.station is not None and self.on_station_selected:
+            self.on_station_selected(item.station)
 
-    def _on_row_activated(self, list_box, row):
+    def _on_activate(self, list_view, position: int):
         """Handle row activation (double-click or Enter)."""
-        if row and hasattr(row, 'station_data') and self.on_station_activated:
-            self.on_station_activated(row.station_data)
+        item = self.store.get_item(position)
+        if item is not None and item.station is not None and self.on_station_activated:
+            self.on_station_activated(item.station)
+
+    def update_favorite(self, station_uuid: str, is_favorite: bool):
+        """Show a station's changed favorite status; only its row is touched."""
+        row = self._rows_by_uuid.get(station_uuid)
+        if row is not None:
+            row.fav_label.set_visible(is_favorite)
 
     def refresh(self):
-        """Refresh the list (e.g., after favorites change)."""
-        self._rebuild_list()
+        """Refresh the shown rows (e.g., after favorites change)."""
+        for row, item in self._bound_rows.items():
+            self._bind_row(row, item)
+
+    def refresh_favorites(self):
+        """Update the favorite indicators of the shown rows in one lookup."""
+        rows = list(self._rows_by_uuid.items())
+        uuids = [uuid for uuid, _ in rows]
+        if self.is_favorite_many_func:
+            flags = self.is_favorite_many_func(uuids)
+        else:
+            flags = [bool(self.is_favorite_func and self.is_favorite_func(u)) for u in uuids]
+        for (_, row), is_favorite in zip(rows, flags):
+            row.fav_label.set_visible(is_favorite)
 
     def select_first(self):
         """Select the first station in the list (skip headers)."""
-        # Find first selectable row (skip country headers)
-        index = 0
-        while True:
-            row = self.list_box.get_row_at_index(index)
-            if row is None:
-                break
-            if row.get_selectable() and hasattr(row, 'station_data'):
-                self.list_box.select_row(row)
+        for position, station in enumerate(self._item_stations):
+            if station is not None:
+                self.selection.set_selected(position)
                 break
-            index += 1
@@ -0,0 +1,101 @@
+"""Shared test fixtures: stand-ins for the gi bindings (GObject, GLib, Gst)."""
+
+import importlib
+import sys
+import types
+
+import pytest
+
+# Modules that import gi and must be imported again against the fakes
+GI_MODULES = ('pyradio.config', 'pyradio.stream_prober', 'pyradio.favorites',
+              'pyradio.player', 'pyradio.fetch_worker', 'pyradio.favicons')
+
+
+class FakeGObject:
+    """GObject.GObject that records emitted signals and calls handlers."""
+
+    def __init__(self):
+        self.signals = []
+        self._handlers = {}
+
+    def connect(self, name, handler, *args):
+        self._handlers.setdefault(name, []).append((handler, args))
+        return len(self._handlers[name])
+
+    def emit(self, name, *args):
+        self.signals.append((name, *args))
+        for handler, extra in self._handlers.get(name, ()):
+            handler(self, *args, *extra)
+
+
+class FakeGLib:
+    """Timeouts and idle callbacks that only run when the test says so."""
+
+    def __init__(self):
+        self.sources = {}
+        self.next_id = 1
+
+    def timeout_add(self, interval, callback, *args):
+        source_id = self.next_id
+        self.next_id += 1
+        self.sources[source_id] = (interval, callback, args)
+        return source_id
+
+    timeout_add_seconds = timeout_add
+
+    def idle_add(self, callback, *args):
+        return self.timeout_add(0, callback, *args)
+
+    def source_remove(self, source_id):
+        self.sources.pop(source_id, None)
+
+    def intervals(self, callback_name):
+        """Intervals of the pending timeouts whose callback has the given name."""
+        return [interval for interval, callback, _ in self.sources.values()
+                if callback.__name__ == callback_name]
+
+    def run(self, callback_name=None):
+        """Run the pending callbacks (with the given name), once each."""
+        for source_id, (_, callback, args) in list(self.sources.items()):
+            if callback_name not in (None, callback.__name__) or source_id not in self.sources:
+                continue
+            del self.sources[source_id]
+            callback(*args)
+
+
+@pytest.fixture
+def fake_gi(monkeypatch):
+    """Import pyradio modules against fake gi modules.
+
+    Returns import_module(name) and exposes the fakes as attributes;
+    a test may add more to fake_gi.repository (e.g. Gst) before
+    importing.
+    """
+    saved = {name: sys.modules.get(name) for name in GI_MODULES}
+    repository = types.SimpleNamespace(
+        GLib=FakeGLib(),
+        GObject=types.SimpleNamespace(
+            GObject=FakeGObject,
+            SignalFlags=types.SimpleNamespace(RUN_FIRST=None, RUN_LAST=None),
+            type_register=lambda cls: None,
+        ),
+    )
+    gi = types.SimpleNamespace(require_version=lambda name, version: None,
+                               repository=repository)
+    monkeypatch.setitem(sys.modules, 'gi', gi)
+    monkeypatch.setitem(sys.modules, 'gi.repository', repository)
+    for name in GI_MODULES:
+        sys.modules.pop(name, None)
+
+    def import_module(name):
+        return importlib.import_module(name)
+
+    import_module.repository = repository
+    import_module.glib = repository.GLib
+    yield import_module
+
+    for name, module in saved.items():
+        if module is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = module
@@ -0,0 +1,204 @@
+"""Tests for favorites: order, groups, bulk lookups, metadata and playlist import."""
+
+import pytest
+
+
+class MemoryConfig:
+    """The part of Config that FavoritesManager uses, without the disk."""
+
+    def __init__(self, entries=()):
+        self.entries = [dict(e) for e in entries]
+        self.saves = 0
+
+    def load_favorites(self):
+        return [dict(e) for e in self.entries]
+
+    def save_favorites(self, favorites):
+        self.entries = [dict(e) for e in favorites]
+        self.saves += 1
+
+
+def station(uuid, **fields):
+    return {'stationuuid': uuid, 'name': f"Radio {uuid}", 'url': f"http://{uuid}.example/live",
+            **fields}
+
+
+@pytest.fixture
+def favorites_module(fake_gi):
+    return fake_gi('pyradio.favorites')
+
+
+@pytest.fixture
+def make_favorites(favorites_module):
+    def make(*uuids, config=None):
+        favorites = favorites_module.FavoritesManager(config or MemoryConfig())
+        for uuid in uuids:
+            favorites.add(station(uuid))
+        favorites.signals.clear()
+        return favorites
+    return make
+
+
+def test_favorites_keep_the_order_they_were_added_in(make_favorites):
+    favorites = make_favorites('a', 'b', 'c')
+    assert favorites.uuids() == ['a', 'b', 'c']
+    assert not favorites.add(station('b'))
+    assert [s['stationuuid'] for s in favorites.get_all()] == ['a', 'b', 'c']
+
+
+def test_move_changes_the_order_and_saves(make_favorites):
+    favorites = make_favorites('a', 'b', 'c', 'd')
+    config = favorites.config
+    assert favorites.move('d', 0)
+    assert favorites.uuids() == ['d', 'a', 'b', 'c']
+    assert favorites.move('d', 10)
+    assert favorites.uuids() == ['a', 'b', 'c', 'd']
+    assert not favorites.move('unknown', 0)
+    assert [e['stationuuid'] for e in config.entries] == ['a', 'b', 'c', 'd']
+    assert favorites.signals == [('reordered',), ('reordered',)]
+
+
+def test_reorder_keeps_unlisted_favorites_at_the_end(make_favorites):
+    favorites = make_favorites('a', 'b', 'c', 'd')
+    assert favorites.reorder(['c', 'unknown', 'a', 'c'])
+    assert favorites.uuids() == ['c', 'a', 'b', 'd']
+
+
+def test_reorder_to_the_same_order_does_nothing(make_favorites):
+    favorites = make_favorites('a', 'b')
+    saves = favorites.config.saves
+    assert not favorites.reorder(['a', 'b'])
+    assert favorites.config.saves == saves
+    assert favorites.signals == []
+
+
+def test_remove_and_toggle(make_favorites):
+    favorites = make_favorites('a', 'b')
+    assert favorites.remove('a')
+    assert not favorites.remove('a')
+    assert not favorites.toggle(station('b'))
+    assert favorites.toggle(station('c'))
+    assert favorites.uuids() == ['c']
+    assert favorites.signals == [('changed', 'a', False), ('changed', 'b', False),
+                                 ('changed', 'c', True)]
+
+
+def test_is_favorite_many_answers_in_the_given_order(make_favorites):
+    favorites = make_favorites('a', 'c')
+    assert favorites.is_favorite_many(['c', 'b', 'a', 'a', '']) == [True, False, True, True, False]
+    assert favorites.is_favorite_many([]) == []
+    assert favorites.is_favorite_many(iter(['a'])) == [True]
+
+
+def test_groups(make_favorites):
+    favorites = make_favorites('a', 'b', 'c', 'd')
+    assert favorites.set_group('c', 'Jazz')
+    assert favorites.set_group('a', 'News')
+    assert favorites.set_group('d', 'Jazz')
+    assert not favorites.set_group('d', 'Jazz')
+    assert not favorites.set_group('unknown', 'Jazz')
+
+    assert favorites.groups() == ['News', 'Jazz']  # In favorites order
+    assert [s['stationuuid'] for s in favorites.get_all('Jazz')] == ['c', 'd']
+    assert [s['stationuuid'] for s in favorites.get_all('')] == ['b']
+    assert favorites.get_group('b') == ''
+
+    favorites.rename_group('Jazz', 'News')  # Merges
+    assert [s['stationuuid'] for s in favorites.get_all('News')] == ['a', 'c', 'd']
+    favorites.remove_group('News')
+    assert favorites.groups() == []
+    assert favorites.get_count() == 4
+
+
+def test_removing_a_favorite_forgets_its_group(make_favorites):
+    favorites = make_favorites('a')
+    favorites.set_group('a', 'Jazz')
+    favorites.remove('a')
+    favorites.add(station('a'))
+    assert favorites.get_group('a') == ''
+
+
+def test_order_and_groups_survive_a_reload(make_favorites, favorites_module):
+    favorites = make_favorites('a', 'b', 'c')
+    favorites.set_group('b', 'Jazz')
+    favorites.move('c', 0)
+
+    reloaded = favorites_module.FavoritesManager(favorites.config)
+    assert reloaded.uuids() == ['c', 'a', 'b']
+    assert reloaded.get_group('b') == 'Jazz'
+    assert reloaded.get('a')['url'] == 'http://a.example/live'
+
+
+def test_only_a_slim_snapshot_is_saved(make_favorites, favorites_module):
+    config = MemoryConfig([station('a', tags='pop', votes=10, bitrate=0, url_alternate='')])
+    favorites_module.FavoritesManager(config)
+
+    # Old full records are slimmed down once, on load
+    assert config.saves == 1
+    assert config.entries == [{'stationuuid': 'a', 'name': 'Radio a',
+                               'url': 'http://a.example/live'}]
+
+
+def test_update_metadata_replaces_changed_records(make_favorites):
+    favorites = make_favorites('a', 'b')
+    fresh = [station('a', name='Radio A', tags='pop'), station('other')]
+    assert favorites.update_metadata(fresh) == ['a']
+    assert favorites.get('a')['name'] == 'Radio A'
+    assert favorites.config.entries[0]['name'] == 'Radio A'
+    assert favorites.signals == [('updated',)]
+
+
+def test_update_metadata_does_not_save_unchanged_snapshots(make_favorites, favorites_module):
+    favorites = make_favorites('a')
+    # As loaded from disk: only the snapshot fields that are set
+    reloaded = favorites_module.FavoritesManager(favorites.config)
+    saves = favorites.config.saves
+
+    full = station('a', url_alternate='', favicon='', bitrate=0, tags='pop', votes=3)
+    assert reloaded.update_metadata([full]) == ['a']  # The record gained fields
+    assert favorites.config.saves == saves
+    assert reloaded.update_metadata([full]) == []
+
+
+def write_playlist(tmp_path, *urls):
+    path = tmp_path / 'favorites.m3u'
+    lines = ['#EXTM3U']
+    for number, url in enumerate(urls):
+        lines += [f"#EXTINF:-1,Entry {number}", url]
+    path.write_text('\n'.join(lines) + '\n', encoding='utf-8')
+    return path
+
+
+def test_import_matches_main_and_alternate_urls(make_favorites, tmp_path):
+    favorites = make_favorites()
+    known = [
+        station('main'),
+        station('alt', url='http://alt.example/resolved', url_alternate='http://alt.example/listed'),
+    ]
+    path = write_playlist(tmp_path, 'http://main.example/live', 'http://alt.example/listed',
+                          'http://unknown.example/stream')
+
+    assert favorites.import_playlist(path, known, group='Imported') == (2, 1)
+    uuids = favorites.uuids()
+    assert uuids[:2] == ['main', 'alt']
+    assert favorites.get(uuids[2])['url'] == 'http://unknown.example/stream'
+    assert favorites.groups() == ['Imported']
+
+
+def test_import_prefers_a_main_url_over_another_stations_alternate(make_favorites, tmp_path):
+    favorites = make_favorites()
+    known = [
+        station('mirror', url='http://mirror.example/live', url_alternate='http://shared.example/'),
+        station('owner', url='http://shared.example/'),
+    ]
+    path = write_playlist(tmp_path, 'http://shared.example/')
+    assert favorites.import_playlist(path, known) == (1, 0)
+    assert favorites.uuids() == ['owner']
+
+
+def test_import_skips_existing_favorites_and_repeats(make_favorites, tmp_path):
+    favorites = make_favorites('main')
+    path = write_playlist(tmp_path, 'http://main.example/live', 'http://x.example/',
+                          'http://x.example/')
+    assert favorites.import_playlist(path, [station('main')]) == (0, 1)
+    assert favorites.get_count() == 2
@@ -0,0 +1,99 @@
+"""Tests for the pooled keep-alive HTTP transport."""
+
+import gzip
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pyradio.http_pool import HTTPConnectionPool, HTTPStatusError
+from pyradio.station_fetcher import StationFetcher
+
+STATIONS = [{'stationuuid': f"uuid-{i}", 'name': f"Radio {i}", 'url': f"http://radio{i}.example/live"}
+            for i in range(50)]
+BODY = json.dumps(STATIONS).encode('utf-8')
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = 64 * 1024
+
+    def setup(self):
+        self.server.connections += 1
+        super().setup()
+
+    def do_GET(self):
+        self.server.encodings.append(self.headers.get('Accept-Encoding', ''))
+        if self.path.startswith('/missing'):
+            self.send_response(404)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        body = gzip.compress(BODY)
+        self.send_response(200)
+        self.send_header('Content-Encoding', 'gzip')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    server.connections = 0
+    server.encodings = []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def base_url(server) -> str:
+    return f"http://127.0.0.1:{server.server_port}"
+
+
+def test_requests_to_one_host_reuse_a_connection(server):
+    pool = HTTPConnectionPool(timeout=5)
+    for _ in range(5):
+        assert pool.get(f"{base_url(server)}/json/stations") == BODY
+    pool.close()
+
+    assert server.connections == 1
+    assert pool.stats['requests'] == 5
+    assert pool.stats['connections_opened'] == 1
+
+
+def test_responses_are_requested_and_decoded_as_gzip(server):
+    pool = HTTPConnectionPool(timeout=5)
+    assert pool.get(f"{base_url(server)}/json/stations") == BODY
+    pool.close()
+
+    assert server.encodings == ['gzip']
+    assert pool.stats['bytes_decoded'] == len(BODY)
+    assert pool.stats['bytes_received'] < pool.stats['bytes_decoded']
+
+
+def test_error_status_keeps_the_connection(server):
+    pool = HTTPConnectionPool(timeout=5)
+    with pytest.raises(HTTPStatusError) as error:
+        pool.get(f"{base_url(server)}/missing")
+    assert error.value.status == 404
+    assert pool.get(f"{base_url(server)}/json/stations") == BODY
+    pool.close()
+
+    assert server.connections == 1
+
+
+def test_a_refresh_uses_one_connection_per_mirror(server):
+    fetcher = StationFetcher([base_url(server)])
+    stations = fetcher.fetch_mixed_stations()
+    fetcher.close()
+
+    assert len(stations) == len(STATIONS)
+    assert server.connections == 1
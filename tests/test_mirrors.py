@@ -0,0 +1,184 @@
+"""Tests for mirror ranking, circuit breakers and failover."""
+
+import json
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from pyradio import mirrors as mirrors_module
+from pyradio.mirrors import MirrorManager
+from pyradio.station_fetcher import FetchError, StationFetcher
+
+BODY = json.dumps([{'stationuuid': 'uuid-1', 'name': 'Radio 1'}]).encode('utf-8')
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    wbufsize = 64 * 1024
+
+    def do_GET(self):
+        self.server.hits += 1
+        time.sleep(self.server.delay)
+        status = self.server.status
+        body = BODY if status == 200 else b''
+        self.send_response(status)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def start_server():
+    """Starts stand-in API servers with a delay and response status."""
+    servers = []
+
+    def start(delay: float = 0.0, status: int = 200):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        server.daemon_threads = True
+        server.delay = delay
+        server.status = status
+        server.hits = 0
+        server.base_url = f"http://127.0.0.1:{server.server_port}"
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """A monotonic clock for the mirrors module that only moves when told."""
+    now = types.SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(mirrors_module, 'time', types.SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def urls(candidates):
+    return [m.base_url for m in candidates]
+
+
+def test_probes_rank_mirrors_fastest_first(start_server):
+    slow = start_server(delay=0.15)
+    fast = start_server()
+    medium = start_server(delay=0.05)
+    manager = MirrorManager([slow.base_url, fast.base_url, medium.base_url])
+    manager.probe_all()
+    manager.stop()
+
+    assert urls(manager.candidates()) == [fast.base_url, medium.base_url, slow.base_url]
+
+
+def test_unprobed_mirrors_follow_probed_ones_in_configured_order():
+    manager = MirrorManager(['http://a', 'http://b', 'http://c'])
+    manager.record_success(manager.mirrors[2], 0.2)
+
+    assert urls(manager.candidates()) == ['http://c', 'http://a', 'http://b']
+
+
+def test_latency_is_an_exponentially_weighted_average():
+    manager = MirrorManager(['http://a'])
+    mirror = manager.mirrors[0]
+    manager.record_success(mirror, 1.0)
+    manager.record_success(mirror, 0.0)
+    assert mirror.latency == pytest.approx(0.7)
+    # A success without a sample leaves the average alone
+    manager.record_success(mirror)
+    assert mirror.latency == pytest.approx(0.7)
+
+
+def test_breaker_opens_half_opens_and_closes(clock):
+    manager = MirrorManager(['http://a', 'http://b'], failure_threshold=2, cooldown=60)
+    a = manager.mirrors[0]
+
+    manager.record_failure(a)
+    assert urls(manager.candidates()) == ['http://a', 'http://b']  # Below the threshold
+
+    manager.record_failure(a)
+    assert urls(manager.candidates()) == ['http://b']  # Open
+
+    clock.value += 60
+    assert urls(manager.candidates()) == ['http://a', 'http://b']  # Half-open: one more try
+
+    # A failure on the trial request opens it again straight away
+    manager.record_failure(a)
+    assert urls(manager.candidates()) == ['http://b']
+
+    clock.value += 60
+    manager.record_success(a, 0.01)
+    assert a.failures == 0
+    manager.record_failure(a)
+    assert urls(manager.candidates()) == ['http://a', 'http://b']  # Closed: threshold again
+
+
+def test_all_breakers_open_returns_soonest_to_recover_first(clock):
+    manager = MirrorManager(['http://a', 'http://b'], failure_threshold=1, cooldown=60)
+    a, b = manager.mirrors
+    manager.record_failure(b)
+    clock.value += 10
+    manager.record_failure(a)
+
+    assert urls(manager.candidates()) == ['http://b', 'http://a']
+
+
+def test_requests_fail_over_and_skip_a_broken_mirror(start_server):
+    broken = start_server(status=500)
+    healthy = start_server()
+    fetcher = StationFetcher([broken.base_url, healthy.base_url])
+    fetcher.mirrors.failure_threshold = 2
+
+    for _ in range(4):
+        assert fetcher._request('stations') == json.loads(BODY)
+    fetcher.close()
+
+    assert broken.hits == 2  # Breaker open after the second failure
+    assert healthy.hits == 4
+
+
+def test_client_errors_do_not_fail_over(start_server):
+    missing = start_server(status=404)
+    healthy = start_server()
+    fetcher = StationFetcher([missing.base_url, healthy.base_url])
+
+    with pytest.raises(FetchError):
+        fetcher._request('stations')
+    fetcher.close()
+
+    assert healthy.hits == 0
+    assert fetcher.mirrors.mirrors[0].failures == 0
+
+
+def test_no_mirror_answering_raises_fetch_error(start_server):
+    first = start_server(status=503)
+    second = start_server(status=500)
+    fetcher = StationFetcher([first.base_url, second.base_url])
+
+    with pytest.raises(FetchError):
+        fetcher._request('stations')
+    fetcher.close()
+
+    assert (first.hits, second.hits) == (1, 1)
+
+
+def test_background_probing_measures_every_mirror(start_server):
+    servers = [start_server(), start_server(delay=0.02)]
+    manager = MirrorManager([s.base_url for s in servers])
+    manager.start_probing(interval=60)
+
+    deadline = time.monotonic() + 5
+    while any(m.latency is None for m in manager.mirrors) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    manager.stop()
+    manager._probe_thread.join(timeout=5)
+
+    assert all(m.latency is not None for m in manager.mirrors)
+    assert not manager._probe_thread.is_alive()
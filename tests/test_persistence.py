@@ -0,0 +1,91 @@
+"""Tests for atomic writes and the write-behind writer."""
+
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+from pyradio.persistence import WriteBehindWriter, atomic_write
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def leftover_temp_files(directory: Path):
+    return [p.name for p in directory.iterdir() if p.name.endswith('.tmp')]
+
+
+def test_repeated_saves_coalesce_into_one_write(tmp_path):
+    path = tmp_path / 'config.json'
+    writer = WriteBehindWriter(delay=0.2)
+    for volume in range(50):
+        writer.schedule(path, lambda volume=volume: f'{{"volume": {volume}}}'.encode())
+    time.sleep(0.6)
+    writer.close()
+
+    assert writer.scheduled == 50
+    assert writer.writes == 1
+    assert path.read_bytes() == b'{"volume": 49}'
+
+
+def test_close_writes_pending_saves(tmp_path):
+    path = tmp_path / 'favorites.json'
+    writer = WriteBehindWriter(delay=60)
+    writer.schedule(path, lambda: b'first')
+    writer.schedule(path, lambda: b'second')
+    writer.close()
+
+    assert writer.writes == 1
+    assert path.read_bytes() == b'second'
+
+
+def test_failed_render_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'favorites.json'
+    path.write_bytes(b'old')
+
+    def render():
+        raise ValueError("render failed")
+
+    writer = WriteBehindWriter(delay=0)
+    writer.schedule(path, render)
+    writer.close()
+
+    assert writer.writes == 0
+    assert path.read_bytes() == b'old'
+    assert leftover_temp_files(tmp_path) == []
+
+
+def test_error_mid_write_keeps_the_old_file(tmp_path, monkeypatch):
+    path = tmp_path / 'favorites.json'
+    path.write_bytes(b'old')
+
+    def failing_replace(src, dst):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(os, 'replace', failing_replace)
+    with pytest.raises(OSError):
+        atomic_write(path, b'new' * 1000, fsync=True)
+
+    assert path.read_bytes() == b'old'
+    assert leftover_temp_files(tmp_path) == []
+
+
+def test_process_killed_mid_write_keeps_the_old_file(tmp_path):
+    path = tmp_path / 'favorites.json'
+    path.write_bytes(b'old')
+
+    # The process dies after writing the temporary file but before it
+    # replaces the old one, as on a crash or power loss
+    script = (
+        "import os, sys\n"
+        "from pathlib import Path\n"
+        "from pyradio.persistence import atomic_write\n"
+        "os.replace = lambda src, dst: os._exit(1)\n"
+        "atomic_write(Path(sys.argv[1]), b'new' * 1000, fsync=True)\n"
+    )
+    result = subprocess.run([sys.executable, '-c', script, str(path)], cwd=ROOT)
+
+    assert result.returncode == 1
+    assert path.read_bytes() == b'old'
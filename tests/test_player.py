@@ -0,0 +1,291 @@
+"""Tests for the player's standby pipelines and reconnects, on a faked GStreamer."""
+
+import types
+
+import pytest
+
+
+class FakeBus:
+    def __init__(self):
+        self.watched = False
+        self.handler = None
+
+    def add_signal_watch(self):
+        self.watched = True
+
+    def remove_signal_watch(self):
+        self.watched = False
+
+    def connect(self, signal, handler, *args):
+        self.handler = (handler, args)
+
+
+class FakePlaybin:
+    def __init__(self, name=None):
+        self.name = name
+        self.state = 'NULL'
+        self.properties = {'volume': 1.0}
+        self.bus = FakeBus()
+
+    def get_bus(self):
+        return self.bus
+
+    def set_property(self, name, value):
+        self.properties[name] = value
+
+    def get_property(self, name):
+        return self.properties.get(name)
+
+    def set_state(self, state):
+        self.state = state
+        return 'SUCCESS'
+
+    def post(self, message_type, **fields):
+        """Deliver a bus message the way the signal watch does."""
+        handler, args = self.bus.handler
+        handler(self.bus, types.SimpleNamespace(type=message_type, src=self, **fields), *args)
+
+    def post_playing(self):
+        self.post('STATE_CHANGED', parse_state_changed=lambda: ('PAUSED', 'PLAYING', 'VOID_PENDING'))
+
+    def post_error(self, domain='resource', code='READ'):
+        error = types.SimpleNamespace(message=f"{domain} error",
+                                      matches=lambda quark, c: (quark, c) == (domain, code))
+        self.post('ERROR', parse_error=lambda: (error, None))
+
+
+def make_gst(playbins):
+    def make(factory, name=None):
+        playbin = FakePlaybin(name)
+        playbins.append(playbin)
+        return playbin
+
+    states = types.SimpleNamespace(NULL='NULL', READY='READY', PAUSED='PAUSED', PLAYING='PLAYING')
+    message_types = types.SimpleNamespace(**{name: name for name in (
+        'ERROR', 'EOS', 'TAG', 'STATE_CHANGED', 'BUFFERING', 'LATENCY', 'CLOCK_LOST', 'QOS')})
+    return types.SimpleNamespace(
+        init=lambda args: None,
+        ElementFactory=types.SimpleNamespace(make=make),
+        StreamError=types.SimpleNamespace(quark=lambda: 'stream', CODEC_NOT_FOUND='CODEC_NOT_FOUND'),
+        CoreError=types.SimpleNamespace(quark=lambda: 'core', MISSING_PLUGIN='MISSING_PLUGIN'),
+        State=states,
+        StateChangeReturn=types.SimpleNamespace(SUCCESS='SUCCESS', FAILURE='FAILURE'),
+        MessageType=message_types,
+    )
+
+
+@pytest.fixture
+def env(fake_gi):
+    """The player module imported against fake gi modules."""
+    playbins = []
+    fake_gi.repository.Gst = make_gst(playbins)
+    player_module = fake_gi('pyradio.player')
+    return types.SimpleNamespace(Player=player_module.Player, module=player_module,
+                                 playbins=playbins, glib=fake_gi.glib)
+
+
+def preroll(env, player, url):
+    player.preroll(url)
+    env.glib.run('_start_preroll')
+
+
+def test_selected_station_plays_from_its_prerolled_pipeline(env):
+    player = env.Player(max_standby=2)
+    audible = player.playbin
+    player.set_volume(0.4)
+
+    preroll(env, player, 'http://b.example/live')
+    standby = env.playbins[-1]
+    assert standby.state == 'PAUSED'
+    assert standby.get_property('uri') == 'http://b.example/live'
+
+    player.play('http://b.example/live')
+
+    assert player.playbin is standby
+    assert standby.state == 'PLAYING'
+    assert standby.get_property('volume') == 0.4
+    assert len(env.playbins) == 2  # No new pipeline for the play
+    # The previous audible pipeline is released
+    assert audible.state == 'NULL' and not audible.bus.watched
+    assert player._standby == {}
+
+
+def test_selection_is_only_prerolled_once_it_rests(env):
+    player = env.Player(max_standby=2)
+    for url in ('http://a.example/', 'http://b.example/', 'http://c.example/'):
+        player.preroll(url)
+    env.glib.run('_start_preroll')
+
+    assert list(player._standby) == ['http://c.example/']
+    assert len(env.playbins) == 2
+
+
+def test_least_recently_requested_standby_is_released(env):
+    player = env.Player(max_standby=2)
+    preroll(env, player, 'http://a.example/')
+    first = env.playbins[-1]
+    preroll(env, player, 'http://b.example/')
+    preroll(env, player, 'http://c.example/')
+
+    assert list(player._standby) == ['http://b.example/', 'http://c.example/']
+    assert first.state == 'NULL' and not first.bus.watched
+
+
+def test_expired_and_failed_standbys_are_released(env):
+    player = env.Player(max_standby=2)
+    preroll(env, player, 'http://a.example/')
+    expired = env.playbins[-1]
+    env.glib.run('_expire_standby')
+    assert player._standby == {}
+    assert expired.state == 'NULL' and not expired.bus.watched
+
+    preroll(env, player, 'http://b.example/')
+    failed = env.playbins[-1]
+    failed.post('EOS')
+    assert player._standby == {}
+    assert failed.state == 'NULL' and not failed.bus.watched
+    assert not any(signal[0] == 'error' for signal in player.signals)
+
+
+def test_cleanup_releases_every_standby(env):
+    player = env.Player(max_standby=2)
+    preroll(env, player, 'http://a.example/')
+    preroll(env, player, 'http://b.example/')
+    player.cleanup()
+
+    assert all(playbin.state == 'NULL' for playbin in env.playbins)
+    assert env.glib.sources == {}
+
+
+def test_end_of_stream_while_playing_reconnects(env):
+    player = env.Player()
+    player.play('http://a.example/live')
+    player.playbin.post('EOS')
+
+    assert ('reconnecting', 1) == player.signals[-2][:2]
+    assert not any(signal[0] == 'error' for signal in player.signals)
+
+
+def test_late_end_of_stream_after_stop_is_ignored(env):
+    player = env.Player()
+    player.play('http://a.example/live')
+    player.stop()
+    player.signals.clear()
+
+    player.playbin.post('EOS')
+    player.playbin.post('ERROR')
+
+    assert player.signals == []
+
+
+@pytest.fixture
+def longest_delays(env, monkeypatch):
+    """Take the top of every randomized reconnect delay."""
+    monkeypatch.setattr(env.module.random, 'uniform', lambda low, high: high)
+
+
+def signal_names(player):
+    return [signal[0] for signal in player.signals]
+
+
+def fail_and_retry(env, player):
+    """The stream drops; returns the reconnect delay (ms) and runs the attempt."""
+    player.playbin.post('EOS')
+    delays = env.glib.intervals('_on_reconnect_due')
+    env.glib.run('_on_reconnect_due')
+    return delays[0] if delays else None
+
+
+def test_reconnect_delays_double_up_to_the_cap(env, longest_delays):
+    player = env.Player(retry_budget=8)
+    player.play('http://a.example/live')
+
+    delays = [fail_and_retry(env, player) for _ in range(8)]
+    assert delays == [1000, 2000, 4000, 8000, 16000, 30000, 30000, 30000]
+
+
+def test_reconnect_delays_are_randomized_down_to_half(env, monkeypatch):
+    bounds = []
+    monkeypatch.setattr(env.module.random, 'uniform',
+                        lambda low, high: bounds.append((low, high)) or low)
+    player = env.Player()
+    player.play('http://a.example/live')
+
+    assert [fail_and_retry(env, player) for _ in range(3)] == [500, 1000, 2000]
+    assert bounds == [(0.5, 1.0), (1.0, 2.0), (2.0, 4.0)]
+
+
+def test_reconnects_alternate_between_the_station_urls(env, longest_delays):
+    player = env.Player()
+    player.play('http://a.example/live', 'http://a.example/alternate')
+    assert player.playbin.get_property('uri') == 'http://a.example/live'
+
+    uris = []
+    for _ in range(3):
+        fail_and_retry(env, player)
+        uris.append(player.playbin.get_property('uri'))
+        assert player.playbin.state == 'PLAYING'
+    assert uris == ['http://a.example/alternate', 'http://a.example/live',
+                    'http://a.example/alternate']
+
+
+def test_spent_retry_budget_emits_error_and_stops(env, longest_delays):
+    player = env.Player(retry_budget=3)
+    player.play('http://a.example/live')
+    for _ in range(3):
+        fail_and_retry(env, player)
+    assert 'error' not in signal_names(player)
+
+    player.playbin.post('EOS')
+
+    assert ('error', "The station stopped streaming") in player.signals
+    assert not player.is_playing
+    assert env.glib.intervals('_on_reconnect_due') == []
+    assert [s[1] for s in player.signals if s[0] == 'reconnecting'] == [1, 2, 3]
+
+
+def test_a_failure_while_waiting_does_not_count_twice(env, longest_delays):
+    player = env.Player()
+    player.play('http://a.example/live')
+    player.playbin.post('EOS')
+    player.playbin.post_error()
+
+    assert [s[1] for s in player.signals if s[0] == 'reconnecting'] == [1]
+    assert len(env.glib.intervals('_on_reconnect_due')) == 1
+
+
+def test_unrecoverable_errors_do_not_reconnect(env):
+    player = env.Player()
+    player.play('http://a.example/live')
+    player.playbin.post_error('core', 'MISSING_PLUGIN')
+
+    assert 'reconnecting' not in signal_names(player)
+    assert ('error', "Playback error: core error") in player.signals
+    assert not player.is_playing
+
+
+def test_stable_play_restores_the_retry_budget(env, longest_delays):
+    player = env.Player(retry_budget=3)
+    player.play('http://a.example/live')
+    fail_and_retry(env, player)
+    fail_and_retry(env, player)
+
+    player.playbin.post_playing()
+    assert ('reconnected', 2) == player.signals[-1][:2]
+    assert env.glib.intervals('_on_stable') == [player.RECONNECT_STABLE_S]
+    env.glib.run('_on_stable')
+
+    # A new outage starts again from the first, shortest delay
+    assert fail_and_retry(env, player) == 1000
+    assert [s[1] for s in player.signals if s[0] == 'reconnecting'] == [1, 2, 1]
+
+
+def test_failure_before_play_is_stable_keeps_counting(env, longest_delays):
+    player = env.Player(retry_budget=3)
+    player.play('http://a.example/live')
+    fail_and_retry(env, player)
+    player.playbin.post_playing()
+
+    # Dropped again within RECONNECT_STABLE_S: no reset
+    assert fail_and_retry(env, player) == 2000
+    assert env.glib.intervals('_on_stable') == []
@@ -0,0 +1,183 @@
+"""Tests for playback quality records and their history."""
+
+import json
+import types
+
+import pytest
+
+from pyradio import qos
+from pyradio.qos import PlaySession, QosStore, summarize
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Monotonic and wall clocks that only move when told to."""
+    clock = types.SimpleNamespace(now=1000.0, wall=1_700_000_000.0)
+
+    def advance(seconds):
+        clock.now += seconds
+        clock.wall += seconds
+
+    clock.advance = advance
+    monkeypatch.setattr(qos, 'time', types.SimpleNamespace(monotonic=lambda: clock.now,
+                                                           time=lambda: clock.wall))
+    return clock
+
+
+def test_time_to_audio_and_listening_time(clock):
+    session = PlaySession('http://example.com/live')
+    clock.advance(0.5)
+    session.audio_started()
+    clock.advance(0.25)
+    session.audio_started()  # Only the first counts
+    assert session.time_to_audio_ms == 500
+
+    clock.advance(9.25)
+    assert session.listened_ms == 9500
+    session.finish()
+    clock.advance(60)
+    assert session.listened_ms == 9500
+    assert session.ended_at - session.started_at == pytest.approx(10.0)
+
+
+def test_listening_time_ignores_wall_clock_jumps(clock):
+    session = PlaySession('http://example.com/live')
+    clock.advance(0.5)
+    session.audio_started()
+    clock.advance(10)
+    clock.wall -= 3600  # The system clock was set back
+    session.finish()
+    assert session.listened_ms == 10000
+
+
+def test_no_audio_means_no_listening_time(clock):
+    session = PlaySession('http://example.com/live')
+    clock.advance(5)
+    session.finish()
+    assert session.listened_ms == 0
+    assert session.rebuffer_ratio == 0.0
+
+
+def test_buffering_is_counted_after_audio_started(clock):
+    session = PlaySession('http://example.com/live')
+    session.buffering(10)  # Before the first audio: part of the start time
+    clock.advance(1)
+    session.audio_started()
+    clock.advance(9)
+
+    session.buffering(0)
+    clock.advance(1)
+    session.buffering(50)  # Still the same event
+    clock.advance(1)
+    session.buffering(100)
+    session.buffering(100)
+    clock.advance(8)
+    assert session.buffering_events == 1
+    assert session.buffering_ms == 2000
+    assert session.rebuffer_ratio == pytest.approx(2000 / 19000)
+
+
+def test_unfinished_buffering_counts_until_the_end(clock):
+    session = PlaySession('http://example.com/live')
+    session.audio_started()
+    session.buffering(20)
+    clock.advance(3)
+    session.finish()
+    assert session.buffering_events == 1
+    assert session.buffering_ms == 3000
+
+
+def test_bitrate_timeline_is_capped(clock, monkeypatch):
+    monkeypatch.setattr(qos, 'MAX_TIMELINE', 3)
+    session = PlaySession('http://example.com/live')
+    for kbps in (128, 96, 128, 64):
+        clock.advance(2)
+        session.bitrate(kbps)
+    assert session.bitrate_timeline == [[2, 128], [4, 96], [6, 128]]
+
+
+def session_dict(time_to_audio_ms=300, listened_ms=10000, **fields):
+    return {'time_to_audio_ms': time_to_audio_ms, 'listened_ms': listened_ms, **fields}
+
+
+def test_summarize():
+    summary = summarize([
+        session_dict(200, buffering_events=1, buffering_ms=500, reconnects=1),
+        session_dict(None, listened_ms=0),
+        session_dict(900, underruns=3),
+        session_dict(400, buffering_events=2, buffering_ms=1500),
+    ])
+    assert summary == {
+        'plays': 4,
+        'failed_starts': 1,
+        'median_time_to_audio_ms': 400,
+        'buffering_events': 3,
+        'rebuffer_ratio': 0.0667,
+        'underruns': 3,
+        'reconnects': 1,
+        'listened_ms': 30000,
+    }
+
+
+def test_summarize_without_plays():
+    summary = summarize([])
+    assert summary['plays'] == 0
+    assert summary['median_time_to_audio_ms'] is None
+    assert summary['rebuffer_ratio'] == 0.0
+
+
+def test_store_keeps_the_last_sessions_per_station(monkeypatch):
+    monkeypatch.setattr(qos, 'SESSIONS_PER_STATION', 3)
+    store = QosStore()
+    for number in range(5):
+        store.add('a', session_dict(number))
+    assert [s['time_to_audio_ms'] for s in store.sessions('a')] == [2, 3, 4]
+    assert store.summary('a')['plays'] == 3
+    assert store.summary('unknown') is None
+
+
+def test_store_drops_the_least_recently_played_stations(monkeypatch):
+    monkeypatch.setattr(qos, 'MAX_STATIONS', 2)
+    store = QosStore()
+    store.add('a', session_dict())
+    store.add('b', session_dict())
+    store.add('a', session_dict())  # a is now the most recently played
+    store.add('c', session_dict())
+    assert store.sessions('b') == []
+    assert len(store.sessions('a')) == 2
+    assert len(store.sessions('c')) == 1
+
+
+def test_copy_is_independent():
+    store = QosStore()
+    store.add('a', session_dict())
+    copy = store.copy()
+    store.add('a', session_dict())
+    assert len(copy.sessions('a')) == 1
+
+
+def test_store_round_trips(clock):
+    store = QosStore()
+    session = PlaySession('http://example.com/live')
+    clock.advance(0.25)
+    session.audio_started()
+    session.bitrate(128)
+    clock.advance(30)
+    session.finish()
+    store.add('a', session.to_dict())
+    store.add('b', session_dict(reconnects=2))
+
+    for pretty in (False, True):
+        data = store.to_bytes(pretty)
+        loaded = QosStore.from_bytes(data)
+        assert loaded.sessions('a') == store.sessions('a')
+        assert loaded.sessions('b') == store.sessions('b')
+        assert json.loads(data)['stations']['a']['summary'] == store.summary('a')
+    assert loaded.sessions('a')[0]['listened_ms'] == 30000
+
+
+def test_unusable_history_loads_empty():
+    assert QosStore.from_bytes(b'not json').sessions('a') == []
+    assert QosStore.from_bytes(b'{"version": 0, "stations": {"a": {"sessions": [{}]}}}') \
+        .sessions('a') == []
+    assert QosStore.from_bytes(b'{"version": 1, "stations": {"a": {}}}').sessions('a') == []
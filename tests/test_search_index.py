@@ -0,0 +1,127 @@
+"""Tests for the local station search index."""
+
+import json
+
+import pytest
+
+from pyradio.search_index import SearchIndex, edit_distance, fold, index_tokens
+
+STATIONS = [
+    {'stationuuid': 'npo2', 'name': 'NPO Radio 2', 'tags': 'pop,classic hits',
+     'country': 'The Netherlands', 'language': 'dutch', 'votes': 900},
+    {'stationuuid': 'qmusic', 'name': 'Qmusic', 'tags': 'pop,hits',
+     'country': 'The Netherlands', 'language': 'dutch', 'votes': 700},
+    {'stationuuid': 'radio2be', 'name': 'Radio2 Antwerpen', 'tags': 'regional',
+     'country': 'Belgium', 'language': 'dutch', 'votes': 50},
+    {'stationuuid': 'cafe', 'name': 'Café Jazz FM', 'tags': 'jazz,lounge',
+     'country': 'France', 'language': 'french', 'votes': 10},
+    {'stationuuid': 'popfm', 'name': 'Pop FM', 'tags': 'top 40',
+     'country': 'Germany', 'language': 'german', 'votes': 5},
+    {'stationuuid': 'hits', 'name': 'Hits Radio', 'tags': 'pop',
+     'country': 'United Kingdom', 'language': 'english', 'votes': 5000},
+]
+
+
+@pytest.fixture
+def index():
+    return SearchIndex.build(STATIONS)
+
+
+def found(index, text, limit=None):
+    return [STATIONS[i]['stationuuid'] for i in index.search(text, limit)]
+
+
+def test_joined_and_split_words_match(index):
+    assert 'npo2' in found(index, 'npo radio2')
+    assert 'radio2be' in found(index, 'radio 2')
+
+
+def test_every_word_must_match(index):
+    assert found(index, 'npo radio 2') == ['npo2']
+    assert found(index, 'npo jazz') == []
+
+
+def test_accents_and_case_are_ignored(index):
+    assert found(index, 'CAFE') == ['cafe']
+    assert fold('Café') == 'cafe'
+
+
+def test_prefixes_match(index):
+    assert found(index, 'qmu') == ['qmusic']
+
+
+def test_typos_are_tolerated(index):
+    assert found(index, 'qmuzik') == ['qmusic']
+    assert found(index, 'antwrepen') == ['radio2be']  # Transposition
+
+
+def test_short_words_are_not_matched_fuzzily(index):
+    assert found(index, 'jzz') == []  # Not a prefix; too short for typos
+
+
+def test_name_matches_rank_above_tag_matches():
+    index = SearchIndex.build([
+        {'stationuuid': 'tag', 'name': 'Hits Radio', 'tags': 'pop', 'votes': 100},
+        {'stationuuid': 'name', 'name': 'Pop FM', 'tags': 'hits', 'votes': 100},
+    ])
+    assert [index.uuids[i] for i in index.search('pop')] == ['name', 'tag']
+
+
+def test_votes_order_equal_matches(index):
+    assert found(index, 'dutch') == ['npo2', 'qmusic', 'radio2be']
+
+
+def test_exact_words_rank_above_prefixes():
+    index = SearchIndex.build([
+        {'stationuuid': 'prefix', 'name': 'Rockabilly Radio', 'votes': 10},
+        {'stationuuid': 'exact', 'name': 'Rock Radio', 'votes': 0},
+    ])
+    assert [index.uuids[i] for i in index.search('rock')] == ['exact', 'prefix']
+
+
+def test_limit(index):
+    assert len(index.search('dutch', limit=2)) == 2
+
+
+def test_adding_in_batches_matches_building_at_once(index):
+    batched = SearchIndex()
+    batched.add(STATIONS[:2])
+    assert batched.search('qmusic') == [1]
+    batched.add(STATIONS[2:])
+    for text in ('npo radio2', 'pop', 'qmuzik', 'dutch'):
+        assert batched.search(text) == index.search(text)
+
+
+def test_index_tokens_include_word_parts_and_pairs():
+    assert {'radio2', 'radio', '2'} <= index_tokens('Radio2')
+    assert 'radio2' in index_tokens('NPO Radio 2')
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance('qmuzik', 'qmusic', 2) == 2
+    assert edit_distance('ab', 'ba', 1) == 1
+    assert edit_distance('radio', 'jazz', 1) == 2  # Above the limit
+
+
+def test_serialized_index_round_trips(index):
+    loaded = SearchIndex.from_bytes(index.to_bytes(123.0), 123.0, STATIONS)
+    assert loaded is not None
+    for text in ('npo radio2', 'pop', 'qmuzik', 'cafe', 'qmu'):
+        assert loaded.search(text) == index.search(text)
+
+
+def test_stale_serialized_index_is_rejected(index):
+    data = index.to_bytes(123.0)
+    assert SearchIndex.from_bytes(data, 124.0) is None  # Other cache
+    assert SearchIndex.from_bytes(data, 123.0, STATIONS[:-1]) is None
+    assert SearchIndex.from_bytes(data, 123.0, list(reversed(STATIONS))) is None
+
+
+def test_damaged_serialized_index_is_rejected(index):
+    state = json.loads(index.to_bytes(123.0))
+    assert SearchIndex.from_bytes(b'not json', 123.0) is None
+    assert SearchIndex.from_bytes(json.dumps(dict(state, version=0)).encode(), 123.0) is None
+    assert SearchIndex.from_bytes(json.dumps(dict(state, tokens=state['tokens'][1:])).encode(),
+                                  123.0) is None
+    del state['postings']
+    assert SearchIndex.from_bytes(json.dumps(state).encode(), 123.0) is None
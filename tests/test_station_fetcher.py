@@ -0,0 +1,113 @@
+"""Tests for delta syncs: the changed-stations feed and merging changes."""
+
+import pytest
+
+from pyradio.station_fetcher import StationFetcher
+
+
+class ScriptedFetcher(StationFetcher):
+    """StationFetcher answering API requests from a list of responses."""
+
+    def __init__(self, responses):
+        super().__init__(['http://127.0.0.1:9'])
+        self.responses = list(responses)
+        self.requests = []
+
+    def _request(self, endpoint, params=None):
+        self.requests.append((endpoint, dict(params or {})))
+        return self.responses.pop(0)
+
+
+def change(uuid, changeuuid):
+    return {'stationuuid': uuid, 'changeuuid': changeuuid}
+
+
+def station(uuid, name, **fields):
+    return {'stationuuid': uuid, 'name': name, 'url': f"http://{uuid}.example/live", **fields}
+
+
+@pytest.fixture
+def fetcher_for():
+    fetchers = []
+
+    def make(responses):
+        fetcher = ScriptedFetcher(responses)
+        fetchers.append(fetcher)
+        return fetcher
+
+    yield make
+    for fetcher in fetchers:
+        fetcher.close()
+
+
+def test_changes_are_paged_from_the_last_marker(fetcher_for):
+    fetcher = fetcher_for([
+        [change('a', 'c1'), change('b', 'c2')],
+        [change('a', 'c3')],
+    ])
+    result = fetcher.fetch_changes('c0', page_size=2)
+
+    assert result == ({'a', 'b'}, 'c3')
+    assert [params['lastchangeuuid'] for _, params in fetcher.requests] == ['c0', 'c2']
+
+
+def test_no_changes_keeps_the_marker(fetcher_for):
+    fetcher = fetcher_for([[]])
+    assert fetcher.fetch_changes('c0', page_size=2) == (set(), 'c0')
+
+
+def test_too_many_changes_falls_back_to_a_full_sync(fetcher_for):
+    fetcher = fetcher_for([
+        [change('a', 'c1'), change('b', 'c2')],
+        [change('c', 'c3'), change('d', 'c4')],
+    ])
+    assert fetcher.fetch_changes('c0', page_size=2, max_changes=3) is None
+    assert len(fetcher.requests) == 2
+
+
+def test_full_page_without_a_marker_falls_back_to_a_full_sync(fetcher_for):
+    fetcher = fetcher_for([
+        [{'stationuuid': 'a'}, {'stationuuid': 'b'}],
+        [{'stationuuid': 'a'}, {'stationuuid': 'b'}],
+    ])
+    assert fetcher.fetch_changes('c0', page_size=2) is None
+    assert len(fetcher.requests) == 1  # Did not ask for the same page again
+
+
+def test_page_marker_skips_entries_without_one(fetcher_for):
+    fetcher = fetcher_for([
+        [change('a', 'c1'), {'stationuuid': 'b'}],
+        [change('c', 'c2')],
+    ])
+    assert fetcher.fetch_changes('c0', page_size=2) == ({'a', 'b', 'c'}, 'c2')
+    assert fetcher.requests[1][1]['lastchangeuuid'] == 'c1'
+
+
+def test_lookups_are_batched_and_drop_broken_stations(fetcher_for):
+    fetcher = fetcher_for([
+        [station('a', 'A'), station('b', 'B', lastcheckok=0)],
+        [station('c', 'C')],
+    ])
+    stations = fetcher.fetch_by_uuids(['a', 'b', 'c'], batch_size=2)
+
+    assert [s['stationuuid'] for s in stations] == ['a', 'c']
+    assert [params['uuids'] for _, params in fetcher.requests] == ['a,b', 'c']
+
+
+def test_merge_updates_in_place_and_drops_removed_stations():
+    stations = [station('a', 'A'), station('b', 'B'), station('c', 'C')]
+    current = [station('c', 'C 2'), station('a', 'A 2')]
+    merged = StationFetcher.merge_changes(stations, {'a', 'b', 'c'}, current)
+
+    assert [(s['stationuuid'], s['name']) for s in merged] == [('a', 'A 2'), ('c', 'C 2')]
+
+
+def test_merge_only_adds_new_stations_when_asked():
+    stations = [station('a', 'A')]
+    current = [station('a', 'A 2'), station('n', 'New')]
+
+    merged = StationFetcher.merge_changes(stations, {'a', 'n'}, current)
+    assert [s['stationuuid'] for s in merged] == ['a']
+
+    merged = StationFetcher.merge_changes(stations, {'a', 'n'}, current, add_new=True)
+    assert [(s['stationuuid'], s['name']) for s in merged] == [('a', 'A 2'), ('n', 'New')]
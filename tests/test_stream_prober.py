@@ -0,0 +1,202 @@
+"""Tests for stream probing against a local socket server."""
+
+import socket
+import threading
+import time
+
+import pytest
+
+AUDIO = b'\xff\xfb\x90\x00' * 64  # MP3 frame headers are enough for the prober
+
+
+@pytest.fixture
+def prober_module(fake_gi):
+    return fake_gi('pyradio.stream_prober')
+
+
+@pytest.fixture
+def serve():
+    """Start a server that answers each path with scripted raw bytes."""
+    listeners = []
+
+    def start(responses):
+        listener = socket.socket()
+        listener.bind(('127.0.0.1', 0))
+        listener.listen()
+        listeners.append(listener)
+
+        def answer(conn):
+            with conn:
+                request = b''
+                while b'\r\n\r\n' not in request:
+                    chunk = conn.recv(4096)
+                    if not chunk:
+                        return
+                    request += chunk
+                path = request.split(None, 2)[1].decode('latin-1')
+                try:
+                    for part in responses[path]:
+                        conn.sendall(part)
+                except OSError:
+                    pass  # The prober hung up
+
+        def accept():
+            while True:
+                try:
+                    conn, _ = listener.accept()
+                except OSError:
+                    return
+                threading.Thread(target=answer, args=(conn,), daemon=True).start()
+
+        threading.Thread(target=accept, daemon=True).start()
+        return f"http://127.0.0.1:{listener.getsockname()[1]}"
+
+    yield start
+    for listener in listeners:
+        listener.close()
+
+
+def test_shoutcast_icy_status_line(prober_module, serve):
+    base = serve({'/live': [b'ICY 200 OK\r\nContent-Type: audio/mpeg\r\nicy-br: 128,128\r\n\r\n',
+                            AUDIO]})
+    result = prober_module.probe_stream(base + '/live')
+    assert result['ok'], result
+    assert result['content_type'] == 'audio/mpeg'
+    assert result['bitrate'] == 128
+    assert result['connect_ms'] >= 0 and result['first_byte_ms'] >= 0
+    assert prober_module.start_time_ms(result) == result['connect_ms'] + result['first_byte_ms']
+
+
+def test_audio_after_the_headers_is_waited_for(prober_module, serve):
+    base = serve({'/live': [b'HTTP/1.0 200 OK\r\nContent-Type: audio/aac\r\n\r\n', AUDIO]})
+    result = prober_module.probe_stream(base + '/live')
+    assert result['ok'], result
+    assert 'bitrate' not in result
+
+
+def test_redirects_are_followed(prober_module, serve):
+    base = serve({
+        '/listen.pls': [b'HTTP/1.1 302 Found\r\nLocation: /mount\r\n\r\n'],
+        '/mount': [b'HTTP/1.1 301 Moved\r\nLocation: /live?type=mp3\r\n\r\n'],
+        '/live?type=mp3': [b'HTTP/1.0 200 OK\r\nContent-Type: audio/mpeg\r\n\r\n' + AUDIO],
+    })
+    result = prober_module.probe_stream(base + '/listen.pls')
+    assert result['ok'], result
+
+
+def test_redirect_loops_give_up(prober_module, serve):
+    base = serve({'/a': [b'HTTP/1.1 302 Found\r\nLocation: /b\r\n\r\n'],
+                  '/b': [b'HTTP/1.1 302 Found\r\nLocation: /a\r\n\r\n']})
+    result = prober_module.probe_stream(base + '/a')
+    assert not result['ok']
+    assert result['error'] == "Too many redirects"
+
+
+def test_redirect_to_another_scheme_fails(prober_module, serve):
+    base = serve({'/live': [b'HTTP/1.1 302 Found\r\nLocation: rtsp://example.com/live\r\n\r\n']})
+    result = prober_module.probe_stream(base + '/live')
+    assert not result['ok']
+    assert result['error'].startswith("Unsupported stream URL")
+
+
+def test_non_audio_content_type_fails(prober_module, serve):
+    base = serve({'/': [b'HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=utf-8\r\n\r\n'
+                        b'<html>Station offline</html>']})
+    result = prober_module.probe_stream(base + '/')
+    assert not result['ok']
+    assert result['content_type'] == 'text/html'
+    assert 'Not an audio stream' in result['error']
+
+
+def test_http_errors_fail(prober_module, serve):
+    base = serve({'/gone': [b'HTTP/1.1 404 Not Found\r\nContent-Type: text/html\r\n\r\n']})
+    result = prober_module.probe_stream(base + '/gone')
+    assert not result['ok']
+    assert result['error'] == "HTTP 404"
+
+
+def test_header_overflow_fails(prober_module, serve):
+    endless = [b'HTTP/1.1 200 OK\r\n'] + [b'X-Padding: ' + b'x' * 1000 + b'\r\n'] * 40
+    base = serve({'/live': endless})
+    result = prober_module.probe_stream(base + '/live')
+    assert not result['ok']
+    assert result['error'] == "Response headers too long"
+
+
+@pytest.mark.parametrize('response, error', [
+    (b'HTTP/1.0 200 OK\r\nContent-Type: audio/mpeg\r\n\r\n', "Stream closed before sending audio"),
+    (b'SSH-2.0-OpenSSH\r\n\r\n', "Not an HTTP response"),
+    (b'HTTP/1.0 200 OK\r\n', "Connection closed before a response"),
+])
+def test_broken_responses_fail(prober_module, serve, response, error):
+    base = serve({'/live': [response]})
+    result = prober_module.probe_stream(base + '/live')
+    assert not result['ok']
+    assert result['error'] == error
+
+
+def test_unsupported_urls_fail_without_connecting(prober_module):
+    result = prober_module.probe_stream('mms://example.com/live')
+    assert not result['ok']
+    assert 'connect_ms' not in result
+
+
+def test_results_round_trip(prober_module):
+    results = {'a': {'ok': True, 'checked': 1.5, 'connect_ms': 20}}
+    assert prober_module.decode_results(prober_module.encode_results(results)) == results
+    assert prober_module.decode_results(b'{"version": 0, "results": {}}') == {}
+    assert prober_module.decode_results(b'not json') == {}
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+@pytest.fixture
+def prober(prober_module, monkeypatch):
+    probed = []
+
+    def fake_probe(url):
+        probed.append(url)
+        return {'ok': 'down' not in url, 'checked': time.time()}
+
+    monkeypatch.setattr(prober_module, 'probe_stream', fake_probe)
+    prober = prober_module.StreamProber(max_workers=2)
+    prober.probed = probed
+    yield prober
+    prober.shutdown()
+
+
+def test_check_with_nothing_to_probe_still_completes(prober, fake_gi):
+    calls = []
+    recent = {'ok': True, 'checked': time.time()}
+    prober.results['a'] = recent
+
+    assert prober.check([{'stationuuid': 'a', 'url': 'http://a/'}, {'stationuuid': 'b'}],
+                        calls.append) == 0
+    fake_gi.glib.run()
+    assert calls == [[]]
+    assert prober.probed == []
+
+
+def test_check_delivers_every_result_once(prober, fake_gi):
+    calls = []
+    stations = [{'stationuuid': 'up', 'url': 'http://up/'},
+                {'stationuuid': 'down', 'url': 'http://down/'},
+                {'stationuuid': 'up', 'url': 'http://up/'}]  # Listed twice
+
+    assert prober.check(stations, calls.append) == 2
+    wait_for(lambda: fake_gi.glib.intervals('_deliver') == [0])
+    fake_gi.glib.run()
+    assert sorted(uuid for batch in calls for uuid in batch) == ['down', 'up']
+    assert prober.is_unreachable('down') and not prober.is_unreachable('up')
+
+    # Checked recently now: the next check completes without probing
+    calls.clear()
+    assert prober.check(stations, calls.append) == 0
+    fake_gi.glib.run()
+    assert calls == [[]]
+    assert len(prober.probed) == 2